@@ -18,7 +18,11 @@
 """This module contains functionality for all the distribution supported in UQpy."""
 
 import scipy.stats as stats
+import scipy.special as special
+import scipy.linalg as linalg
 import os
+import collections
+import threading
 import numpy as np
 
 # Authors: Dimitris G.Giovanis, Michael D. Shields
@@ -39,7 +43,8 @@ class Distribution:
             - a list of names that points to a list of univariate distributions. In that case, a multivariate
             distribution is built for which all dimensions are independent and given by Distribution(name)
             - a list of names and a copula, in that case a multivariate distribution is built using Distribution(name)
-            for the marginal pdfs, while the dependence structure is given by the copula.
+            for the marginal pdfs, while the dependence structure is given by the copula (see supported copula in
+            Copula class). The parameters of the copula are given by the input copula_params of the methods.
 
             The following methods are defined:
 
@@ -69,6 +74,14 @@ class Distribution:
         if not isinstance(dist_name, str) and not (isinstance(dist_name, list) and isinstance(dist_name[0], str)):
             raise ValueError('UQpy error: name must be a string or a list of strings.')
         self.dist_name = dist_name
+        # The implementation of each distribution is resolved once, see SubDistribution
+        if isinstance(dist_name, str):
+            self._subdist = SubDistribution(dist_name=dist_name)
+        else:
+            self._marginals = [SubDistribution(dist_name=name) for name in dist_name]
+            # Marginals with the same distribution are evaluated in one call to scipy.stats
+            self._groups = _group_marginals(self._marginals)
+            self._runs = _group_marginals(self._marginals, consecutive=True)
 
         if copula is not None:
             if not isinstance(copula, str):
@@ -82,43 +95,42 @@ class Distribution:
     def pdf(self, x, params, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).pdf(x, params)
+            return self._subdist.pdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
             if (x.shape[1] != len(self.dist_name)) or (len(params) != len(self.dist_name)):
                 raise ValueError('UQpy error: Inconsistent dimensions')
-            prod_pdf = 1
-            for i in range(len(self.dist_name)):
-                prod_pdf = prod_pdf * SubDistribution(self.dist_name[i]).pdf(x[:, i], params[i])
+            # The product of the marginal pdfs, and the copula density, are computed in log space
+            sum_log_pdf = np.sum(self._log_pdf_marginals(x, params, from_pdf=True), axis=1)
             if self.copula is None:
-                return prod_pdf
+                return np.exp(sum_log_pdf)
             else:
-                _, c = self.copula.evaluate_copula(x=x, dist_params=params, copula_params=copula_params)
-                return prod_pdf * c
+                log_c = self.copula.evaluate_log_copula(x=x, dist_params=params, copula_params=copula_params,
+                                                        log_u=self._log_cdf_marginals(x, params))
+                return np.exp(sum_log_pdf + log_c)
 
     def log_pdf(self, x, params, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).log_pdf(x, params)
+            return self._subdist.log_pdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
             if (x.shape[1] != len(self.dist_name)) or (len(params) != len(self.dist_name)):
                 raise ValueError('UQpy error: Inconsistent dimensions')
-            sum_log_pdf = 0
-            for i in range(len(self.dist_name)):
-                sum_log_pdf = sum_log_pdf + SubDistribution(self.dist_name[i]).log_pdf(x[:, i], params[i])
+            sum_log_pdf = np.sum(self._log_pdf_marginals(x, params), axis=1)
             if self.copula is None:
                 return sum_log_pdf
             else:
-                _, c = self.copula.evaluate_copula(x=x, dist_params=params, copula_params=copula_params)
-                return sum_log_pdf + np.log(c)
+                log_c = self.copula.evaluate_log_copula(x=x, dist_params=params, copula_params=copula_params,
+                                                        log_u=self._log_cdf_marginals(x, params))
+                return sum_log_pdf + log_c
 
     def cdf(self, x, params, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).cdf(x, params)
+            return self._subdist.cdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
@@ -126,49 +138,91 @@ class Distribution:
                 raise ValueError('UQpy error: Inconsistent dimensions')
             if self.copula is None:
                 cdfs = np.zeros_like(x)
-                for i in range(len(self.dist_name)):
-                    cdfs[:, i] = SubDistribution(self.dist_name[i]).cdf(x[:, i], params[i])
+                for implementation, columns in self._groups:
+                    if implementation is None:
+                        cdfs[:, columns[0]] = self._marginals[columns[0]].cdf(x[:, columns[0]], params[columns[0]])
+                    else:
+                        cdfs[:, columns] = implementation.cdf_stacked(x[:, columns], [params[i] for i in columns])
                 return np.prod(cdfs, axis=1)
             else:
-                c, _ = self.copula.evaluate_copula(x=x, dist_params=params, copula_params=copula_params)
-                return c
+                return self.copula.evaluate_copula_cdf(x=x, dist_params=params, copula_params=copula_params,
+                                                       log_u=self._log_cdf_marginals(x, params))
 
-    def icdf(self, x, params):
+    def icdf(self, x, params, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).icdf(x, params)
+            return self._subdist.icdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
             if (x.shape[1] != len(self.dist_name)) or (len(params) != len(self.dist_name)):
                 raise ValueError('UQpy error: Inconsistent dimensions')
-            if self.copula is None:
-                icdfs = []
-                for i in range(len(self.dist_name)):
-                    icdfs.append(SubDistribution(self.dist_name[i]).icdf(x[:, i], params[i]))
-                return icdfs
-            else:
-                raise AttributeError('Method icdf not defined for distributions with copula.')
+            if self.copula is not None:
+                # Conditional sampling of the copula, see Copula.icdf
+                x = self.copula.icdf(x, copula_params)
+            icdfs = []
+            for i in range(len(self.dist_name)):
+                icdfs.append(self._marginals[i].icdf(x[:, i], params[i]))
+            return icdfs
 
-    def rvs(self, params, nsamples=1):
+    def rvs(self, params, nsamples=1, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).rvs(params, nsamples)
+            return self._subdist.rvs(params, nsamples)
         elif isinstance(self.dist_name, list):
             if len(params) != len(self.dist_name):
                 raise ValueError('UQpy error: Inconsistent dimensions')
             if self.copula is None:
                 rvs = np.zeros((nsamples, len(self.dist_name)))
-                for i in range(len(self.dist_name)):
-                    rvs[:, i] = SubDistribution(self.dist_name[i]).rvs(params[i], nsamples)
+                # Only consecutive marginals are drawn together, so that the random numbers are drawn in the same order
+                # as marginal by marginal
+                for implementation, columns in self._runs:
+                    if implementation is None:
+                        rvs[:, columns[0]] = self._marginals[columns[0]].rvs(params[columns[0]], nsamples)
+                    else:
+                        rvs[:, columns] = implementation.rvs_stacked([params[i] for i in columns], nsamples)
                 return rvs
             else:
-                raise AttributeError('Method rvs not defined for distributions with copula.')
+                u = self.copula.rvs(copula_params, nsamples)
+                return np.stack([self._marginals[i].icdf(u[:, i], params[i]) for i in range(len(self.dist_name))],
+                                axis=1)
+
+    def _log_pdf_marginals(self, x, params, from_pdf=False):
+        """
+            Evaluate the log_pdf of each marginal at the corresponding column of x, evaluating the marginals with the
+            same distribution together. If from_pdf = True, the log_pdf of the marginals which are not evaluated
+            together (e.g. user-defined distributions) is computed from their pdf.
+        """
+        log_pdfs = np.zeros(x.shape)
+        for implementation, columns in self._groups:
+            if implementation is None:
+                i = columns[0]
+                if from_pdf:
+                    with np.errstate(divide='ignore'):
+                        log_pdfs[:, i] = np.log(self._marginals[i].pdf(x[:, i], params[i]))
+                else:
+                    log_pdfs[:, i] = self._marginals[i].log_pdf(x[:, i], params[i])
+            else:
+                log_pdfs[:, columns] = implementation.log_pdf_stacked(x[:, columns], [params[i] for i in columns])
+        return log_pdfs
+
+    def _log_cdf_marginals(self, x, params):
+        """
+            Evaluate the log_cdf of each marginal at the corresponding column of x, see _log_pdf_marginals. They are the
+            inputs of the copula.
+        """
+        log_cdfs = np.zeros(x.shape)
+        for implementation, columns in self._groups:
+            if implementation is None:
+                log_cdfs[:, columns[0]] = self._marginals[columns[0]].log_cdf(x[:, columns[0]], params[columns[0]])
+            else:
+                log_cdfs[:, columns] = implementation.log_cdf_stacked(x[:, columns], [params[i] for i in columns])
+        return log_cdfs
 
     def fit(self, x):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).fit(x)
+            return self._subdist.fit(x)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1,-1))
@@ -177,7 +231,7 @@ class Distribution:
             if self.copula is None:
                 params_fit = []
                 for i in range(len(self.dist_name)):
-                    params_fit.append(SubDistribution(self.dist_name[i]).fit(x[:, i]))
+                    params_fit.append(self._marginals[i].fit(x[:, i]))
                 return params_fit
             else:
                 raise AttributeError('Method fit not defined for distributions with copula.')
@@ -185,7 +239,7 @@ class Distribution:
     def moments(self, params):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).moments(params)
+            return self._subdist.moments(params)
         elif isinstance(self.dist_name, list):
             if len(params) != len(self.dist_name):
                 raise ValueError('UQpy error: Inconsistent dimensions')
@@ -193,7 +247,7 @@ class Distribution:
                 mean, var, skew, kurt = [0]*len(self.dist_name), [0]*len(self.dist_name), [0]*len(self.dist_name), \
                                         [0]*len(self.dist_name),
                 for i in range(len(self.dist_name)):
-                    mean[i], var[i], skew[i], kurt[i] = SubDistribution(self.dist_name[i]).moments(params[i])
+                    mean[i], var[i], skew[i], kurt[i] = self._marginals[i].moments(params[i])
                 return mean, var, skew, kurt
             else:
                 raise AttributeError('Method moments not defined for distributions with copula.')
@@ -204,8 +258,16 @@ class Copula:
         Description:
 
             This class computes terms required to compute cdf, pdf and log_pdf for a multivariate distribution whose
-            dependence structure is defined with a copula. The following copula are supported:
-            [gumbel]
+            dependence structure is defined with a copula, and samples the copula. The following copula are supported,
+            in arbitrary dimension:
+            [gaussian, student, clayton, frank, gumbel]
+
+            The parameters copula_params of the copula are:
+                - gaussian: the correlation matrix, or the correlation coefficient in dimension 2
+                - student: a list [correlation matrix (or correlation coefficient in dimension 2), degrees of freedom]
+                - clayton: theta in (0, +oo)
+                - frank: theta in (0, +oo), or theta != 0 in dimension 2
+                - gumbel: theta in [1, +oo)
 
         Input:
             :param copula_name: Name of copula.
@@ -217,7 +279,8 @@ class Copula:
         Output:
             A handler pointing to a copula and its associated methods, in particular its method evaluate_copula, which
             evaluates the terms c, c_ necessary to evaluate the cdf and pdf, respectively, of the multivariate
-            Distribution.
+            Distribution, its method evaluate_log_copula, which evaluates log(c_) directly, and its methods icdf and
+            rvs, which sample the copula by conditional sampling.
     """
 
     def __init__(self, copula_name=None, dist_name=None):
@@ -226,36 +289,369 @@ class Copula:
             raise ValueError('Both copula_name and dist_name must be provided.')
         self.copula_name = copula_name
         self.dist_name = dist_name
-
-    def evaluate_copula(self, x, dist_params, copula_params):
-
-        if self.copula_name.lower() == 'gumbel':
-            if x.shape[1] > 2:
-                raise ValueError('Maximum dimension for the Gumbel Copula is 2.')
-            if not isinstance(copula_params, list):
-                copula_params = [copula_params]
-            if copula_params[0] < 1:
-                raise ValueError('The parameter for Gumbel copula must be defined in [1, +oo)')
-
-            uu = np.zeros_like(x)
-            for i in range(uu.shape[1]):
-                uu[:, i] = SubDistribution(self.dist_name[i]).cdf(x[:, i], dist_params[i])
-            if copula_params[0] == 1:
-                return np.prod(uu, axis=1), np.ones(x.shape[0])
-            else:
-                u = uu[:, 0]
-                v = uu[:, 1]
-                c = np.exp(-((-np.log(u)) ** copula_params[0]+(-np.log(v)) ** copula_params[0]) **
-                            (1/copula_params[0]))
-
-                c_ = c * 1/u*1/v*((-np.log(u)) ** copula_params[0]+(-np.log(v)) ** copula_params[0]) ** \
-                    (-2 + 2/copula_params[0]) * (np.log(u) * np.log(v)) ** (copula_params[0]-1) *\
-                    (1 + (copula_params[0] - 1) * ((-np.log(u)) ** copula_params[0] +
-                                                   (-np.log(v)) ** copula_params[0]) ** (-1/copula_params[0]))
-                return c, c_
-        else:
+        self._marginals = [SubDistribution(dist_name=name) for name in dist_name]
+        self.implementation = _copulas.get(copula_name.lower())
+        if self.implementation is None:
             raise ValueError('Copula type not supported!')
 
+    def evaluate_copula(self, x, dist_params, copula_params, log_u=None):
+        """
+            Evaluate the copula c and its density c_ at the marginal cdfs of x. The log of the marginal cdfs log_u can
+            be given when they were already computed.
+        """
+        if log_u is None:
+            log_u = self.log_cdf_marginals(x, dist_params)
+        copula_params = self.implementation.check_params(copula_params, log_u.shape[1])
+        return (self.implementation.cdf(log_u, copula_params),
+                np.exp(self.implementation.log_pdf(log_u, copula_params)))
+
+    def evaluate_copula_cdf(self, x, dist_params, copula_params, log_u=None):
+        """
+            Evaluate the copula c at the marginal cdfs of x, see evaluate_copula
+        """
+        if log_u is None:
+            log_u = self.log_cdf_marginals(x, dist_params)
+        copula_params = self.implementation.check_params(copula_params, log_u.shape[1])
+        return self.implementation.cdf(log_u, copula_params)
+
+    def evaluate_log_copula(self, x, dist_params, copula_params, log_u=None):
+        """
+            Evaluate log(c_), the log of the copula term of the pdf, from the log of the marginal cdfs. This avoids the
+            underflow of c_ and of the marginal cdfs in the tails of the distribution. See evaluate_copula for log_u.
+        """
+        if log_u is None:
+            log_u = self.log_cdf_marginals(x, dist_params)
+        copula_params = self.implementation.check_params(copula_params, log_u.shape[1])
+        return self.implementation.log_pdf(log_u, copula_params)
+
+    def icdf(self, w, copula_params):
+        """
+            Map points w of the unit hypercube, of shape (nsamples, dimension), to the copula by conditional sampling:
+            u_1 = w_1, then u_k is the inverse of the conditional cdf of U_k given u_1, ..., u_k-1 at w_k (inverse
+            Rosenblatt transformation).
+        """
+        if len(w.shape) == 1:
+            w = w.reshape((1, -1))
+        if w.shape[1] != len(self.dist_name):
+            raise ValueError('UQpy error: Inconsistent dimensions')
+        copula_params = self.implementation.check_params(copula_params, w.shape[1])
+        return self.implementation.icdf(np.clip(w, np.finfo(float).tiny, 1.), copula_params)
+
+    def rvs(self, copula_params, nsamples=1):
+        """
+            Draw nsamples samples of the copula, as an array of shape (nsamples, dimension), see icdf
+        """
+        return self.icdf(np.random.rand(nsamples, len(self.dist_name)), copula_params)
+
+    def log_cdf_marginals(self, x, dist_params):
+        """
+            Evaluate the log of the marginal cdfs at the columns of x, the inputs of the copula
+        """
+        log_u = np.zeros_like(x, dtype=float)
+        for i in range(x.shape[1]):
+            log_u[:, i] = self._marginals[i].log_cdf(x[:, i], dist_params[i])
+        return log_u
+
+
+class _ArchimedeanCopula:
+    """
+        Description:
+
+            Base class of the Archimedean copula C(u) = psi(phi(u_1) + ... + phi(u_d)). The subclasses define the
+            generator psi(t, theta), its inverse phi(log_u, theta) as a function of log(u), log_minus_dphi(log_u,
+            theta) = log(-phi'(u)), and log_dpsi(t, k, theta) = log((-1)^k psi^(k)(t)), so that the log of the copula
+            density is log_dpsi(t, d, theta) + sum(log_minus_dphi(log_u_i, theta)) with t = sum(phi(log_u_i, theta)).
+    """
+    name = None
+
+    def check_params(self, copula_params, dim):
+        if isinstance(copula_params, (list, tuple)):
+            copula_params = copula_params[0]
+        theta = float(copula_params)
+        if not self.valid_theta(theta, dim):
+            raise ValueError('The parameter for ' + self.name + ' copula must be defined in ' +
+                             self.theta_domain(dim))
+        return theta
+
+    def cdf(self, log_u, theta):
+        return self.psi(np.sum(self.phi(log_u, theta), axis=1), theta)
+
+    def log_pdf(self, log_u, theta):
+        t = np.sum(self.phi(log_u, theta), axis=1)
+        return self.log_dpsi(t, log_u.shape[1], theta) + np.sum(self.log_minus_dphi(log_u, theta), axis=1)
+
+    def icdf(self, w, theta):
+        # The conditional cdf of U_k+1 given u_1, ..., u_k is psi^(k)(t + phi(u_k+1)) / psi^(k)(t), with
+        # t = phi(u_1) + ... + phi(u_k)
+        u = np.zeros_like(w)
+        u[:, 0] = w[:, 0]
+        t = self.phi(np.log(w[:, 0]), theta)
+        for k in range(1, w.shape[1]):
+            s = self.conditional_icdf(t, w[:, k], k, theta)
+            u[:, k] = self.psi(s, theta)
+            t = t + s
+        return u
+
+    def conditional_icdf(self, t, w, k, theta):
+        """
+            Solve psi^(k)(t + s) / psi^(k)(t) = w for s >= 0 by bisection, the ratio decreases from 1 to 0
+        """
+        log_w = np.log(w)
+        log_dpsi_t = self.log_dpsi(t, k, theta)
+
+        def above(s):
+            return self.log_dpsi(t + s, k, theta) - log_dpsi_t > log_w
+
+        low, high = np.zeros_like(t), np.ones_like(t)
+        for _ in range(1100):
+            mask = above(high)
+            if not np.any(mask):
+                break
+            low[mask] = high[mask]
+            high[mask] = 2 * high[mask]
+        for _ in range(60):
+            middle = (low + high) / 2
+            mask = above(middle)
+            low = np.where(mask, middle, low)
+            high = np.where(mask, high, middle)
+        return (low + high) / 2
+
+
+class _ClaytonCopula(_ArchimedeanCopula):
+    name = 'Clayton'
+
+    @staticmethod
+    def valid_theta(theta, dim):
+        return theta > 0
+
+    @staticmethod
+    def theta_domain(dim):
+        return '(0, +oo)'
+
+    @staticmethod
+    def phi(log_u, theta):
+        return np.expm1(-theta * log_u)
+
+    @staticmethod
+    def log_minus_dphi(log_u, theta):
+        return np.log(theta) - (theta + 1) * log_u
+
+    @staticmethod
+    def psi(t, theta):
+        return (1 + t) ** (-1 / theta)
+
+    @staticmethod
+    def log_dpsi(t, k, theta):
+        return np.sum(np.log(1 / theta + np.arange(k))) - (1 / theta + k) * np.log1p(t)
+
+    @staticmethod
+    def conditional_icdf(t, w, k, theta):
+        # ((1 + t + s) / (1 + t)) ** -(1 / theta + k) = w
+        return (1 + t) * np.expm1(-np.log(w) / (1 / theta + k))
+
+
+class _FrankCopula(_ArchimedeanCopula):
+    name = 'Frank'
+
+    @staticmethod
+    def valid_theta(theta, dim):
+        return theta > 0 or (dim == 2 and theta != 0)
+
+    @staticmethod
+    def theta_domain(dim):
+        return '(-oo, 0) U (0, +oo)' if dim == 2 else '(0, +oo)'
+
+    @staticmethod
+    def phi(log_u, theta):
+        return -np.log(np.expm1(-theta * np.exp(log_u)) / np.expm1(-theta))
+
+    @staticmethod
+    def log_minus_dphi(log_u, theta):
+        return np.log(theta / np.expm1(theta * np.exp(log_u)))
+
+    @staticmethod
+    def psi(t, theta):
+        return -np.log1p(np.expm1(-theta) * np.exp(-t)) / theta
+
+    @staticmethod
+    def log_dpsi(t, k, theta):
+        # (-1)^k psi^(k)(t) = Li_(1-k)(z) / theta with z = (1 - exp(-theta)) exp(-t), where the polylogarithm of order
+        # -n is z * sum_i A(n, i) z^i / (1 - z)^(n+1), A being the Eulerian numbers, and z / (1 - z) for n = 0
+        n = k - 1
+        z = -np.expm1(-theta) * np.exp(-t)
+        coefficients = [1] if n == 0 else _eulerian_numbers(n)[::-1]
+        numerator = z * np.polyval(coefficients, z)
+        return np.log(np.abs(numerator / theta)) - (n + 1) * np.log1p(-z)
+
+
+class _GumbelCopula(_ArchimedeanCopula):
+    name = 'Gumbel'
+
+    @staticmethod
+    def valid_theta(theta, dim):
+        return theta >= 1
+
+    @staticmethod
+    def theta_domain(dim):
+        return '[1, +oo)'
+
+    @staticmethod
+    def phi(log_u, theta):
+        return (-log_u) ** theta
+
+    @staticmethod
+    def log_minus_dphi(log_u, theta):
+        return np.log(theta) + (theta - 1) * np.log(-log_u) - log_u
+
+    @staticmethod
+    def psi(t, theta):
+        return np.exp(-t ** (1 / theta))
+
+    @staticmethod
+    def log_dpsi(t, k, theta):
+        # (-1)^k psi^(k)(t) = psi(t) / t^k * sum_j a_kj t^(alpha j) for j = 1, ..., k with alpha = 1 / theta, where
+        # a_kj = (-1)^(k-j) sum_i alpha^i s(k, i) S(i, j) for i = j, ..., k, s and S being the Stirling numbers of the
+        # first and second kind (Hofert, Maechler and McNeil, 2012)
+        alpha = 1 / theta
+        stirling_1, stirling_2 = _stirling_numbers(k)
+        powers = alpha ** np.arange(k + 1) * stirling_1[k]
+        a = np.array([(-1) ** (k - j) * np.sum(powers[j:] * stirling_2[j:, j]) for j in range(1, k + 1)])
+        log_t = np.log(t)
+        exponents = alpha * np.outer(log_t, np.arange(1, k + 1))
+        shift = np.max(exponents, axis=1)
+        log_sum = shift + np.log(np.dot(np.exp(exponents - shift[:, np.newaxis]), a))
+        return -t ** alpha - k * log_t + log_sum
+
+
+class _EllipticalCopula:
+    """
+        Description:
+
+            Base class of the Gaussian and Student copula, given by their correlation matrix. The samples are drawn by
+            conditional sampling along the Cholesky factor of the correlation matrix.
+    """
+    name = None
+
+    def check_correlation(self, correlation, dim):
+        correlation = np.asarray(correlation, dtype=float)
+        if correlation.size == 1 and dim == 2:
+            correlation = np.array([[1., correlation.item()], [correlation.item(), 1.]])
+        if correlation.shape != (dim, dim) or not np.allclose(correlation, correlation.T) or \
+                not np.allclose(np.diag(correlation), 1.):
+            raise ValueError('UQpy error: the correlation matrix of the ' + self.name + ' copula must be a symmetric '
+                             'matrix of shape (dimension, dimension) with a unit diagonal.')
+        try:
+            cholesky = np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            raise ValueError('UQpy error: the correlation matrix of the ' + self.name + ' copula must be positive '
+                             'definite.')
+        return correlation, cholesky, 2 * np.sum(np.log(np.diag(cholesky)))
+
+
+class _GaussianCopula(_EllipticalCopula):
+    name = 'Gaussian'
+
+    def check_params(self, copula_params, dim):
+        return self.check_correlation(copula_params, dim)
+
+    @staticmethod
+    def cdf(log_u, params):
+        correlation, _, _ = params
+        z = _ppf_from_log_cdf(stats.norm, log_u)
+        return np.atleast_1d(stats.multivariate_normal(mean=np.zeros(z.shape[1]), cov=correlation).cdf(z))
+
+    @staticmethod
+    def log_pdf(log_u, params):
+        _, cholesky, log_det = params
+        z = _ppf_from_log_cdf(stats.norm, log_u)
+        y = linalg.solve_triangular(cholesky, z.T, lower=True)
+        return -0.5 * log_det - 0.5 * (np.sum(y ** 2, axis=0) - np.sum(z ** 2, axis=1))
+
+    @staticmethod
+    def icdf(w, params):
+        _, cholesky, _ = params
+        return stats.norm.cdf(np.dot(stats.norm.ppf(w), cholesky.T))
+
+
+class _StudentCopula(_EllipticalCopula):
+    name = 'Student'
+
+    def check_params(self, copula_params, dim):
+        if not isinstance(copula_params, (list, tuple)) or len(copula_params) != 2:
+            raise ValueError('UQpy error: the parameters of the Student copula must be a list [correlation, degrees '
+                             'of freedom].')
+        nu = float(copula_params[1])
+        if nu <= 0:
+            raise ValueError('The degrees of freedom of the Student copula must be defined in (0, +oo)')
+        return self.check_correlation(copula_params[0], dim) + (nu, )
+
+    @staticmethod
+    def cdf(log_u, params):
+        correlation, _, _, nu = params
+        z = _ppf_from_log_cdf(stats.t, log_u, nu)
+        return np.atleast_1d(stats.multivariate_t(loc=np.zeros(z.shape[1]), shape=correlation, df=nu).cdf(z))
+
+    @staticmethod
+    def log_pdf(log_u, params):
+        _, cholesky, log_det, nu = params
+        dim = log_u.shape[1]
+        z = _ppf_from_log_cdf(stats.t, log_u, nu)
+        y = linalg.solve_triangular(cholesky, z.T, lower=True)
+        return (special.gammaln((nu + dim) / 2) + (dim - 1) * special.gammaln(nu / 2) -
+                dim * special.gammaln((nu + 1) / 2) - 0.5 * log_det -
+                (nu + dim) / 2 * np.log1p(np.sum(y ** 2, axis=0) / nu) +
+                (nu + 1) / 2 * np.sum(np.log1p(z ** 2 / nu), axis=1))
+
+    @staticmethod
+    def icdf(w, params):
+        # Given y_1, ..., y_k of a standard multivariate Student distribution, y_k+1 follows a Student distribution
+        # with nu + k degrees of freedom scaled by sqrt((nu + y_1^2 + ... + y_k^2) / (nu + k))
+        _, cholesky, _, nu = params
+        y = np.zeros_like(w)
+        for k in range(w.shape[1]):
+            y[:, k] = np.sqrt((nu + np.sum(y[:, :k] ** 2, axis=1)) / (nu + k)) * stats.t.ppf(w[:, k], nu + k)
+        return stats.t.cdf(np.dot(y, cholesky.T), nu)
+
+
+def _ppf_from_log_cdf(dist, log_u, *args):
+    """
+        Quantiles of a symmetric scipy.stats distribution at exp(log_u), accurate in both tails
+    """
+    upper = log_u > np.log(0.5)
+    with np.errstate(divide='ignore'):
+        return np.where(upper, dist.isf(-np.expm1(np.where(upper, log_u, -1.)), *args),
+                        dist.ppf(np.exp(np.where(upper, -1., log_u)), *args))
+
+
+def _stirling_numbers(n):
+    """
+        Return the signed Stirling numbers of the first kind s(i, j) and the Stirling numbers of the second kind S(i, j)
+        for i, j = 0, ..., n
+    """
+    stirling_1, stirling_2 = np.zeros((n + 1, n + 1)), np.zeros((n + 1, n + 1))
+    stirling_1[0, 0], stirling_2[0, 0] = 1, 1
+    for i in range(1, n + 1):
+        for j in range(1, i + 1):
+            stirling_1[i, j] = stirling_1[i - 1, j - 1] - (i - 1) * stirling_1[i - 1, j]
+            stirling_2[i, j] = j * stirling_2[i - 1, j] + stirling_2[i - 1, j - 1]
+    return stirling_1, stirling_2
+
+
+def _eulerian_numbers(n):
+    """
+        Return the Eulerian numbers A(n, i) for i = 0, ..., n-1
+    """
+    numbers = [1]
+    for m in range(2, n + 1):
+        numbers = [(i + 1) * (numbers[i] if i < m - 1 else 0) + (m - i) * (numbers[i - 1] if i > 0 else 0)
+                   for i in range(m)]
+    return np.array(numbers, dtype=float)
+
+
+# Registry of the copula supported by UQpy, by lower case name
+_copulas = {'gaussian': _GaussianCopula(), 'normal': _GaussianCopula(), 'student': _StudentCopula(),
+            't': _StudentCopula(), 'clayton': _ClaytonCopula(), 'frank': _FrankCopula(), 'gumbel': _GumbelCopula()}
+
 
 class SubDistribution:
     """
@@ -272,7 +668,8 @@ class SubDistribution:
             [mvnormal].
 
             However, a user-defined distribution can be used in UQpy provided a python script .py containing the
-            required functions.
+            required functions, or functions registered with register_distribution. The python script is imported
+            only once.
 
             For the assigned distribution, the following methods are defined:
 
@@ -283,6 +680,7 @@ class SubDistribution:
                 5. log_pdf: logarithm of the pdf
                 6. fit: Estimates the parameters of the distribution over arbitrary data
                 7. moments: Calculate the first four moments of the distribution (mean, variance, skewness, kyrtosis)
+                8. log_cdf: logarithm of the cdf
 
         Input:
             :param dist_name: Name of distribution.
@@ -299,392 +697,380 @@ class SubDistribution:
         if self.dist_name is None:
             raise ValueError('Error: A Distribution name must be provided!')
 
-    def pdf(self, x, params):
-        if self.dist_name.lower() == 'normal' or self.dist_name.lower() == 'gaussian':
-            return stats.norm.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'uniform':
-            return stats.uniform.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'binomial':
-            return stats.binom.pdf(x, n=params[0], p=params[1])
-        elif self.dist_name.lower() == 'beta':
-            return stats.beta.pdf(x, a=params[0], b=params[1])
-        elif self.dist_name.lower() == 'gumbel_r':
-            return stats.genextreme.pdf(x, c=0, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'chisquare':
-            return stats.chi2.pdf(x, df=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'lognormal':
-            return stats.lognorm.pdf(x, s=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'gamma':
-            return stats.gamma.pdf(x, a=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'exponential':
-            return stats.expon.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'cauchy':
-            return stats.cauchy.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'inv_gauss':
-            return stats.invgauss.pdf(x, mu=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'logistic':
-            return stats.logistic.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'pareto':
-            return stats.pareto.pdf(x, b=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'rayleigh':
-            return stats.rayleigh.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'levy':
-            return stats.levy.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'laplace':
-            return stats.laplace.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'maxwell':
-            return stats.maxwell.pdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'truncnorm':
-            return stats.truncnorm.pdf(x, a=params[0], b=params[1], loc=params[2], scale=params[3])
-        elif self.dist_name.lower() == 'mvnormal':
-            return stats.multivariate_normal.pdf(x, mean=params[0], cov=params[1])
-        else:
-            file_name = os.path.join(self.dist_name + '.py')
-            if os.path.isfile(file_name):
-                import importlib
-                custom_dist = importlib.import_module(self.dist_name)
-            else:
-                raise FileExistsError()
+        # Resolve the implementation of the distribution once, so that each call is a direct method call
+        self.implementation = _get_implementation(self.dist_name)
 
-            tmp = getattr(custom_dist, 'pdf', None)
-            if tmp is None:
-                raise AttributeError('Method pdf not defined for distribution '+self.dist_name+'.')
-            else:
-                return tmp(x, params)
+    def pdf(self, x, params):
+        return self.implementation.pdf(x, params)
 
     def rvs(self, params, nsamples):
-        if self.dist_name.lower() == 'normal' or self.dist_name.lower() == 'gaussian':
-            return stats.norm.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'uniform':
-            return stats.uniform.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'binomial':
-            return stats.binom.rvs(n=params[0], p=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'beta':
-            return stats.beta.rvs(a=params[0], b=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'gumbel_r':
-            return stats.genextreme.rvs(c=0, loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'chisquare':
-            return stats.chi2.rvs(df=params[0], loc=params[1], scale=params[2], size=nsamples)
-        elif self.dist_name.lower() == 'lognormal':
-            return stats.lognorm.rvs(s=params[0], loc=params[1], scale=params[2], size=nsamples)
-        elif self.dist_name.lower() == 'gamma':
-            return stats.gamma.rvs(a=params[0], loc=params[1], scale=params[2], size=nsamples)
-        elif self.dist_name.lower() == 'exponential':
-            return stats.expon.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'cauchy':
-            return stats.cauchy.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'inv_gauss':
-            return stats.invgauss.rvs(mu=params[0], loc=params[1], scale=params[2], size=nsamples)
-        elif self.dist_name.lower() == 'logistic':
-            return stats.logistic.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'pareto':
-            return stats.pareto.rvs(b=params[0], loc=params[1], scale=params[2], size=nsamples)
-        elif self.dist_name.lower() == 'rayleigh':
-            return stats.rayleigh.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'levy':
-            return stats.levy.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'laplace':
-            return stats.laplace.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'maxwell':
-            return stats.maxwell.rvs(loc=params[0], scale=params[1], size=nsamples)
-        elif self.dist_name.lower() == 'truncnorm':
-            return stats.truncnorm.rvs(a=params[0], b=params[1], loc=params[2], scale=params[3], size=nsamples)
-        elif self.dist_name.lower() == 'mvnormal':
-            return stats.multivariate_normal.rvs(mean=params[0], cov=params[1], size=nsamples)
-        else:
-            file_name = os.path.join(self.dist_name + '.py')
-            if os.path.isfile(file_name):
-                import importlib
-                custom_dist = importlib.import_module(self.dist_name)
-            else:
-                raise FileExistsError()
-
-            tmp = getattr(custom_dist, 'rvs', None)
-            if tmp is None:
-                raise AttributeError('Method rvs not defined for distribution '+self.dist_name+'.')
-            else:
-                return tmp(params, nsamples)
+        return self.implementation.rvs(params, nsamples)
 
     def cdf(self, x, params):
-        if self.dist_name.lower() == 'normal' or self.dist_name.lower() == 'gaussian':
-            return stats.norm.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'uniform':
-            return stats.uniform.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'binomial':
-            return stats.binom.cdf(x, n=params[0], p=params[1])
-        elif self.dist_name.lower() == 'beta':
-            return stats.beta.cdf(x, a=params[0], b=params[1])
-        elif self.dist_name.lower() == 'gumbel_r':
-            return stats.genextreme.cdf(x, c=0, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'chisquare':
-            return stats.chi2.cdf(x, df=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'lognormal':
-            return stats.lognorm.cdf(x, s=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'gamma':
-            return stats.gamma.cdf(x, a=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'exponential':
-            return stats.expon.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'cauchy':
-            return stats.cauchy.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'inv_gauss':
-            return stats.invgauss.cdf(x, mu=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'logistic':
-            return stats.logistic.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'pareto':
-            return stats.pareto.cdf(x, b=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'rayleigh':
-            return stats.rayleigh.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'levy':
-            return stats.levy.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'laplace':
-            return stats.laplace.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'maxwell':
-            return stats.maxwell.cdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'truncnorm':
-            return stats.truncnorm.cdf(x, a=params[0], b=params[1], loc=params[2], scale=params[3])
-        elif self.dist_name.lower() == 'mvnormal':
-            return stats.multivariate_normal.cdf(x, mean=params[0], cov=params[1])
-        else:
-            file_name = os.path.join(self.dist_name + '.py')
-            if os.path.isfile(file_name):
-                import importlib
-                custom_dist = importlib.import_module(self.dist_name)
-            else:
-                raise FileExistsError()
+        return self.implementation.cdf(x, params)
 
-            tmp = getattr(custom_dist, 'cdf', None)
-            if tmp is None:
-                raise AttributeError('Method cdf not defined for distribution '+self.dist_name+'.')
-            else:
-                return tmp(x, params)
+    def icdf(self, x, params):
+        return self.implementation.icdf(x, params)
+
+    def log_pdf(self, x, params):
+        return self.implementation.log_pdf(x, params)
+
+    def log_cdf(self, x, params):
+        return self.implementation.log_cdf(x, params)
+
+    def fit(self, x):
+        return self.implementation.fit(x)
+
+    def moments(self, params):
+        return self.implementation.moments(params)
+
+
+########################################################################################################################
+#        Implementations of the distributions
+########################################################################################################################
+
+class _ScipyDistribution:
+    """
+        Description:
+
+            Implementation of a distribution of scipy.stats for SubDistribution. The distribution is frozen with the
+            parameters of each call, and the frozen distributions are kept in an LRU cache, see _freeze.
+
+        Input:
+            :param name: Name of the distribution in UQpy.
+            :type: name: string
+
+            :param dist: The scipy.stats distribution.
+            :type: dist: scipy.stats distribution
+
+            :param param_names: Names of the arguments of dist given by the parameters of the UQpy distribution, in
+            the order of the parameters.
+            :type: param_names: tuple of strings
+
+            :param fixed: Arguments of dist with a fixed value.
+            :type: fixed: dict
+
+            :param undefined: Methods which are not defined for the distribution, with the exception they raise.
+            :type: undefined: dict
+
+            :param multivariate: True if the distribution is multivariate. The marginals of a Distribution which have
+            the same univariate distribution are evaluated together, see the methods with suffix _stacked.
+            :type: multivariate: Boolean
+    """
+
+    def __init__(self, name, dist, param_names, fixed=None, undefined=None, multivariate=False):
+        self.name = name
+        self.dist = dist
+        self.param_names = param_names
+        self.fixed = fixed if fixed is not None else dict()
+        self.undefined = undefined if undefined is not None else dict()
+        self.discrete = isinstance(dist, stats.rv_discrete)
+        self.multivariate = multivariate
+
+    def freeze(self, params):
+        return _freeze(self, params)
+
+    def _check_defined(self, method):
+        if method in self.undefined:
+            raise self.undefined[method]('Method ' + method + ' not defined for ' + self.name + ' distribution.')
+
+    def pdf(self, x, params):
+        frozen = self.freeze(params)
+        return frozen.pmf(x) if self.discrete else frozen.pdf(x)
+
+    def rvs(self, params, nsamples):
+        return self.freeze(params).rvs(size=nsamples)
+
+    def cdf(self, x, params):
+        return self.freeze(params).cdf(x)
 
     def icdf(self, x, params):
-        if self.dist_name.lower() == 'normal' or self.dist_name.lower() == 'gaussian':
-            return stats.norm.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'uniform':
-            return stats.uniform.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'binomial':
-            return stats.binom.ppf(x, n=params[0], p=params[1])
-        elif self.dist_name.lower() == 'beta':
-            return stats.beta.ppf(x, a=params[0], b=params[1])
-        elif self.dist_name.lower() == 'gumbel_r':
-            return stats.genextreme.ppf(x, c=0, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'chisquare':
-            return stats.chi2.ppf(x, df=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'lognormal':
-            return stats.lognorm.ppf(x, s=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'gamma':
-            return stats.gamma.ppf(x, a=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'exponential':
-            return stats.expon.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'cauchy':
-            return stats.cauchy.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'inv_gauss':
-            return stats.invgauss.ppf(x, mu=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'logistic':
-            return stats.logistic.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'pareto':
-            return stats.pareto.ppf(x, b=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'rayleigh':
-            return stats.rayleigh.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'levy':
-            return stats.levy.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'laplace':
-            return stats.laplace.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'maxwell':
-            return stats.maxwell.ppf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'truncnorm':
-            return stats.truncnorm.ppf(x, a=params[0], b=params[1], loc=params[2], scale=params[3])
-        elif self.dist_name.lower() == 'mvnormal':
-            raise ValueError('Method icdf not defined for mvnormal distribution.')
-        else:
-            file_name = os.path.join(self.dist_name + '.py')
-            if os.path.isfile(file_name):
-                import importlib
-                custom_dist = importlib.import_module(self.dist_name)
-            else:
-                raise FileExistsError()
+        self._check_defined('icdf')
+        return self.freeze(params).ppf(x)
 
-            tmp = getattr(custom_dist, 'icdf', None)
-            if tmp is None:
-                raise AttributeError('Method icdf not defined for distribution '+self.dist_name+'.')
-            else:
-                return tmp(x, params)
+    def log_pdf(self, x, params):
+        frozen = self.freeze(params)
+        return frozen.logpmf(x) if self.discrete else frozen.logpdf(x)
+
+    def log_cdf(self, x, params):
+        return self.freeze(params).logcdf(x)
+
+    def fit(self, x):
+        self._check_defined('fit')
+        return self.dist.fit(x)
+
+    def moments(self, params):
+        self._check_defined('moments')
+        mean, var, skew, kurt = self.freeze(params).stats(moments='mvsk')
+        return np.array([mean, var, skew, kurt])
+
+    def _stacked_kwargs(self, params_list, ndim=1):
+        # Arrays of the parameters of k marginals, with the marginals along the first axis if ndim = 2 and along the
+        # last axis if ndim = 1, to broadcast with an array with one marginal per row or per column
+        kwargs = dict()
+        for i, param_name in enumerate(self.param_names):
+            kwargs[param_name] = np.array([params[i] for params in params_list])
+            if ndim == 2:
+                kwargs[param_name] = kwargs[param_name].reshape((-1, 1))
+        kwargs.update(self.fixed)
+        return kwargs
+
+    def log_pdf_stacked(self, x, params_list):
+        """
+            Evaluate the log_pdf of k marginals with this distribution and the parameters params_list at the columns
+            of x, of shape (nsamples, k), in one call
+        """
+        if self.discrete:
+            return self.dist.logpmf(x, **self._stacked_kwargs(params_list))
+        return self.dist.logpdf(x, **self._stacked_kwargs(params_list))
+
+    def cdf_stacked(self, x, params_list):
+        """
+            Evaluate the cdf of k marginals at the columns of x in one call, see log_pdf_stacked
+        """
+        return self.dist.cdf(x, **self._stacked_kwargs(params_list))
+
+    def log_cdf_stacked(self, x, params_list):
+        """
+            Evaluate the log_cdf of k marginals at the columns of x in one call, see log_pdf_stacked
+        """
+        return self.dist.logcdf(x, **self._stacked_kwargs(params_list))
+
+    def rvs_stacked(self, params_list, nsamples):
+        """
+            Draw nsamples samples of k marginals in one call, as an array of shape (nsamples, k). The random numbers
+            are drawn in the same order as by k successive calls to rvs.
+        """
+        return self.dist.rvs(size=(len(params_list), nsamples), **self._stacked_kwargs(params_list, ndim=2)).T
+
+
+class _CustomDistribution:
+    """
+        Description:
+
+            Implementation of a user-defined distribution for SubDistribution, given by the functions pdf(x, params),
+            cdf(x, params), icdf(x, params), rvs(params, nsamples), log_pdf(x, params), fit(x) and moments(params), or
+            some of them.
+
+        Input:
+            :param name: Name of the distribution.
+            :type: name: string
+
+            :param functions: The functions defining the distribution, by method name. The methods without function
+            raise an AttributeError.
+            :type: functions: dict
+    """
+
+    def __init__(self, name, functions):
+        self.name = name
+        self.functions = functions
+
+    def _function(self, method):
+        if self.functions.get(method) is None:
+            raise AttributeError('Method ' + method + ' not defined for distribution ' + self.name + '.')
+        return self.functions[method]
+
+    def pdf(self, x, params):
+        return self._function('pdf')(x, params)
+
+    def rvs(self, params, nsamples):
+        return self._function('rvs')(params, nsamples)
+
+    def cdf(self, x, params):
+        return self._function('cdf')(x, params)
+
+    def icdf(self, x, params):
+        return self._function('icdf')(x, params)
 
     def log_pdf(self, x, params):
-        if self.dist_name.lower() == 'normal' or self.dist_name.lower() == 'gaussian':
-            return stats.norm.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'uniform':
-            return stats.uniform.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'binomial':
-            return stats.binom.log_pdf(x, n=params[0], p=params[1])
-        elif self.dist_name.lower() == 'beta':
-            return stats.beta.logpdf(x, a=params[0], b=params[1])
-        elif self.dist_name.lower() == 'gumbel_r':
-            return stats.genextreme.logpdf(x, c=0, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'chisquare':
-            return stats.chi2.logpdf(x, df=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'lognormal':
-            return stats.lognorm.logpdf(x, s=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'gamma':
-            return stats.gamma.logpdf(x, a=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'exponential':
-            return stats.expon.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'cauchy':
-            return stats.cauchy.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'inv_gauss':
-            return stats.invgauss.logpdf(x, mu=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'logistic':
-            return stats.logistic.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'pareto':
-            return stats.pareto.logpdf(x, b=params[0], loc=params[1], scale=params[2])
-        elif self.dist_name.lower() == 'rayleigh':
-            return stats.rayleigh.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'levy':
-            return stats.levy.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'laplace':
-            return stats.laplace.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'maxwell':
-            return stats.maxwell.logpdf(x, loc=params[0], scale=params[1])
-        elif self.dist_name.lower() == 'truncnorm':
-            return stats.truncnorm.logpdf(x, a=params[0], b=params[1], loc=params[2], scale=params[3])
-        elif self.dist_name.lower() == 'mvnormal':
-            return stats.multivariate_normal.logpdf(x, mean=params[0], cov=params[1])
-        else:
-            file_name = os.path.join(self.dist_name + '.py')
-            if os.path.isfile(file_name):
-                import importlib
-                custom_dist = importlib.import_module(self.dist_name)
-            else:
-                raise FileExistsError()
+        return self._function('log_pdf')(x, params)
 
-            tmp = getattr(custom_dist, 'log_pdf', None)
-            if tmp is None:
-                raise AttributeError('Method log_pdf not defined for distribution '+self.dist_name+'.')
-            else:
-                return tmp(x, params)
+    def log_cdf(self, x, params):
+        with np.errstate(divide='ignore'):
+            return np.log(self._function('cdf')(x, params))
 
     def fit(self, x):
-        if self.dist_name.lower() == 'normal' or self.dist_name.lower() == 'gaussian':
-            return stats.norm.fit(x)
-        elif self.dist_name.lower() == 'uniform':
-            return stats.uniform.fit(x)
-        elif self.dist_name.lower() == 'binomial':
-            return stats.binom.fit(x)
-        elif self.dist_name.lower() == 'beta':
-            return stats.beta.fit(x)
-        elif self.dist_name.lower() == 'gumbel_r':
-            return stats.genextreme.fit(x)
-        elif self.dist_name.lower() == 'chisquare':
-            return stats.chi2.fit(x)
-        elif self.dist_name.lower() == 'lognormal':
-            return stats.lognorm.fit(x)
-        elif self.dist_name.lower() == 'gamma':
-            return stats.gamma.fit(x)
-        elif self.dist_name.lower() == 'exponential':
-            return stats.expon.fit(x)
-        elif self.dist_name.lower() == 'cauchy':
-            return stats.cauchy.fit(x)
-        elif self.dist_name.lower() == 'inv_gauss':
-            return stats.invgauss.fit(x)
-        elif self.dist_name.lower() == 'logistic':
-            return stats.logistic.fit(x)
-        elif self.dist_name.lower() == 'pareto':
-            return stats.pareto.fit(x)
-        elif self.dist_name.lower() == 'rayleigh':
-            return stats.rayleigh.fit(x)
-        elif self.dist_name.lower() == 'levy':
-            return stats.levy.fit(x)
-        elif self.dist_name.lower() == 'laplace':
-            return stats.laplace.fit(x)
-        elif self.dist_name.lower() == 'maxwell':
-            return stats.maxwell.fit(x)
-        elif self.dist_name.lower() == 'truncnorm':
-            return stats.truncnorm.fit(x)
-        elif self.dist_name.lower() == 'mvnormal':
-            raise AttributeError('Method fit not defined for mvnormal distribution.')
+        return self._function('fit')(x)
+
+    def moments(self, params):
+        return self._function('moments')(params)
+
+
+_custom_methods = ['pdf', 'cdf', 'icdf', 'rvs', 'log_pdf', 'fit', 'moments']
+
+
+def register_distribution(dist_name, pdf=None, cdf=None, icdf=None, rvs=None, log_pdf=None, fit=None, moments=None):
+    """
+        Description:
+
+            Register a user-defined distribution given by python functions, so that it can be used by name in
+            Distribution and in all UQpy classes which take a distribution name (e.g. dist_name of MCS, pdf_target of
+            MCMC), without writing a python script dist_name.py. Registering a distribution again with the same name
+            replaces it.
+
+        Input:
+            :param dist_name: Name of the distribution. It must not be the name of a distribution supported by UQpy.
+            :type: dist_name: string
+
+            :param pdf, cdf, icdf, log_pdf: Functions with signature f(x, params), where params is the list of
+            parameters of the distribution.
+            :type: pdf, cdf, icdf, log_pdf: callable
+
+            :param rvs: Function with signature rvs(params, nsamples).
+            :type: rvs: callable
+
+            :param fit: Function with signature fit(x).
+            :type: fit: callable
+
+            :param moments: Function with signature moments(params).
+            :type: moments: callable
+
+        Output:
+            The methods of the distribution which are not given raise an AttributeError when they are called.
+    """
+    if not isinstance(dist_name, str):
+        raise ValueError('UQpy error: dist_name must be a string.')
+    if isinstance(_distributions.get(dist_name.lower()), _ScipyDistribution):
+        raise ValueError('UQpy error: ' + dist_name + ' is a distribution supported by UQpy.')
+    functions = dict(zip(_custom_methods, [pdf, cdf, icdf, rvs, log_pdf, fit, moments]))
+    for method, function in functions.items():
+        if function is not None and not callable(function):
+            raise ValueError('UQpy error: ' + method + ' must be callable.')
+    _distributions[dist_name.lower()] = _CustomDistribution(dist_name, functions)
+
+
+def _load_module_distribution(dist_name):
+    """
+        Import the python script dist_name.py of a user-defined distribution, see SubDistribution
+    """
+    file_name = os.path.join(dist_name + '.py')
+    if os.path.isfile(file_name):
+        import importlib
+        custom_dist = importlib.import_module(dist_name)
+    else:
+        raise FileExistsError()
+    functions = dict()
+    for method in _custom_methods:
+        functions[method] = getattr(custom_dist, method, None)
+    return _CustomDistribution(dist_name, functions)
+
+
+# Registry of the distributions supported by UQpy, by lower case name
+_distributions = dict()
+
+
+def _register_scipy(names, dist, param_names, fixed=None, undefined=None, multivariate=False):
+    implementation = _ScipyDistribution(names[0], dist, param_names, fixed, undefined, multivariate)
+    for name in names:
+        _distributions[name] = implementation
+
+
+_register_scipy(['normal', 'gaussian'], stats.norm, ('loc', 'scale'))
+_register_scipy(['uniform'], stats.uniform, ('loc', 'scale'))
+_register_scipy(['binomial'], stats.binom, ('n', 'p'))
+_register_scipy(['beta'], stats.beta, ('a', 'b'))
+_register_scipy(['gumbel_r'], stats.genextreme, ('loc', 'scale'), fixed={'c': 0})
+_register_scipy(['chisquare'], stats.chi2, ('df', 'loc', 'scale'))
+_register_scipy(['lognormal'], stats.lognorm, ('s', 'loc', 'scale'))
+_register_scipy(['gamma'], stats.gamma, ('a', 'loc', 'scale'))
+_register_scipy(['exponential'], stats.expon, ('loc', 'scale'))
+_register_scipy(['cauchy'], stats.cauchy, ('loc', 'scale'))
+_register_scipy(['inv_gauss'], stats.invgauss, ('mu', 'loc', 'scale'))
+_register_scipy(['logistic'], stats.logistic, ('loc', 'scale'))
+_register_scipy(['pareto'], stats.pareto, ('b', 'loc', 'scale'))
+_register_scipy(['rayleigh'], stats.rayleigh, ('loc', 'scale'))
+_register_scipy(['levy'], stats.levy, ('loc', 'scale'))
+_register_scipy(['laplace'], stats.laplace, ('loc', 'scale'))
+_register_scipy(['maxwell'], stats.maxwell, ('loc', 'scale'))
+_register_scipy(['truncnorm'], stats.truncnorm, ('a', 'b', 'loc', 'scale'))
+_register_scipy(['mvnormal'], stats.multivariate_normal, ('mean', 'cov'),
+                undefined={'icdf': ValueError, 'fit': AttributeError, 'moments': AttributeError}, multivariate=True)
+
+
+# User-defined distributions given by python scripts, by name, imported once
+_module_distributions = dict()
+
+
+def _get_implementation(dist_name):
+    """
+        Return the implementation of a distribution: a distribution of the registry (see register_distribution), or
+        else a user-defined distribution given by the python script dist_name.py, which is imported only once
+    """
+    implementation = _distributions.get(dist_name.lower())
+    if implementation is None:
+        implementation = _module_distributions.get(dist_name)
+    if implementation is None:
+        implementation = _load_module_distribution(dist_name)
+        _module_distributions[dist_name] = implementation
+    return implementation
+
+
+def _group_marginals(marginals, consecutive=False):
+    """
+        Group the marginals of a Distribution which have the same univariate scipy.stats distribution, so that they are
+        evaluated in one call. If consecutive = True, only consecutive marginals are grouped.
+        Returns a list of pairs (implementation, columns), where implementation is None for a marginal evaluated alone.
+    """
+    groups = []
+    for i, marginal in enumerate(marginals):
+        implementation = marginal.implementation
+        if not isinstance(implementation, _ScipyDistribution) or implementation.multivariate:
+            groups.append((None, [i]))
+            continue
+        candidates = groups[-1:] if consecutive else groups
+        for group_implementation, columns in candidates:
+            if group_implementation is implementation:
+                columns.append(i)
+                break
         else:
-            file_name = os.path.join(self.dist_name + '.py')
-            if os.path.isfile(file_name):
-                import importlib
-                custom_dist = importlib.import_module(self.dist_name)
-            else:
-                raise FileExistsError()
+            groups.append((implementation, [i]))
+    return groups
 
-            tmp = getattr(custom_dist, 'fit', None)
-            if tmp is None:
-                raise AttributeError('Method fit not defined for distribution '+self.dist_name+'.')
-            else:
-                return tmp(x)
 
-    def moments(self, params):
-        y = [np.nan, np.nan, np.nan, np.nan]
-        if self.dist_name.lower() == 'normal' or self.dist_name.lower() == 'gaussian':
-            mean, var, skew, kurt = stats.norm.stats(scale=params[1],
-                                                     loc=params[0], moments='mvsk')
-        elif self.dist_name.lower() == 'uniform':
-            mean, var, skew, kurt = stats.uniform.stats(scale=params[1],
-                                                        loc=params[0], moments='mvsk')
-        elif self.dist_name.lower() == 'binomial':
-            mean, var, skew, kurt = stats.binom.stats(n=params[0],
-                                                      p=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'beta':
-            mean, var, skew, kurt = stats.beta.stats(a=params[0],
-                                                     b=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'gumbel_r':
-            mean, var, skew, kurt = stats.genextreme.stats(c=0, scale=params[1],
-                                                           loc=params[0], moments='mvsk')
-        elif self.dist_name.lower() == 'chisquare':
-            mean, var, skew, kurt = stats.chi2.stats(df=params[0], loc=params[1], scale=params[2],
-                                                     moments='mvsk')
-        elif self.dist_name.lower() == 'lognormal':
-            mean, var, skew, kurt = stats.lognorm.stats(s=params[0], loc=params[1], scale=params[2],
-                                                        moments='mvsk')
-        elif self.dist_name.lower() == 'gamma':
-            mean, var, skew, kurt = stats.gamma.stats(a=params[0], loc=params[1], scale=params[2],
-                                                      moments='mvsk')
-        elif self.dist_name.lower() == 'exponential':
-            mean, var, skew, kurt = stats.expon.stats(loc=params[0], scale=params[1],
-                                                      moments='mvsk')
-        elif self.dist_name.lower() == 'cauchy':
-            mean, var, skew, kurt = stats.cauchy.stats(loc=params[0], scale=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'inv_gauss':
-            mean, var, skew, kurt = stats.invgauss.stats(mu=params[0], loc=params[1], scale=params[2],
-                                                         moments='mvsk')
-        elif self.dist_name.lower() == 'logistic':
-            mean, var, skew, kurt = stats.logistic.stats(loc=params[0], scale=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'pareto':
-            mean, var, skew, kurt = stats.pareto.stats(b=params[0], loc=params[1], scale=params[2],
-                                                       moments='mvsk')
-        elif self.dist_name.lower() == 'rayleigh':
-            mean, var, skew, kurt = stats.rayleigh.stats(loc=params[0], scale=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'levy':
-            mean, var, skew, kurt = stats.levy.stats(loc=params[0], scale=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'laplace':
-            mean, var, skew, kurt = stats.laplace.stats(loc=params[0], scale=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'maxwell':
-            mean, var, skew, kurt = stats.maxwell.stats(loc=params[0], scale=params[1], moments='mvsk')
-        elif self.dist_name.lower() == 'truncnorm':
-            mean, var, skew, kurt = stats.truncnorm.stats(a=params[0], b=params[1], loc=params[2], scale=params[3],
-                                                          moments='mvsk')
-        elif self.dist_name.lower() == 'mvnormal':
-            raise AttributeError('Method moments not defined for mvnormal distribution.')
+# LRU cache of the frozen scipy.stats distributions, by distribution and parameters
+FROZEN_CACHE_SIZE = 256
+_frozen_cache = collections.OrderedDict()
+_frozen_cache_lock = threading.Lock()
+
+
+def _params_key(params):
+    """
+        Return a hashable key identifying the values of the parameters of a distribution
+    """
+    key = tuple(params)
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        pass
+    # Some parameters are arrays, e.g. the mean and covariance of mvnormal
+    key = []
+    for param in params:
+        if np.ndim(param) == 0:
+            key.append(np.asarray(param).item())
         else:
-            file_name = os.path.join(self.dist_name + '.py')
-            if os.path.isfile(file_name):
-                import importlib
-                custom_dist = importlib.import_module(self.dist_name)
-            else:
-                raise FileExistsError()
+            array = np.ascontiguousarray(param)
+            key.append((array.dtype.str, array.shape, array.tobytes()))
+    return tuple(key)
 
-            tmp = getattr(custom_dist, 'moments', None)
-            if tmp is None:
-                raise AttributeError('Method moments not defined for distribution '+self.dist_name+'.')
-            else:
-                return tmp(params)
 
-        y[0] = mean
-        y[1] = var
-        y[2] = skew
-        y[3] = kurt
-        return np.array(y)
+def _freeze(implementation, params):
+    """
+        Return the scipy.stats distribution of a _ScipyDistribution frozen with the parameters params, from the cache
+        of frozen distributions if possible. At most FROZEN_CACHE_SIZE frozen distributions are kept, the least
+        recently used one being removed first.
+    """
+    key = (implementation.name, _params_key(params))
+    with _frozen_cache_lock:
+        frozen = _frozen_cache.get(key)
+        if frozen is not None:
+            _frozen_cache.move_to_end(key)
+            return frozen
+    kwargs = dict(zip(implementation.param_names, params))
+    kwargs.update(implementation.fixed)
+    frozen = implementation.dist(**kwargs)
+    with _frozen_cache_lock:
+        _frozen_cache[key] = frozen
+        while len(_frozen_cache) > FROZEN_CACHE_SIZE:
+            _frozen_cache.popitem(last=False)
+    return frozen
@@ -17,7 +17,7 @@
 
 """This module contains functionality for all the reliability methods supported in UQpy."""
 
-from UQpy.RunModel import RunModel
+from UQpy.RunModel import RunModel, EvaluationCache
 from UQpy.SampleMethods import MCMC
 from UQpy.Transformations import *
 
@@ -58,6 +58,13 @@ class SubsetSimulation:
             :param model_script, model_object_name, input_template, var_names, output_script, output_object_name,
                        ntasks, cores_per_task, nodes, resume, verbose, model_dir, cluster: See RunModel class.
 
+            :param deduplicate, cache: See RunModel class. The model is evaluated with a single RunModel object across
+                       the conditional levels. With algorithm = 'MMH', the new states of all the Markov chains at each
+                       step are evaluated together, so that with deduplicate = True the chains which are in the same
+                       state and reject their proposals are evaluated only once. With a cache, the rejected proposals,
+                       which repeat a state evaluated before, are not evaluated again.
+                       Default: deduplicate = False, cache = None
+
     Output:
 
     :return self.pf: Probability of failure estimate
@@ -77,7 +84,7 @@ class SubsetSimulation:
                  algorithm='MH', jump=1, nsamples_ss=None, nburn=0, samples_init=None, p_cond=None,
                  verbose=False,  model_script=None, model_object_name=None, input_template=None, var_names=None,
                  output_script=None, output_object_name=None, n_tasks=1, cores_per_task=1, nodes=1, resume=False,
-                 model_dir=None, cluster=False):
+                 model_dir=None, cluster=False, deduplicate=False, cache=None):
 
         self.dimension = dimension
         self.log_pdf_target = log_pdf_target
@@ -107,6 +114,8 @@ class SubsetSimulation:
         self.cores_per_task = cores_per_task
         self.nodes = nodes
         self.resume = resume
+        self.deduplicate = deduplicate
+        self.cache = cache
         self.p_cond = p_cond
         self.g = list()
         self.samples = list()
@@ -151,15 +160,17 @@ class SubsetSimulation:
         else:
             self.samples.append(self.samples_init)
 
-        g_init = RunModel(samples=self.samples[step], model_script=self.model_script,
-                          model_object_name=self.model_object_name,
-                          input_template=self.input_template, var_names=self.var_names,
-                          output_script=self.output_script,
-                          output_object_name=self.output_object_name,
-                          ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes, resume=self.resume,
-                          verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster)
-
-        self.g.append(np.asarray(g_init.qoi_list).reshape(-1,))
+        # The same RunModel evaluates all the levels, see deduplicate and cache
+        g_model = RunModel(samples=self.samples[step], model_script=self.model_script,
+                           model_object_name=self.model_object_name,
+                           input_template=self.input_template, var_names=self.var_names,
+                           output_script=self.output_script,
+                           output_object_name=self.output_object_name,
+                           ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes,
+                           resume=self.resume, verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster,
+                           deduplicate=self.deduplicate, cache=self.cache)
+
+        self.g.append(np.asarray(g_model.qoi_list).reshape(-1,))
         g_ind = np.argsort(self.g[step])
         self.g_level.append(self.g[step][g_ind[n_keep]])
 
@@ -174,38 +185,36 @@ class SubsetSimulation:
             self.samples.append(self.samples[step - 1][g_ind[0:n_keep], :])
             self.g.append(self.g[step - 1][g_ind[:n_keep]])
 
-            for i in range(self.nsamples_ss-n_keep):
-                x0 = self.samples[step][i]
-
-                x_mcmc = MCMC(dimension=self.dimension, pdf_proposal_type=self.pdf_proposal_type,
-                              pdf_proposal_scale=self.pdf_proposal_scale, pdf_target=self.pdf_target,
-                              log_pdf_target=self.log_pdf_target, pdf_target_params=self.pdf_target_params,
-                              pdf_target_copula=self.pdf_target_copula,
-                              pdf_target_copula_params=self.pdf_target_copula_params,
-                              pdf_target_type=self.pdf_target_type,
-                              algorithm= self.algorithm, jump=self.jump, nsamples=2, seed=x0,
-                              nburn=self.nburn, verbose=self.verbose)
-
-                x_temp = x_mcmc.samples[1].reshape((1, self.dimension))
-
-                g_model = RunModel(samples=x_temp, model_script=self.model_script,
-                                   model_object_name=self.model_object_name,
-                                   input_template=self.input_template, var_names=self.var_names,
-                                   output_script=self.output_script,
-                                   output_object_name=self.output_object_name,
-                                   ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes,
-                                   resume=self.resume,
-                                   verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster)
-
-                g_temp = g_model.qoi_list
-
-                # Accept or reject the sample
-                if g_temp < self.g_level[step - 1]:
-                    self.samples[step] = np.vstack((self.samples[step], x_temp))
-                    self.g[step] = np.hstack((self.g[step], g_temp[0]))
-                else:
-                    self.samples[step] = np.vstack((self.samples[step], self.samples[step][i]))
-                    self.g[step] = np.hstack((self.g[step], self.g[step][i]))
+            # The chains are advanced together: the new states of all the chains at each step of the chains only depend
+            # on the previous states, so they are evaluated with a single call of the model
+            for start in range(0, self.nsamples_ss - n_keep, n_keep):
+                chains = range(start, min(start + n_keep, self.nsamples_ss - n_keep))
+                x_temp = np.zeros((len(chains), self.dimension))
+                for k, i in enumerate(chains):
+                    x0 = self.samples[step][i]
+
+                    x_mcmc = MCMC(dimension=self.dimension, pdf_proposal_type=self.pdf_proposal_type,
+                                  pdf_proposal_scale=self.pdf_proposal_scale, pdf_target=self.pdf_target,
+                                  log_pdf_target=self.log_pdf_target, pdf_target_params=self.pdf_target_params,
+                                  pdf_target_copula=self.pdf_target_copula,
+                                  pdf_target_copula_params=self.pdf_target_copula_params,
+                                  pdf_target_type=self.pdf_target_type,
+                                  algorithm= self.algorithm, jump=self.jump, nsamples=2, seed=x0,
+                                  nburn=self.nburn, verbose=self.verbose)
+
+                    x_temp[k] = x_mcmc.samples[1]
+
+                g_model.run(x_temp)
+                g_temp = g_model.qoi_list[-len(chains):]
+
+                for k, i in enumerate(chains):
+                    # Accept or reject the sample
+                    if g_temp[k] < self.g_level[step - 1]:
+                        self.samples[step] = np.vstack((self.samples[step], x_temp[k]))
+                        self.g[step] = np.hstack((self.g[step], g_temp[k]))
+                    else:
+                        self.samples[step] = np.vstack((self.samples[step], self.samples[step][i]))
+                        self.g[step] = np.hstack((self.g[step], self.g[step][i]))
 
             g_ind = np.argsort(self.g[step])
             self.g_level.append(self.g[step][g_ind[n_keep]])
@@ -241,15 +250,17 @@ class SubsetSimulation:
         else:
             self.samples.append(self.samples_init)
 
-        g_init = RunModel(samples=self.samples[step], model_script=self.model_script,
-                          model_object_name=self.model_object_name,
-                          input_template=self.input_template, var_names=self.var_names,
-                          output_script=self.output_script,
-                          output_object_name=self.output_object_name,
-                          ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes, resume=self.resume,
-                          verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster)
-
-        self.g.append(np.asarray(g_init.qoi_list))
+        # The same RunModel evaluates all the levels, see deduplicate and cache
+        g_model = RunModel(samples=self.samples[step], model_script=self.model_script,
+                           model_object_name=self.model_object_name,
+                           input_template=self.input_template, var_names=self.var_names,
+                           output_script=self.output_script,
+                           output_object_name=self.output_object_name,
+                           ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes,
+                           resume=self.resume, verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster,
+                           deduplicate=self.deduplicate, cache=self.cache)
+
+        self.g.append(np.asarray(g_model.qoi_list))
         g_ind = np.argsort(self.g[step])
         self.g_level.append(self.g[step][g_ind[n_keep]])
 
@@ -278,16 +289,8 @@ class SubsetSimulation:
                               nburn=self.nburn, verbose=self.verbose)
 
                 x_temp = x_mcmc.samples[n_keep].reshape((1, self.dimension))
-                g_model = RunModel(samples=x_temp, model_script=self.model_script,
-                                   model_object_name=self.model_object_name,
-                                   input_template=self.input_template, var_names=self.var_names,
-                                   output_script=self.output_script,
-                                   output_object_name=self.output_object_name,
-                                   ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes,
-                                   resume=self.resume,
-                                   verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster)
-
-                g_temp = g_model.qoi_list
+                g_model.run(x_temp)
+                g_temp = g_model.qoi_list[-1:]
 
                 # Accept or reject the sample
                 if g_temp < self.g_level[step - 1]:
@@ -733,6 +736,14 @@ class TaylorSeries:
         x = np.zeros_like(u)
         beta = np.zeros(max_iter)
         converge_ = False
+        # The limit state function is evaluated at x[k] both directly and for its gradient
+        cache = EvaluationCache()
+        g = RunModel(model_script=self.model_script,
+                     model_object_name=self.model_object_name,
+                     input_template=self.input_template, var_names=self.var_names, output_script=self.output_script,
+                     output_object_name=self.output_object_name,
+                     ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes, resume=self.resume,
+                     verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster, cache=cache)
 
         for k in range(max_iter):
             # transform the initial point in the original space:  U to X
@@ -743,12 +754,7 @@ class TaylorSeries:
             jacobian = u_x.jacobian[0]
             # 1. evaluate Limit State Function at point
 
-            g = RunModel(samples=x[k, :].reshape(1, -1), model_script=self.model_script,
-                         model_object_name=self.model_object_name,
-                         input_template=self.input_template, var_names=self.var_names, output_script=self.output_script,
-                         output_object_name=self.output_object_name,
-                         ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes, resume=self.resume,
-                         verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster)
+            g.run(x[k, :].reshape(1, -1))
 
             # 2. evaluate Limit State Function gradient at point u_k and direction cosines
             dg = gradient(sample=x[k, :].reshape(1, -1), dimension=self.dimension, eps=0.1,
@@ -758,7 +764,8 @@ class TaylorSeries:
                           output_script=self.output_script,
                           output_object_name=self.output_object_name,
                           ntasks=self.n_tasks, cores_per_task=self.cores_per_task, nodes=self.nodes, resume=self.resume,
-                          verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster, order='second')
+                          verbose=self.verbose, model_dir=self.model_dir, cluster=self.cluster, order='second',
+                          cache=cache)
             try:
                 p = np.linalg.solve(jacobian, dg[0, :])
             except:
@@ -806,7 +813,7 @@ class TaylorSeries:
             alpha = p / norm_grad
             alpha = alpha.squeeze()
             # 3. calculate first order beta
-            beta[k + 1] = -np.inner(u[k, :].T, alpha) + g.qoi_list[0] / norm_grad
+            beta[k + 1] = -np.inner(u[k, :].T, alpha) + g.qoi_list[-1] / norm_grad
             #-np.inner(u[k, :].T, alpha) + g.qoi_list[0] / norm_grad
             # 4. calculate u_{k+1}
             u[k + 1, :] = -beta[k + 1] * alpha
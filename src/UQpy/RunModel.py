@@ -17,14 +17,33 @@
 
 
 import os
+import copy
 import subprocess
 import pathlib
 import re
 import collections
+import collections.abc
 import numpy as np
 import datetime
 import shutil
 import platform
+import atexit
+import multiprocessing as mp
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+import concurrent.futures
+import asyncio
+import functools
+import queue
+import contextlib
+import itertools
+import socket
+import struct
+import sys
+import tempfile
 
 
 class RunModel:
@@ -42,6 +61,9 @@ class RunModel:
     If an ndarray is passed, each row of the ndarray contains one set of samples required for one execution of the
     model. (The first dimension of the ndarray is considered to be the number of rows.)
     If a list is passed, each item of the list contains one set of samples required for one execution of the model.
+    If samples = None, RunModel is only initialized and the model is not run. Samples can then be passed to the
+    iter_results method, which yields the quantities of interest as the evaluations finish, or to the asynchronous
+    run_async method.
     :type samples: ndarray or list
 
     :param model_script: The filename (with extension) of the Python script which contains commands to execute the
@@ -90,8 +112,8 @@ class RunModel:
     :param ntasks: Number of tasks to be run in parallel.
     By default, ntasks = 1 and the models are executed serially. Setting ntasks equal to a positive integer greater than
     1 will trigger the parallel workflow.
-    RunModel uses GNU parallel to execute models which require an input template in parallel and the concurrent module
-    to execute Python models in parallel.
+    RunModel uses the scheduler specified by scheduler to execute models which require an input template in parallel
+    and the worker processes or threads of an executor to execute Python models in parallel (see executor and backend).
     :type ntasks: int
 
     :param cores_per_task: Number of cores to be used by each task.
@@ -110,8 +132,9 @@ class RunModel:
 
     :type nodes: int
 
-    :param resume: If resume = True, GNU parallel enables UQpy to resume execution of any model evaluations that failed
-    to execute in the third-party software model workflow.
+    :param resume: If resume = True, the scheduler enables UQpy to resume execution of any model evaluations that failed
+    to execute in the third-party software model workflow. Both schedulers record the completed runs in the job log
+    logs/runtask.log and skip the runs which are already listed there.
     To use this feature, execute the same call to RunModel which failed to complete but with resume = True.  The same
     set of samples must be passed to resume processing from the last successful execution of the model.
     resume is not used in the Python model workflow.
@@ -126,6 +149,11 @@ class RunModel:
     model_dir = None by default, which results in model execution from the Python current working directory. If
     model_dir is passed a string, then a new directory is created by RunModel within the current directory whose name is
     model_dir appended with a timestamp.
+    RunModel never changes the current working directory of the Python process, so that several RunModel instances can
+    run concurrently, e.g. from different threads. All files are written using explicit paths, and the model runs and
+    output scripts are executed from their directories in subprocesses or in the worker processes of the executor. In
+    the Python model workflow, if model_dir is given, the model is therefore always executed by the worker processes of
+    the executor (even if ntasks = 1).
     :type model_dir: str
 
     :param cluster: Set cluster = True if executing on an HPC cluster. Setting cluster = True enables RunModel to
@@ -142,17 +170,191 @@ class RunModel:
     fmt = 'ls-dyna': This format is used for ls-dyna .k files where each card is required to be exactly 10 characters
     :type fmt: String
 
+    :param executor: An Executor which executes the Python model, i.e. one of SerialExecutor, ThreadExecutor,
+    ProcessExecutor, SubprocessExecutor, RemoteExecutor or any class implementing the protocol described in Executor.
+    If an executor is passed, the Python model is always executed by the executor, in blocks of samples (see
+    chunk_size). Passing the same ProcessExecutor to repeated RunModel calls reuses its workers, so that the model
+    module is imported only once per worker.
+    In the parallel third-party software model workflow, output_script is executed in the directory of each model run
+    by the executor if it is isolated (see Executor), and by a ProcessExecutor otherwise, so that the output of a run is
+    collected as soon as it finishes, while the other runs execute.
+    executor = None by default, in which case RunModel uses an executor of the type given by backend with ntasks
+    workers, which is shared by all RunModel calls of the Python session with the same backend and ntasks.
+    :type executor: Executor
+
+    :param backend: The type of workers used to execute a Python model in parallel when no executor is passed.
+    backend = 'processes' (the default) uses worker processes (see ProcessExecutor).
+    backend = 'threads' uses threads of the Python process (see ThreadExecutor), which share the imported model object
+    and avoid pickling the samples and quantities of interest. This is preferable for models which release the global
+    interpreter lock, e.g. thin wrappers around NumPy/SciPy solvers or compiled extensions. Since the threads share the
+    current working directory of the process, backend = 'threads' cannot be combined with model_dir.
+    backend is not used in the third-party software model workflow, whose output scripts are always executed by worker
+    processes.
+    :type backend: str
+
+    :param hook: A function called with the record of each model evaluation (see RunModel.records) as soon as the
+    evaluation is finished and its output is collected.
+    hook = None by default.
+    :type hook: callable
+
+    :param timeout: Maximum wall-clock time, in seconds, of each model run in the third-party software model workflow.
+    A run which exceeds the timeout is killed and is considered failed.
+    timeout = None by default, in which case the runs are not limited in time.
+    timeout is not used in the Python model workflow, where the model cannot be interrupted safely.
+    :type timeout: float
+
+    :param retries: Number of times a failed evaluation is attempted again before applying on_failure. An evaluation
+    fails if the Python model raises an exception or, in the third-party software model workflow, if the model run
+    exceeds the timeout or the output script raises an exception (the exit code of the model run is only recorded).
+    With the GNU parallel scheduler, timed out runs are attempted again by GNU parallel.
+    retries = 0 by default.
+    :type retries: int
+
+    :param retry_delay: Delay in seconds before the first new attempt of a failed evaluation. The delay is doubled
+    before each following attempt.
+    retry_delay = 1 by default.
+    :type retry_delay: float
+
+    :param on_failure: What to do with an evaluation which still fails after the retries.
+    on_failure = 'raise' (the default) raises the exception of the failed evaluation, which stops the execution.
+    on_failure = 'nan' sets the quantity of interest of the sample to numpy.nan and continues with the other samples.
+    In both cases the simulation number of the sample is added to RunModel.failed. Failed evaluations are not stored in
+    the cache or journal.
+    :type on_failure: str
+
+    :param vectorized: Set vectorized = True if the Python model is vectorized, i.e. if it accepts a two-dimensional
+    ndarray whose rows are samples and returns one quantity of interest per row (as an ndarray or list of length equal
+    to the number of rows). The model is then called once per block of chunk_size samples instead of once per sample.
+    If ntasks > 1, the blocks are evaluated in parallel by the worker processes.
+    vectorized = False by default.
+    vectorized is not used in the third-party software model workflow.
+    :type vectorized: Boolean
+
+    :param chunk_size: Number of samples in each block of samples.
+    If vectorized = True, chunk_size is the number of samples passed to the model in each call. If ntasks > 1, each
+    worker process receives one block of chunk_size contiguous samples at a time (as an ndarray if samples is an
+    ndarray) and returns the quantities of interest of the whole block, which reduces the communication overhead for
+    fast models.
+    chunk_size = None by default, in which case all samples form a single block in the serial vectorized execution, and
+    the samples are split in about four blocks per worker in the parallel execution.
+    chunk_size is not used in the third-party software model workflow.
+    :type chunk_size: int
+
+    :param shared_memory: Set shared_memory = True to exchange the samples and the quantities of interest with the
+    worker processes through shared memory instead of sending them through pipes, which avoids pickling and copying
+    large samples and array-valued quantities of interest. The samples to evaluate are copied once into a shared array
+    from which the workers read their blocks of samples. Once the first quantity of interest which is an ndarray of
+    numbers is received, a shared result array is allocated, and the workers write the quantities of interest with the
+    same shape and dtype in it (the other quantities of interest, and those of the blocks submitted before, are sent
+    through pipes).
+    shared_memory = False by default.
+    shared_memory is only used in the parallel execution of Python models by worker processes of the same computer
+    (backend = 'processes' or a ProcessExecutor), when samples is an ndarray of numbers.
+    :type shared_memory: Boolean
+
+    :param cache: An EvaluationCache in which the model evaluations are stored. Before running the model, RunModel looks
+    up each sample in the cache and only evaluates the model at the samples which are not found. Passing the same cache
+    to repeated RunModel calls ensures that the model is never evaluated twice at the same sample. Samples are
+    identified by their values together with the names of the model script and model object (and of the template input
+    file and output script in the third-party software model workflow).
+    cache = None by default, in which case all samples are evaluated.
+    :type cache: EvaluationCache
+
+    :param journal: Name of a journal file in which each model evaluation is recorded as soon as it finishes, together
+    with its simulation number and a hash of the sample (see RunJournal). If the journal file already exists, the
+    evaluations recorded in it are reused: RunModel only evaluates the model at the samples whose simulation number and
+    sample hash are not found in the journal. To resume a batch of evaluations that was interrupted (e.g. by a crash or
+    the preemption of a compute node), execute the same call to RunModel with the same samples and journal file.
+    journal = None by default, in which case no journal is written.
+    :type journal: str
+
+    :param deduplicate: Set deduplicate = True to evaluate the model only once at samples which are repeated in a
+    batch of samples (e.g. the repeated points of a centered LHS, or the Markov chains of SubsetSimulation which
+    reject their proposals from the same state). The quantity of interest of the first occurrence of each sample is
+    copied to the other occurrences, which have no record in RunModel.records. The model must therefore be
+    deterministic.
+    deduplicate = False by default, in which case all samples are evaluated.
+    :type deduplicate: Boolean
+
+    :param dedup_tol: Tolerance used to detect repeated samples if deduplicate = True. Two samples are considered equal
+    if the absolute differences between all their values are smaller than or equal to dedup_tol.
+    dedup_tol = 0 by default, in which case only identical samples are considered equal. dedup_tol > 0 requires samples
+    with numerical values of the same shape.
+    :type dedup_tol: float
+
+    :param staging: Specifies how the files of the current working directory are made available in the directory of
+    each model run (and in model_dir) in the third-party software model workflow.
+    staging = 'copy' (the default) copies all files and folders.
+    staging = 'symlink' creates symbolic links to the files and folders instead, and staging = 'hardlink' creates hard
+    links to the files (folders are recreated with hard links to the files they contain; files which cannot be hard
+    linked, e.g. across file systems, are copied). Linking costs the same regardless of the size of the files, which
+    saves a lot of input/output for large model files, but a model which modifies a linked file modifies the original
+    file. Files that the model modifies must therefore be listed in copy_files.
+    staging is not used in the Python model workflow.
+    :type staging: str
+
+    :param copy_files: Names of the files and folders of the current working directory which are always copied into
+    the directory of each model run, whatever the staging option.
+    copy_files = None by default.
+    :type copy_files: list of str
+
+    :param model_files: Names of the files and folders of the current working directory which are staged in the
+    directory of each model run and in model_dir (see staging), in addition to the model script, template input file
+    and output script, which are always staged. List the files the model depends on (e.g. meshes or executables) to
+    avoid staging the whole working directory.
+    model_files = None by default, in which case all files and folders of the current working directory are staged,
+    except the outputs of previous executions of RunModel: the model run directories and model_dir directories (whose
+    names end with a timestamp), the logs folder of the job log, the journal file and __pycache__. In both cases, the
+    working directory is only listed when files are first staged, so that the Python model workflow without model_dir
+    never lists it.
+    :type model_files: list of str
+
+    :param scheduler: The scheduler used to execute the model runs in parallel in the third-party software model
+    workflow.
+    scheduler = 'local' (the default) uses a scheduler built into RunModel, which keeps ntasks runs executing at all
+    times.
+    scheduler = 'parallel' uses GNU parallel, which must be installed.
+    With both schedulers, each run is executed through srun if cluster = True, and a job log is written in
+    logs/runtask.log in the GNU parallel format. The exit code, start time and run time of each run are also saved in
+    RunModel.job_log.
+    scheduler is not used in the Python model workflow.
+    :type scheduler: str
+
     Output:
     :return: RunModel.qoi_list: A list containing the output quantities of interest extracted from the model output
     files by output_script. This is a list of length equal to the number of simulations. Each item of this list contains
     the quantity of interest from the associated simulation.
     :rtype: RunModel.qoi_list: list
+
+    :return: RunModel.job_log: A list containing one dictionary per model run executed in the third-party software model
+    workflow, with keys 'index' (the simulation number), 'exit_code' (negative if the run was terminated by a signal),
+    'start_time' (in seconds since the epoch), 'runtime' (in seconds) and 'command'.
+    :rtype: RunModel.job_log: list
+
+    :return: RunModel.records: A list containing one dictionary per model evaluation, in the order in which the
+    evaluations finish (samples found in the cache or in the journal have no record). Each record has the keys 'index'
+    (the simulation number), 'worker' (the process id and thread name of the worker which executed the evaluation, or
+    which launched the model run), 'exit_code' and 'max_rss' (the exit code and the peak resident memory, in kilobytes,
+    of the model run in the third-party software model workflow, None otherwise; the operating system may count the
+    memory of the Python process which launches the run in max_rss), 'attempts' (see retries), and one key per phase
+    of the evaluation: 'stage' (copying or linking the model files), 'input' (rendering and writing the input file),
+    'solve' (executing the model), 'output' (executing output_script) and 'cleanup' (removing the model files). Each
+    phase is given as a tuple (start time, end time) in seconds since the epoch, or None if the phase was not
+    performed. The records can be used, e.g., to choose ntasks and cores_per_task.
+    :rtype: RunModel.records: list
+
+    :return: RunModel.failed: A list containing the simulation numbers of the samples whose evaluation failed (see
+    on_failure).
+    :rtype: RunModel.failed: list
     """
 
     def __init__(self, samples=None, model_script=None, model_object_name=None,
                  input_template=None, var_names=None, output_script=None, output_object_name=None,
                  ntasks=1, cores_per_task=1, nodes=1, resume=False, verbose=False, model_dir=None,
-                 cluster=False, fmt=None):
+                 cluster=False, fmt=None, executor=None, vectorized=False, chunk_size=None, cache=None,
+                 staging='copy', copy_files=None, model_files=None, scheduler='local', journal=None,
+                 backend='processes', hook=None, timeout=None, retries=0, retry_delay=1., on_failure='raise',
+                 deduplicate=False, dedup_tol=0., shared_memory=False):
 
         # Check the platform and build appropriate call to Python
         if platform.system() in ['Windows']:
@@ -167,12 +369,16 @@ class RunModel:
 
         # Check if samples are provided
         if samples is None:
-            raise ValueError('Samples must be provided as input to RunModel.')
+            self.samples = None
+            self.nsim = 0
         elif isinstance(samples, (list, np.ndarray)):
             self.samples = samples
             self.nsim = len(self.samples)  # This assumes that the number of rows is the number of simulations.
         else:
             raise ValueError("Samples must be passed as a list or numpy ndarray")
+        # The samples built by run, and the array they are a view of, see _append_samples
+        self._samples_owned = None
+        self._samples_storage = None
 
         # # Check if fixed params are passed in
         # self.fixed_params = fixed_params
@@ -192,45 +398,37 @@ class RunModel:
                 self.n_vars = len(self.var_names)
             else:
                 raise ValueError("Variable names should be passed as a list of strings.")
-        elif self.input_template is not None:
-            # If var_names is not passed and there is an input template, create default variable names
-            nvars = samples[0].shape[0]
-            self.var_names = []
-            for i in range(nvars):
-                self.var_names.append('x%d' % i)
+        self.template = None
+
+        # Staging of the model files in the run directories
+        if staging not in ['copy', 'symlink', 'hardlink']:
+            raise ValueError("staging must be 'copy', 'symlink' or 'hardlink'.")
+        self.staging = staging
+        if copy_files is None:
+            self.copy_files = []
+        elif self._is_list_of_strings(copy_files):
+            self.copy_files = copy_files
+        else:
+            raise ValueError("copy_files should be passed as a list of strings.")
+        if model_files is not None and not (model_files == [] or self._is_list_of_strings(model_files)):
+            raise ValueError("model_files should be passed as a list of strings.")
+        self._model_file_names = model_files
+        self.model_files = None
+
+        # Parallel backend of the Python model workflow
+        if backend not in ['processes', 'threads']:
+            raise ValueError("backend must be 'processes' or 'threads'.")
+        self.backend = backend
+        if executor is not None and not isinstance(executor, Executor):
+            raise ValueError("executor must be an Executor.")
+        if input_template is None and model_dir is not None and \
+                ((executor is None and backend == 'threads') or (executor is not None and not executor.isolated)):
+            raise ValueError("Threads cannot execute a Python model from model_dir.")
 
         # Model related
         self.model_dir = model_dir
-        current_dir = os.getcwd()
-        self.return_dir = current_dir
-
-        # Create a list of all of the files and directories in the working directory
-        model_files = list()
-        for f_name in os.listdir(current_dir):
-            path = os.path.join(current_dir, f_name)
-            # if not os.path.isdir(path):
-            #     model_files.append(path)
-            model_files.append(path)
-        self.model_files = model_files
-
-        if self.model_dir is not None:
-            # Create a new directory where the model will be executed
-            ts = datetime.datetime.now().strftime("%Y_%m_%d_%I_%M_%f_%p")
-            work_dir = os.path.join(os.getcwd(), self.model_dir + "_" + ts)
-            os.makedirs(work_dir)
-            self.return_dir = work_dir
-
-            # Copy files from the model list to model run directory
-            for file_name in model_files:
-                full_file_name = os.path.join(current_dir, file_name)
-                if not os.path.isdir(full_file_name):
-                    shutil.copy(full_file_name, work_dir)
-                else:
-                    new_dir_name = os.path.join(work_dir, os.path.basename(full_file_name))
-                    shutil.copytree(full_file_name, new_dir_name)
-
-            # Change current working directory to model run directory
-            os.chdir(os.path.join(current_dir, work_dir))
+        self.source_dir = os.getcwd()
+        self.return_dir = self.source_dir
 
         # Check if the model script is a python script
         model_extension = pathlib.Path(model_script).suffix
@@ -259,6 +457,73 @@ class RunModel:
         # If running on cluster or not
         self.cluster = cluster
 
+        # Scheduler for the parallel execution of third-party models and status of each model run
+        if scheduler not in ['local', 'parallel']:
+            raise ValueError("scheduler must be 'local' or 'parallel'.")
+        self.scheduler = scheduler
+        self.job_log = []
+
+        # Timing and resource records of the model evaluations
+        if hook is not None and not callable(hook):
+            raise ValueError("hook must be callable.")
+        self.hook = hook
+        self.records = []
+        self._active_records = dict()
+
+        # Failure handling
+        if timeout is not None and not timeout > 0:
+            raise ValueError("timeout must be a positive number.")
+        self.timeout = timeout
+        if not isinstance(retries, int) or retries < 0:
+            raise ValueError("retries must be a non-negative integer.")
+        self.retries = retries
+        self.retry_delay = retry_delay
+        if on_failure not in ['raise', 'nan']:
+            raise ValueError("on_failure must be 'raise' or 'nan'.")
+        self.on_failure = on_failure
+        self.failed = []
+        # The simulation numbers of failed, as a set for fast lookups
+        self._failed_indices = set()
+
+        # Worker processes for the parallel execution of Python models
+        self.executor = executor
+
+        # Vectorized evaluation of Python models
+        self.vectorized = vectorized
+        if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size < 1):
+            raise ValueError("chunk_size must be a positive integer.")
+        self.chunk_size = chunk_size
+        self.shared_memory = shared_memory
+
+        # Cache of model evaluations
+        if cache is not None and not isinstance(cache, EvaluationCache):
+            raise ValueError("cache must be an EvaluationCache.")
+        self.cache = cache
+
+        # Evaluation of the repeated samples of a batch
+        if dedup_tol < 0:
+            raise ValueError("dedup_tol must be non-negative.")
+        self.deduplicate = deduplicate
+        self.dedup_tol = dedup_tol
+
+        # Journal of the completed evaluations
+        if journal is not None:
+            self.journal = RunJournal(journal)
+        else:
+            self.journal = None
+
+        if self.model_dir is not None:
+            # Create a new directory where the model will be executed
+            ts = datetime.datetime.now().strftime("%Y_%m_%d_%I_%M_%f_%p")
+            work_dir = os.path.join(self.source_dir, self.model_dir + "_" + ts)
+            os.makedirs(work_dir)
+            self.return_dir = work_dir
+
+            # Copy or link files from the model list to model run directory
+            self._stage_model_files(work_dir)
+
+        import UQpy.Utilities as Utilities
+
         # Check if there is a template input file or not and execute the appropriate function
         if self.input_template is not None:  # If there is a template input file
             # Check if it is a file and is readable
@@ -267,88 +532,322 @@ class RunModel:
             # Read in the text from the template file
             with open(self.input_template, 'r') as f:
                 self.template_text = str(f.read())
+            # Parse the template once into literal text and placeholders
+            if self.samples is not None:
+                self._compile_template()
 
             # Import the output script
             if self.output_script is not None:
-                self.output_module = __import__(self.output_script[:-3])
+                self.output_module = Utilities._import_module(self.output_script[:-3], self.source_dir)
                 # Run function which checks if the output module has the output object
                 self._check_output_module()
 
-            # Run the serial execution or parallel execution depending on ntasks
-            if self.ntasks == 1:
-                self._serial_execution()
-            else:
-                self._parallel_execution()
-
         else:  # If there is no template input file supplied
             # Import the python module
-            self.python_model = __import__(self.model_script[:-3])
+            self.python_model = Utilities._import_module(self.model_script[:-3], self.source_dir)
             # Run function which checks if the python model has the model object
             self._check_python_model()
 
-            # Run the serial execution or parallel execution depending on ntasks
+        # Run the model at the samples
+        if self.samples is not None:
+            self._run_model()
+
+    ####################################################################################################################
+    def _run_model(self):
+        """
+        Evaluate the model at all samples
+        :return:
+        """
+        for _ in self._iter_model():
+            pass
+
+    def run(self, samples):
+        """
+        Run the model at new samples, appending them to the samples already evaluated.
+
+        The new samples are appended to samples and their quantities of interest to qoi_list, and the model is only
+        evaluated at the new samples. Creating a RunModel once (e.g. with samples = None) and calling run for each new
+        batch of samples avoids repeating the setup of RunModel (listing the model files, importing and checking the
+        model) at each batch, which dominates the cost of adaptive methods that evaluate one sample at a time.
+
+        :param samples: Samples at which to run the model, with the same format as the samples input of RunModel.
+        :type samples: ndarray or list
+        """
+        if not isinstance(samples, (list, np.ndarray)):
+            raise ValueError("Samples must be passed as a list or numpy ndarray")
+        start = self.nsim
+        self._append_samples(samples)
+        self.nsim = len(self.samples)
+        self.qoi_list.extend([None] * (self.nsim - start))
+        if self.input_template is not None and self.template is None:
+            self._compile_template()
+        for _ in self._iter_model(start):
+            pass
+
+    def _append_samples(self, samples):
+        """
+        Append new samples to samples without copying the samples already evaluated at each call. An ndarray of samples
+        is a view of a larger array whose capacity doubles when it is full, and a list of samples is extended in place,
+        so that calling run once per sample costs an amortized constant time per sample. The samples passed by the
+        user are copied the first time new samples are appended to them, and are never modified.
+        :param samples: The new samples
+        :return:
+        """
+        if self.samples is None:
+            self.samples = samples
+            return
+        if isinstance(self.samples, np.ndarray) and isinstance(samples, np.ndarray):
+            n, m = len(self.samples), len(samples)
+            storage = self._samples_storage
+            if self.samples is not self._samples_owned or len(storage) < n + m \
+                    or storage.shape[1:] != samples.shape[1:] or np.result_type(storage, samples) != storage.dtype:
+                joined = np.concatenate((self.samples, samples), axis=0)
+                storage = np.empty((max(2 * n, n + m),) + joined.shape[1:], dtype=joined.dtype)
+                storage[:n + m] = joined
+                self._samples_storage = storage
+            else:
+                storage[n:n + m] = samples
+            self.samples = storage[:n + m]
+        else:
+            if self.samples is not self._samples_owned:
+                self.samples = list(self.samples)
+            self.samples.extend(samples)
+        self._samples_owned = self.samples
+
+    def iter_results(self, samples):
+        """
+        Run the model at new samples, yielding the quantities of interest as they become available.
+
+        This method returns a generator which yields the pair (index, qoi) for each sample, where index is the position
+        of the sample in samples. Samples found in the cache are yielded first. With ntasks > 1, the other samples are
+        yielded in the order in which their evaluations finish. The caller can stop iterating at any time, e.g. once
+        an estimator has converged: the evaluations which have not been started yet are then never started. samples and
+        qoi_list hold the new samples and the quantities of interest obtained so far.
+
+        Usage:
+            for index, qoi in model.iter_results(samples):
+                ...
+
+        :param samples: Samples at which to run the model, as in RunModel.
+        :type samples: ndarray or list
+        """
+        self._set_samples(samples)
+        return self._iter_model()
+
+    def _set_samples(self, samples):
+        """
+        Replace the samples by a new batch of samples and reset qoi_list
+        :param samples: The new samples
+        :return:
+        """
+        if not isinstance(samples, (list, np.ndarray)):
+            raise ValueError("Samples must be passed as a list or numpy ndarray")
+        self.samples = samples
+        self.nsim = len(self.samples)
+        self.qoi_list = [None] * self.nsim
+        self.failed = []
+        self._failed_indices = set()
+        if self.input_template is not None and self.template is None:
+            self._compile_template()
+
+    def _iter_model(self, start=0):
+        """
+        Look up the samples in the cache and execute the model for the others, with the execution method corresponding
+        to the workflow, vectorized and ntasks
+        :param start: The simulation number of the first sample to evaluate
+        :return: A generator of the pairs (index, qoi), in the order in which they become available
+        """
+        indices = self._lookup_cache(start)
+        pending = set(indices)
+        for i in range(start, self.nsim):
+            if i not in pending:
+                yield i, self.qoi_list[i]
+        if len(indices) == 0:
+            return
+        indices, duplicates = self._deduplicate(indices)
+
+        if self.input_template is not None:
             if self.ntasks == 1:
-                self._serial_python_execution()
+                results = self._serial_execution(indices)
             else:
-                self._parallel_python_execution()
+                results = self._parallel_execution(indices)
+        elif self.ntasks == 1 and self.model_dir is None and self.executor is None and self.vectorized:
+            results = self._vectorized_python_execution(indices)
+        elif self.ntasks == 1 and self.model_dir is None and self.executor is None:
+            results = self._serial_python_execution(indices)
+        else:
+            results = self._parallel_python_execution(indices)
 
-        # Return to current directory
-        if self.model_dir is not None:
-            os.chdir(current_dir)
+        for i, qoi in results:
+            self._update_cache([i])
+            self._record_done(i)
+            yield i, qoi
+            for j in self._copy_duplicates(i, duplicates):
+                yield j, self.qoi_list[j]
+
+    async def run_async(self, samples):
+        """
+        Run the third-party software model asynchronously at new samples.
+
+        The model runs are launched as subprocesses, at most ntasks of them executing at any time, and the outputs of
+        each run are collected as soon as it finishes. This is an asynchronous generator which yields the pair
+        (index, qoi) for each run in the order in which the runs finish, so that the caller can process the results
+        while the slower runs are still executing. Samples found in the cache are yielded first. Once the generator is
+        exhausted, samples and qoi_list hold the new samples and all their quantities of interest. The blocking steps of
+        the runs are executed in threads, so the event loop is never blocked and the outputs of different runs are
+        collected concurrently.
+
+        Usage:
+            async for index, qoi in model.run_async(samples):
+                ...
+
+        :param samples: Samples at which to run the model, as in RunModel.
+        :type samples: ndarray or list
+        """
+        if self.input_template is None:
+            raise ValueError("run_async requires a template input file (third-party software model workflow).")
+        self._set_samples(samples)
+
+        import UQpy.Utilities as Utilities
+
+        indices = self._lookup_cache()
+        pending = set(indices)
+        for i in range(self.nsim):
+            if i not in pending:
+                yield i, self.qoi_list[i]
+        if len(indices) == 0:
+            return
+        indices, duplicates = self._deduplicate(indices)
+
+        ts = datetime.datetime.now().strftime("%Y_%m_%d_%I_%M_%f_%p")
+        work_dirs = dict((i, os.path.join(self.return_dir, "run_" + str(i) + '_' + ts)) for i in indices)
+
+        def stage(index):
+            # Create the run directory and the input file
+            with self._timed(index, 'stage'):
+                os.makedirs(work_dirs[index])
+                self._stage_model_files(work_dirs[index])
+            with self._timed(index, 'input'):
+                self._create_input_files(file_name=self.input_template, num=index,
+                                         text=self.template.render(self.samples[index]),
+                                         new_folder=os.path.join(work_dirs[index], 'InputFiles'))
+
+        def collect_output(index):
+            with self._timed(index, 'output'):
+                self._output_parallel(index, work_dirs[index])
+
+        def cleanup(index):
+            # Remove the copied or linked files
+            with self._timed(index, 'cleanup'):
+                self._remove_model_files(work_dirs[index])
+
+        if self.cluster:
+            command_prefix = ["srun", "-N", str(self.nodes), "-n1", "-c" + str(self.cores_per_task), "--exclusive"]
+        else:
+            command_prefix = []
+        ntasks = self.ntasks if self.ntasks is not None else os.cpu_count()
+        semaphore = asyncio.Semaphore(ntasks)
+        loop = asyncio.get_running_loop()
+        # The blocking steps of the runs (staging, starting and waiting for the subprocesses, output collection and
+        # cleanup) are executed in threads, so that the event loop stays responsive and the steps of different runs
+        # overlap. In particular _spawn_lock is never held by the event loop.
+        threads = concurrent.futures.ThreadPoolExecutor(max_workers=2 * ntasks)
+        processes = dict()
+
+        async def run_job(index):
+            await loop.run_in_executor(threads, stage, index)
+            command = command_prefix + [self.python_command, "-u", str(self.model_script), str(index)]
+            for attempt in range(self.retries + 1):
+                if attempt > 0:
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+                error = None
+                async with semaphore:
+                    start_time = time.time()
+                    processes[index] = await loop.run_in_executor(
+                        threads, functools.partial(_popen, command, cwd=work_dirs[index]))
+                    try:
+                        returncode = await asyncio.wait_for(loop.run_in_executor(threads, processes[index].wait),
+                                                            self.timeout)
+                    except asyncio.TimeoutError:
+                        processes[index].kill()
+                        returncode = await loop.run_in_executor(threads, processes[index].wait)
+                        error = TimeoutError('Run ' + str(index) + ' timed out after ' + str(self.timeout) + ' s.')
+                end_time = time.time()
+                self.job_log.append({'index': index, 'exit_code': returncode, 'start_time': start_time,
+                                     'runtime': end_time - start_time, 'command': ' '.join(command)})
+                self._record(index).update(worker=Utilities._worker_id(), exit_code=returncode,
+                                           solve=(start_time, end_time), attempts=attempt + 1)
+                # Collect the output from the run directory
+                if error is None and self.output_script is not None:
+                    try:
+                        await loop.run_in_executor(threads, collect_output, index)
+                    except Exception as output_error:
+                        error = output_error
+                if error is None:
+                    break
+            if error is not None:
+                self._fail(index, error)
+            await loop.run_in_executor(threads, cleanup, index)
+            self._update_cache([index])
+            self._record_done(index)
+            return index
+
+        jobs = [asyncio.ensure_future(run_job(i)) for i in indices]
+        try:
+            for job in asyncio.as_completed(jobs):
+                index = await job
+                yield index, self.qoi_list[index]
+                for j in self._copy_duplicates(index, duplicates):
+                    yield j, self.qoi_list[j]
+        finally:
+            # If the caller stops iterating early, do not leave runs executing in the background
+            for job in jobs:
+                job.cancel()
+            for process in processes.values():
+                if process.poll() is None:
+                    process.kill()
+            threads.shutdown(wait=False)
 
     ####################################################################################################################
-    def _serial_execution(self):
+    def _serial_execution(self, indices):
         """
         Perform serial execution of the model when there is a template input file
-        :return:
+        :param indices: The simulation numbers of the samples to evaluate
+        :return: A generator of the pairs (index, qoi), as each run finishes
         """
         if self.verbose:
             print('\nPerforming serial execution of the model with template input.\n')
 
         # Loop over the number of simulations, executing the model once per loop
         ts = datetime.datetime.now().strftime("%Y_%m_%d_%I_%M_%f_%p")
-        for i in range(self.nsim):
+        for i in indices:
             # Create a directory for each model run
-            work_dir = os.path.join(os.getcwd(), "run_" + str(i) + '_' + ts)
-            os.makedirs(work_dir)
-            # Copy files from the model list to model run directory
-            current_dir = os.getcwd()
-            for file_name in self.model_files:
-                full_file_name = os.path.join(current_dir, file_name)
-                if not os.path.isdir(full_file_name):
-                    shutil.copy(full_file_name, work_dir)
-                else:
-                    new_dir_name = os.path.join(work_dir, os.path.basename(full_file_name))
-                    shutil.copytree(full_file_name, new_dir_name)
-            # Change current working directory to model run directory
-            os.chdir(os.path.join(current_dir, work_dir))
+            work_dir = os.path.join(self.return_dir, "run_" + str(i) + '_' + ts)
+            with self._timed(i, 'stage'):
+                os.makedirs(work_dir)
+                # Copy or link files from the model list to model run directory
+                self._stage_model_files(work_dir)
 
             # Call the input function
-            self._input_serial(i)
-
-            # Execute the model
-            self._execute_serial(i)
+            with self._timed(i, 'input'):
+                self._input_serial(i, work_dir)
 
-            # Call the output function
-            if self.output_script is not None:
-                self._output_serial(i)
+            # Execute the model and call the output function
+            self.model_command = ([self.python_command, str(self.model_script), str(i)])
+            self._finish_job(self._run_job(i, work_dir, self.model_command))
 
-            # Remove the copied files and folders
-            for file_name in self.model_files:
-                full_file_name = os.path.join(work_dir, os.path.basename(file_name))
-                if not os.path.isdir(full_file_name):
-                    os.remove(full_file_name)
-                else:
-                    shutil.rmtree(full_file_name)
+            # Remove the copied or linked files and folders
+            with self._timed(i, 'cleanup'):
+                self._remove_model_files(work_dir)
 
-            # Return to the previous directory
-            os.chdir(self.return_dir)
+            yield i, self.qoi_list[i]
 
     ####################################################################################################################
-    def _parallel_execution(self):
+    def _parallel_execution(self, indices):
         """
         Execute the model in parallel when there is a template input file
-        :return:
+        :param indices: The simulation numbers of the samples to evaluate
+        :return: A generator of the pairs (index, qoi), as each run finishes
         """
         if self.verbose:
             print('\nPerforming parallel execution of the model with template input.\n')
@@ -357,83 +856,104 @@ class RunModel:
 
         ts = datetime.datetime.now().strftime("%Y_%m_%d_%I_%M_%f_%p")
 
-        for i in range(self.nsim):
+        for i in indices:
             # Create a directory for each model run
-            work_dir = os.path.join(os.getcwd(), "run_" + str(i) + '_' + ts)
-            os.makedirs(work_dir)
-            # Copy files from the model list to model run directory
-            current_dir = os.getcwd()
-            for file_name in self.model_files:
-                full_file_name = os.path.join(current_dir, file_name)
-                if not os.path.isdir(full_file_name):
-                    shutil.copy(full_file_name, work_dir)
-                else:
-                    new_dir_name = os.path.join(work_dir, os.path.basename(full_file_name))
-                    shutil.copytree(full_file_name, new_dir_name)
+            work_dir = os.path.join(self.return_dir, "run_" + str(i) + '_' + ts)
+            with self._timed(i, 'stage'):
+                os.makedirs(work_dir)
+                # Copy or link files from the model list to model run directory
+                self._stage_model_files(work_dir)
 
-        self._input_parallel(ts)
+        self._input_parallel(ts, indices)
 
-        # Execute the model
+        # Execute the model, and collect the output of each run as soon as it finishes
         if self.verbose:
             print('\nExecuting the model in parallel with template input.\n')
 
-        self._execute_parallel(ts)
-
-        # Call the output function
-        if self.verbose:
-            print('\nCollecting outputs in parallel execution of the model with template input.\n')
-
-        current_dir = os.getcwd()
-        for i in range(self.nsim):
-            # Change current working directory to model run directory
-            work_dir = os.path.join(os.getcwd(), "run_" + str(i) + '_' + ts)
-            os.chdir(os.path.join(current_dir, work_dir))
-
-            # Run output processing function
-            if self.output_script is not None:
-                self._output_parallel(i)
-
-            # Remove the copied files and folders
-            for file_name in self.model_files:
-                full_file_name = os.path.join(work_dir, os.path.basename(file_name))
-                if not os.path.isdir(full_file_name):
-                    os.remove(full_file_name)
-                else:
-                    shutil.rmtree(full_file_name)
-
-            # Change back to the upper directory
-            os.chdir(os.path.join(work_dir, current_dir))
+        # The output of each run is collected and its copied or linked files are removed by the scheduler
+        for i in self._execute_parallel(ts, indices):
+            yield i, self.qoi_list[i]
 
     ####################################################################################################################
-    def _serial_python_execution(self):
+    def _serial_python_execution(self, indices):
         """
         Execute the python model in serial when there is no template input file
-        :return:
+        :param indices: The simulation numbers of the samples to evaluate
+        :return: A generator of the pairs (index, qoi), as each evaluation finishes
         """
         if self.verbose:
             print('\nPerforming serial execution of the model without template input.\n')
 
+        import UQpy.Utilities as Utilities
+        model = Utilities._load_python_model(self.model_script, self.model_object_name, self.source_dir)
+
         # Run python model
-        for i in range(self.nsim):
-            exec('from ' + self.model_script[:-3] + ' import ' + self.model_object_name)
+        for i in indices:
             if isinstance(self.samples, list):
                 sample_to_send = self.samples[i]
-                # if self.fixed_params is not None:
-                #     sample_to_send = sample_to_send.append(self.fixed_params)
             elif isinstance(self.samples, np.ndarray):
                 sample_to_send = self.samples[None, i]
-            # self.model_output = eval(self.model_object_name + '(self.samples[i])')
-            self.model_output = eval(self.model_object_name + '(sample_to_send)')
-            if self.model_is_class:
+            self._record(i)['worker'] = Utilities._worker_id()
+            with self._timed(i, 'solve'):
+                self.model_output, error, attempts = Utilities._call_with_retries(model, (sample_to_send,),
+                                                                                  self.retries, self.retry_delay)
+            self._record(i)['attempts'] = attempts
+            if error is not None:
+                self._fail(i, error)
+            elif self.model_is_class:
                 self.qoi_list[i] = self.model_output.qoi
             else:
                 self.qoi_list[i] = self.model_output
+            yield i, self.qoi_list[i]
 
     ####################################################################################################################
-    def _parallel_python_execution(self):
+    def _vectorized_python_execution(self, indices):
+        """
+        Execute the vectorized python model on blocks of samples when there is no template input file
+        :param indices: The simulation numbers of the samples to evaluate
+        :return: A generator of the pairs (index, qoi), as each block of evaluations finishes
+        """
+        if self.verbose:
+            print('\nPerforming vectorized execution of the model without template input.\n')
+
+        import UQpy.Utilities as Utilities
+        model = Utilities._load_python_model(self.model_script, self.model_object_name, self.source_dir)
+
+        samples = np.atleast_2d(np.asarray(self.samples))[indices]
+        chunk_size = len(indices) if self.chunk_size is None else self.chunk_size
+
+        def evaluate_block(block):
+            self.model_output = model(block)
+            if self.model_is_class:
+                block_qoi = self.model_output.qoi
+            else:
+                block_qoi = self.model_output
+            if len(block_qoi) != len(block):
+                raise ValueError("A vectorized model must return one quantity of interest per sample.")
+            return block_qoi
+
+        # Run python model once per block of samples and unpack the block of outputs
+        for start in range(0, len(indices), chunk_size):
+            stop = min(start + chunk_size, len(indices))
+            start_time = time.time()
+            block_qoi, error, attempts = Utilities._call_with_retries(evaluate_block, (samples[start:stop],),
+                                                                      self.retries, self.retry_delay)
+            for k in range(start, stop):
+                self._record(indices[k]).update(worker=Utilities._worker_id(), solve=(start_time, time.time()),
+                                                attempts=attempts)
+            for k in range(start, stop):
+                if error is not None:
+                    self._fail(indices[k], error)
+                else:
+                    self.qoi_list[indices[k]] = block_qoi[k - start]
+                yield indices[k], self.qoi_list[indices[k]]
+
+    ####################################################################################################################
+    def _parallel_python_execution(self, indices):
         """
         Execute the python model in parallel when there is no template input file
-        :return:
+        :param indices: The simulation numbers of the samples to evaluate
+        :return: A generator of the pairs (index, qoi), as each block of evaluations finishes
         """
 
         # Code updated to use the multiprocessing package by MDS, 7/24/19
@@ -441,123 +961,368 @@ class RunModel:
         if self.verbose:
             print('\nPerforming parallel execution of the Python model.\n')
 
-        import multiprocessing as mp
         import UQpy.Utilities as Utilities
 
-        sample = []
-        pool = mp.Pool(processes=self.nsim)
+        if self.executor is not None:
+            executor = self.executor
+        else:
+            executor = _shared_executor(self.ntasks, self.backend)
 
-        for i in range(self.nsim):
-            sample.append([self.model_script, self.model_object_name, self.samples[i]])
+        # Split the samples in blocks of contiguous samples, each one sent to a worker as a single task
+        if self.chunk_size is None:
+            chunk_size = -(-len(indices) // (4 * executor.ntasks))
+        else:
+            chunk_size = self.chunk_size
+        blocks = [indices[start:start + chunk_size] for start in range(0, len(indices), chunk_size)]
 
-        results = pool.starmap(Utilities._run_parallel_python, sample)
+        work_dir = None if self.model_dir is None else self.return_dir
+        options = [self.model_is_class, self.vectorized, work_dir, self.retries, self.retry_delay, self.source_dir]
 
-        for i in range(self.nsim):
-            if self.model_is_class:
-                self.qoi_list[i] = results[i].qoi
+        if self.shared_memory and isinstance(executor, ProcessExecutor) and isinstance(self.samples, np.ndarray) \
+                and self.samples.dtype.kind in 'biuf':
+            yield from self._shared_python_execution(executor, indices, blocks, options)
+            return
+
+        chunks = []
+        for block in blocks:
+            if isinstance(self.samples, np.ndarray):
+                samples_to_send = self.samples[block]
             else:
-                self.qoi_list[i] = results[i]
+                samples_to_send = [self.samples[i] for i in block]
+            chunks.append([self.model_script, self.model_object_name, samples_to_send] + options)
+
+        # Blocks are submitted to the workers as results are consumed, so that stopping early skips the others
+        for k, (block_qoi, worker, times, errors, attempts) in executor.starmap_unordered(
+                Utilities._run_parallel_python_chunk, chunks):
+            yield from self._collect_python_block(blocks[k], block_qoi, worker, times, errors, attempts)
+
+    def _shared_python_execution(self, executor, indices, blocks, options):
+        """
+        Execute the python model in parallel, exchanging the samples and quantities of interest with the worker
+        processes through shared memory, see shared_memory
+        :param executor: The ProcessExecutor
+        :param indices: The simulation numbers of the samples to evaluate
+        :param blocks: The simulation numbers of the samples of each block, consecutive in indices
+        :param options: The options of the evaluation, see Utilities._run_parallel_python_chunk
+        :return: A generator of the pairs (index, qoi), as each block of evaluations finishes
+        """
+        import UQpy.Utilities as Utilities
+
+        shared_samples = _SharedArray((len(indices),) + self.samples.shape[1:], self.samples.dtype)
+        np.take(self.samples, indices, axis=0, out=shared_samples.array)
+        # The result array is allocated once the shape and dtype of the quantities of interest are known
+        shared_results = []
+        rows = list()
+        for block in blocks:
+            start = rows[-1][1] if len(rows) > 0 else 0
+            rows.append((start, start + len(block)))
+
+        def chunks():
+            for block_rows in rows:
+                results_ref = shared_results[0].ref if len(shared_results) > 0 else None
+                yield [shared_samples.ref, block_rows, results_ref, self.model_script, self.model_object_name] + options
+
+        try:
+            for k, (block_qoi, worker, times, errors, attempts, written) in executor.starmap_unordered(
+                    Utilities._run_parallel_python_shared, chunks()):
+                for m, is_written in enumerate(written):
+                    if is_written:
+                        block_qoi[m] = shared_results[0].array[rows[k][0] + m].copy()
+                if len(shared_results) == 0:
+                    for qoi, error in zip(block_qoi, errors):
+                        if error is None and isinstance(qoi, np.ndarray) and qoi.dtype.kind in 'biufc':
+                            shared_results.append(_SharedArray((len(indices),) + qoi.shape, qoi.dtype))
+                            break
+                yield from self._collect_python_block(blocks[k], block_qoi, worker, times, errors, attempts)
+        finally:
+            shared_samples.close()
+            for shared in shared_results:
+                shared.close()
+
+    def _collect_python_block(self, block, block_qoi, worker, times, errors, attempts):
+        """
+        Save the quantities of interest and the records of a block of evaluations of the python model, or apply
+        on_failure to the evaluations which failed
+        :param block: The simulation numbers of the samples of the block
+        :return: A generator of the pairs (index, qoi)
+        """
+        for i, qoi, solve_time, error, n in zip(block, block_qoi, times, errors, attempts):
+            self._record(i).update(worker=worker, solve=solve_time, attempts=n)
+            if error is not None:
+                self._fail(i, error)
+            else:
+                self.qoi_list[i] = qoi
+            yield i, self.qoi_list[i]
 
     ####################################################################################################################
-    def _input_serial(self, index):
+    def _input_serial(self, index, work_dir):
         """
         Create one input file using the template and attach the index to the filename
         :param index: The simulation number
+        :param work_dir: The model run directory
         :return:
         """
         # Create new text to write to file
-        self.new_text = self._find_and_replace_var_names_with_values(var_names=self.var_names,
-                                                                     samples=self.samples[index],
-                                                                     template_text=self.template_text,
-                                                                     index=index,
-                                                                     user_format='{:.4E}')
+        self.new_text = self.template.render(self.samples[index])
         # Write the new text to the input file
         self._create_input_files(file_name=self.input_template, num=index, text=self.new_text,
-                                 new_folder='InputFiles')
+                                 new_folder=os.path.join(work_dir, 'InputFiles'))
 
-    def _execute_serial(self, index):
+    def _run_job(self, index, work_dir, command, log=None):
         """
-        Execute the model once using the input file of index number
+        Execute the model once from its run directory and collect its output, attempting the run again if it fails
         :param index: The simulation number
-        :return:
+        :param work_dir: The model run directory
+        :param command: The command which executes the model, as a list of strings
+        :param log: A function called with the job of each attempt, see RunModel.job_log
+        :return: A dictionary with the keys 'jobs' (the job of each attempt), 'qoi' and 'error' (the exception which
+        made the last attempt fail, or None)
         """
-        self.model_command = ([self.python_command, str(self.model_script), str(index)])
-        subprocess.run(self.model_command)
+        import UQpy.Utilities as Utilities
+        jobs = []
+
+        def attempt():
+            start_time = time.time()
+            returncode, max_rss, timed_out = _run_command(command, work_dir, self.timeout)
+            end_time = time.time()
+            job = {'index': index, 'exit_code': returncode, 'start_time': start_time, 'runtime': end_time - start_time,
+                   'command': ' '.join(command)}
+            jobs.append(job)
+            if log is not None:
+                log(job)
+            self._record(index).update(worker=Utilities._worker_id(), exit_code=returncode, max_rss=max_rss,
+                                       solve=(start_time, end_time))
+            if timed_out:
+                raise TimeoutError('Run ' + str(index) + ' timed out after ' + str(self.timeout) + ' s.')
+            if self.output_script is not None:
+                with self._timed(index, 'output'):
+                    return self._output_executor().apply(Utilities._run_output_script, self.output_script,
+                                                         self.output_object_name, index, work_dir,
+                                                         self.output_is_class, self.source_dir)
+
+        qoi, error, attempts = Utilities._call_with_retries(attempt, retries=self.retries,
+                                                            retry_delay=self.retry_delay)
+        self._record(index)['attempts'] = attempts
+        return {'index': index, 'jobs': jobs, 'qoi': qoi, 'error': error}
 
-    def _output_serial(self, index):
+    def _finish_job(self, result):
+        """
+        Save the jobs and the output of a model run returned by _run_job, or apply on_failure if it failed
+        :return:
+        """
+        self.job_log.extend(result['jobs'])
+        if self.verbose and result['jobs'][-1]['exit_code'] != 0:
+            print('Run ' + str(result['index']) + ' exited with code ' + str(result['jobs'][-1]['exit_code']) + '.')
+        if result['error'] is not None:
+            self._fail(result['index'], result['error'])
+        elif self.output_script is not None:
+            self.qoi_list[result['index']] = result['qoi']
+
+    def _fail(self, index, error):
         """
-        Execute the output script, obtain the output qoi and save it in qoi_list
+        Apply on_failure to an evaluation which failed
         :param index: The simulation number
+        :param error: The exception which made the evaluation fail
         :return:
         """
-        # Run output module
-        exec('from ' + self.output_script[:-3] + ' import ' + self.output_object_name)
-        self.model_output = eval(self.output_object_name + '(index)')
-        if self.output_is_class:
-            self.qoi_list[index] = self.model_output.qoi
-        else:
-            self.qoi_list[index] = self.model_output
+        self.failed.append(index)
+        self._failed_indices.add(index)
+        if self.on_failure == 'raise':
+            raise error
+        if self.verbose:
+            print('The evaluation of sample ' + str(index) + ' failed: ' + repr(error))
+        self.qoi_list[index] = np.nan
 
-    def _input_parallel(self, timestamp):
+    def _input_parallel(self, timestamp, indices):
         """
         Create all the input files required
         :return:
         """
-        # Loop over the number of samples and create input files in a folder in current directory
-        for i in range(self.nsim):
-            # Create new text to write to file
-            new_text = self._find_and_replace_var_names_with_values(var_names=self.var_names,
-                                                                    samples=self.samples[i],
-                                                                    template_text=self.template_text,
-                                                                    index=i,
-                                                                    user_format='{:.4E}')
-            folder_to_write = 'run_' + str(i) + '_' + timestamp + '/InputFiles'
+        # Render the input files of all samples and write them in a folder in each run directory
+        start_time = time.time()
+        for i, new_text in zip(indices, self.template.render_all([self.samples[i] for i in indices])):
+            folder_to_write = os.path.join(self.return_dir, 'run_' + str(i) + '_' + timestamp, 'InputFiles')
             # Write the new text to the input file
             self._create_input_files(file_name=self.input_template, num=i, text=new_text,
                                      new_folder=folder_to_write)
+            # The input files are rendered together, so the rendering time is shared by the runs
+            self._record(i)['input'] = (start_time, time.time())
         if self.verbose:
-            print('Created ' + str(self.nsim) + ' input files in the directory ./InputFiles. \n')
+            print('Created ' + str(len(indices)) + ' input files in the directory ./InputFiles. \n')
 
-    def _execute_parallel(self, timestamp):
+    def _execute_parallel(self, timestamp, indices):
         """
-        Build the command string and execute the model in parallel using subprocess and gnu parallel
-        :return:
+        Execute the model in parallel using the scheduler
+        :return: A generator of the simulation numbers of the runs, as they finish
         """
         # Check if logs folder exists, if not, create it
-        if not os.path.exists("logs"):
-            os.makedirs("logs")
+        if not os.path.exists(os.path.join(self.return_dir, "logs")):
+            os.makedirs(os.path.join(self.return_dir, "logs"))
         # If the user sets resume=True, do not delete log file. Else, delete logfile before running
         if self.resume is False:
             try:
-                os.remove("logs/runtask.log")
+                os.remove(os.path.join(self.return_dir, "logs", "runtask.log"))
             except OSError:
                 pass
+
+        if self.scheduler == 'parallel':
+            return self._execute_gnu_parallel(timestamp, indices)
+        else:
+            return self._execute_local_scheduler(timestamp, indices)
+
+    def _execute_gnu_parallel(self, timestamp, indices):
+        """
+        Build the command string and execute the model in parallel using subprocess and gnu parallel
+        :return: The simulation numbers of the runs
+        """
         self.parallel_string = "parallel --delay 0.2 --joblog logs/runtask.log --resume -j " + str(self.ntasks)
+        if self.timeout is not None:
+            self.parallel_string += " --timeout " + str(self.timeout)
+        if self.retries > 0:
+            self.parallel_string += " --retries " + str(self.retries + 1)
 
         # If running on MARCC cluster
         if self.cluster:
             self.srun_string = "srun -N " + str(self.nodes) + " -n1 -c" + str(self.cores_per_task) + " --exclusive"
             self.model_command_string = (
-                    self.parallel_string + self.srun_string + " 'cd run_{1}_" + timestamp + "&& " + self.python_command
-                    + " -u " + str(self.model_script) + "' {1}  ::: {0.." + str(self.nsim - 1) + "}")
+                    self.parallel_string + " " + self.srun_string + " 'cd run_{1}_" + timestamp + "&& " +
+                    self.python_command + " -u " + str(self.model_script) + "' {1}  ::: " +
+                    " ".join(str(i) for i in indices))
         else:  # If running locally
             self.model_command_string = (self.parallel_string + " 'cd run_{1}_" + timestamp + "&& " +
                                          self.python_command + " -u " +
-                                         str(self.model_script) + "' {1}  ::: {0.." + str(self.nsim - 1) + "}")
-
-        # self.model_command = shlex.split(self.model_command_string)
-        # subprocess.run(self.model_command)
+                                         str(self.model_script) + "' {1}  ::: " +
+                                         " ".join(str(i) for i in indices))
 
         print(self.model_command_string)
-        subprocess.run(self.model_command_string, shell=True)
+        _popen(self.model_command_string, shell=True, cwd=self.return_dir).wait()
+
+        # GNU parallel numbers the jobs by their position in the list of simulation numbers
+        for seq, job in sorted(self._read_job_log().items()):
+            if seq <= len(indices):
+                job['index'] = indices[seq - 1]
+                self.job_log.append(job)
+                self._record(job['index']).update(exit_code=job['exit_code'],
+                                                  solve=(job['start_time'], job['start_time'] + job['runtime']))
+        return self._collect_parallel(timestamp, indices)
+
+    def _collect_parallel(self, timestamp, indices):
+        """
+        Collect the output of finished model runs in parallel and remove their copied or linked files
+        :return: A generator of the simulation numbers of the runs, as their output is collected
+        """
+        import UQpy.Utilities as Utilities
+        work_dirs = [os.path.join(self.return_dir, "run_" + str(i) + '_' + timestamp) for i in indices]
+        if self.output_script is None:
+            outputs = ((k, (None, None, None)) for k in range(len(indices)))
+        else:
+            outputs = self._output_executor().starmap_unordered(
+                _timed_call,
+                [(Utilities._run_output_script, self.output_script, self.output_object_name, i, work_dir,
+                  self.output_is_class, self.source_dir) for i, work_dir in zip(indices, work_dirs)])
+        for k, (qoi, error, output_time) in outputs:
+            if error is not None:
+                self._fail(indices[k], error)
+            elif self.output_script is not None:
+                self.qoi_list[indices[k]] = qoi
+            if self.output_script is not None:
+                self._record(indices[k])['output'] = output_time
+            with self._timed(indices[k], 'cleanup'):
+                self._remove_model_files(work_dirs[k])
+            yield indices[k]
 
-    def _output_parallel(self, index):
+    def _output_executor(self):
+        """
+        Return the executor which executes the output script in the model run directories
+        :return: An isolated Executor
+        """
+        if self.executor is not None and self.executor.isolated:
+            return self.executor
+        return _shared_executor(self.ntasks)
+
+    def _execute_local_scheduler(self, timestamp, indices):
+        """
+        Execute the model in parallel using subprocess, keeping ntasks runs executing at all times
+        :return: A generator of the simulation numbers of the runs, as they finish
+        """
+        import UQpy.Utilities as Utilities
+
+        # Skip the runs which are listed in the job log, as GNU parallel does with --resume
+        completed = self._read_job_log()
+        indices_to_run = [i for i in indices if i + 1 not in completed]
+        if self.verbose:
+            print('Running ' + str(len(indices_to_run)) + ' of ' + str(len(indices)) + ' jobs with ' + str(self.ntasks)
+                  + ' parallel tasks.')
+
+        if self.cluster:
+            command_prefix = ["srun", "-N", str(self.nodes), "-n1", "-c" + str(self.cores_per_task), "--exclusive"]
+        else:
+            command_prefix = []
+        log_lock = threading.Lock()
+
+        with open(os.path.join(self.return_dir, "logs", "runtask.log"), 'a') as log:
+            if log.tell() == 0:
+                log.write("Seq\tHost\tStarttime\tJobRuntime\tSend\tReceive\tExitval\tSignal\tCommand\n")
+                log.flush()
+
+            def write_log(job):
+                with log_lock:
+                    log.write("%d\t:\t%.3f\t%.3f\t0\t0\t%d\t%d\t%s\n" % (
+                        job['index'] + 1, job['start_time'], job['runtime'], max(job['exit_code'], 0),
+                        max(-job['exit_code'], 0), "cd run_" + str(job['index']) + '_' + timestamp + "&& " +
+                        job['command']))
+                    log.flush()
+
+            def run_job(index):
+                work_dir = os.path.join(self.return_dir, "run_" + str(index) + '_' + timestamp)
+                command = command_prefix + [self.python_command, "-u", str(self.model_script), str(index)]
+                # The output is collected in a worker process as soon as the run finishes, while the other runs execute
+                result = self._run_job(index, work_dir, command, log=write_log)
+                with self._timed(index, 'cleanup'):
+                    self._remove_model_files(work_dir)
+                return result
+
+            # No more than ntasks runs are submitted at once, so that no run is started if the caller stops early
+            with ThreadExecutor(self.ntasks) as scheduler:
+                for _, result in scheduler.starmap_unordered(run_job, [(i,) for i in indices_to_run],
+                                                             max_pending=self.ntasks):
+                    self._finish_job(result)
+                    yield result['index']
+
+        # The runs skipped by resume were completed by a previous call
+        yield from self._collect_parallel(timestamp, [i for i in indices if i + 1 in completed])
+
+    def _read_job_log(self):
         """
-        Extract output from parallel execution
+        Read the job log written by the scheduler
+        :return: A dictionary of the jobs listed in the log, keyed by sequence number
+        """
+        jobs = dict()
+        try:
+            with open(os.path.join(self.return_dir, "logs", "runtask.log"), 'r') as log:
+                lines = log.readlines()[1:]
+        except OSError:
+            return jobs
+        for line in lines:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 9:
+                continue
+            exit_code = -int(fields[7]) if int(fields[7]) != 0 else int(fields[6])
+            jobs[int(fields[0])] = {'exit_code': exit_code, 'start_time': float(fields[2]),
+                                    'runtime': float(fields[3]), 'command': fields[8]}
+        return jobs
+
+    def _output_parallel(self, index, work_dir):
+        """
+        Extract output from a model run directory
         :param index: The simulation number
+        :param work_dir: The model run directory, from which the output script is executed
         :return:
         """
-        self._output_serial(index)
+        import UQpy.Utilities as Utilities
+        self.qoi_list[index] = self._output_executor().apply(Utilities._run_output_script, self.output_script,
+                                                             self.output_object_name, index, work_dir,
+                                                             self.output_is_class, self.source_dir)
 
     ####################################################################################################################
     # Helper functions
@@ -570,46 +1335,245 @@ class RunModel:
             f.write(text)
         return
 
-    def _find_and_replace_var_names_with_values(self, var_names, samples, template_text, index, user_format='{:.4E}'):
-        # TODO: deal with cases which have both var1 and var11
-        new_text = template_text
-        for j in range(len(var_names)):
-            # string_regex = re.compile(r"<" + var_names[j] + r".*?>")
-            string_regex = re.compile(
-                r"<" + var_names[j] + r"[([{]*?>")  # This regex looks for ([{ immediately after variable name
-            # string_regex = re.compile(r"<" + var_names[j] + r"[[]*?>")
-            count = 0
-            for string in string_regex.findall(template_text):
-                # If the input file has specific formatting standards, this is where they can be added.
-                if self.fmt == 'ls-dyna':
-                    v_temp  = samples[j]
-                    str_temp = "{:>10.4f}".format(v_temp)
-                    temp = string.replace(var_names[j],str_temp)
-                    temp = temp[1:11]
-                else:
-                    temp = string.replace(var_names[j], "samples[" + str(j) + "]")
-                    temp = eval(temp[1:-1])
-                print(temp)
-                if isinstance(temp, collections.Iterable):
-                    temp = np.array(temp).flatten()
-                    to_add = ''
-                    for i in range(len(temp) - 1):
-                        to_add += str(temp[i]) + ', '
-                    to_add += str(temp[-1])
+    def _compile_template(self):
+        """
+        Parse the template input file into an InputTemplate, creating default variable names if needed
+        :return:
+        """
+        if self.var_names is None:
+            # If var_names is not passed and there is an input template, create default variable names
+            nvars = np.shape(self.samples[0])[0]
+            self.var_names = []
+            for i in range(nvars):
+                self.var_names.append('x%d' % i)
+        self.template = InputTemplate(template_text=self.template_text, var_names=self.var_names, fmt=self.fmt)
+        if self.verbose:
+            for var_name in self.var_names:
+                count = self.template.counts[var_name]
+                print("Found " + str(count) + (" instances" if count > 1 else " instance") + " of variable: '"
+                      + var_name + "' in the input file.")
+
+    def _lookup_cache(self, start=0):
+        """
+        Fill qoi_list with the evaluations found in the journal and in the cache
+        :param start: The simulation number of the first sample to look up
+        :return: The simulation numbers of the samples which are neither in the journal nor in the cache
+        """
+        if self.cache is None and self.journal is None:
+            return list(range(start, self.nsim))
+
+        model = (self.model_script, self.model_object_name, self.input_template, self.output_script,
+                 self.output_object_name)
+        if start > 0:
+            del self.cache_keys[start:]
+        else:
+            self.cache_keys = []
+        self.cache_keys += [EvaluationCache.make_key(self.samples[i], *model) for i in range(start, self.nsim)]
+        indices = list(range(start, self.nsim))
+
+        if self.journal is not None:
+            completed = self.journal.completed(self.cache_keys, start)
+            for i in completed:
+                self.qoi_list[i] = completed[i]
+            indices = [i for i in indices if i not in completed]
+            if self.verbose:
+                print('Found ' + str(len(completed)) + ' of ' + str(self.nsim - start) + ' samples in the journal.')
+
+        if self.cache is not None:
+            found_indices = []
+            for i in indices:
+                found, qoi = self.cache.get(self.cache_keys[i])
+                if found:
+                    self.qoi_list[i] = qoi
                 else:
-                    to_add = str(temp)
-                new_text = new_text[0:new_text.index(string)] + to_add \
-                           + new_text[(new_text.index(string) + len(string)):]
-                count += 1
+                    found_indices.append(i)
             if self.verbose:
-                if index == 0:
-                    if count > 1:
-                        print(
-                            "Found " + str(count) + " instances of variable: '" + var_names[j] + "' in the input file.")
-                    else:
-                        print(
-                            "Found " + str(count) + " instance of variable: '" + var_names[j] + "' in the input file.")
-        return new_text
+                print('Found ' + str(len(indices) - len(found_indices)) + ' of ' + str(len(indices)) +
+                      ' samples in the cache.')
+            indices = found_indices
+        return indices
+
+    def _deduplicate(self, indices):
+        """
+        Find the repeated samples among the samples to evaluate, see deduplicate and dedup_tol
+        :param indices: The simulation numbers of the samples to evaluate
+        :return: The simulation numbers of the samples to evaluate once the repeated samples are removed, and a
+        dictionary mapping the simulation number of the first occurrence of each repeated sample to the simulation
+        numbers of its other occurrences
+        """
+        duplicates = dict()
+        if not self.deduplicate or len(indices) < 2:
+            return indices, duplicates
+
+        first = dict()
+        if self.dedup_tol == 0:
+            for i in indices:
+                key = EvaluationCache.make_key(self.samples[i])
+                first.setdefault(key, i)
+                if first[key] != i:
+                    duplicates.setdefault(first[key], []).append(i)
+        else:
+            from scipy.spatial import cKDTree
+            points = np.array([np.asarray(self.samples[i], dtype=float).ravel() for i in indices])
+            tree = cKDTree(points)
+            assigned = np.zeros(len(indices), dtype=bool)
+            for k, neighbors in enumerate(tree.query_ball_point(points, self.dedup_tol, p=np.inf)):
+                if assigned[k]:
+                    continue
+                for m in sorted(neighbors):
+                    if m > k and not assigned[m]:
+                        assigned[m] = True
+                        duplicates.setdefault(indices[k], []).append(indices[m])
+
+        repeated = set(j for others in duplicates.values() for j in others)
+        if self.verbose and len(repeated) > 0:
+            print('Found ' + str(len(repeated)) + ' repeated samples among ' + str(len(indices)) +
+                  ' samples to evaluate.')
+        return [i for i in indices if i not in repeated], duplicates
+
+    def _copy_duplicates(self, index, duplicates):
+        """
+        Copy the quantity of interest (or the failure) of an evaluated sample to its other occurrences
+        :param index: The simulation number of the evaluated sample
+        :param duplicates: The dictionary of repeated samples returned by _deduplicate
+        :return: The simulation numbers of the other occurrences of the sample
+        """
+        others = duplicates.get(index, [])
+        for j in others:
+            self.qoi_list[j] = copy.deepcopy(self.qoi_list[index])
+            if index in self._failed_indices:
+                self.failed.append(j)
+                self._failed_indices.add(j)
+        self._update_cache(others)
+        return others
+
+    def _record(self, index):
+        """
+        Return the record of the evaluation in progress of a sample, creating it if needed
+        :param index: The simulation number
+        :return: The record, see RunModel.records
+        """
+        return self._active_records.setdefault(index, {'index': index, 'worker': None, 'exit_code': None,
+                                                       'max_rss': None, 'attempts': 1, 'stage': None, 'input': None,
+                                                       'solve': None, 'output': None, 'cleanup': None})
+
+    @contextlib.contextmanager
+    def _timed(self, index, phase):
+        """
+        Record the start and end times of a phase of the evaluation of a sample
+        :param index: The simulation number
+        :param phase: The name of the phase
+        """
+        start_time = time.time()
+        yield
+        self._record(index)[phase] = (start_time, time.time())
+
+    def _record_done(self, index):
+        """
+        Save the record of a finished evaluation in RunModel.records and pass it to the hook
+        :param index: The simulation number
+        :return:
+        """
+        record = self._active_records.pop(index, None)
+        if record is None:
+            return
+        self.records.append(record)
+        if self.hook is not None:
+            self.hook(record)
+
+    def _update_cache(self, indices):
+        """
+        Store the new evaluations in the cache and record them in the journal. Every evaluation which did not fail is
+        recorded in the journal, even without quantity of interest (e.g. a third-party software model without output
+        script), so that it is not executed again on resume.
+        :param indices: The simulation numbers of the evaluated samples
+        :return:
+        """
+        for i in indices:
+            if i in self._failed_indices:
+                continue
+            if self.cache is not None and self.qoi_list[i] is not None:
+                self.cache.put(self.cache_keys[i], self.qoi_list[i])
+            if self.journal is not None:
+                self.journal.append(i, self.cache_keys[i], self.qoi_list[i])
+
+    def _list_model_files(self):
+        """
+        List the files and folders to stage in the model run directories the first time they are needed, see
+        model_files
+        :return: The absolute paths of the files and folders
+        """
+        if self.model_files is not None:
+            return self.model_files
+
+        if self._model_file_names is not None:
+            names = [self.model_script, self.input_template, self.output_script] + self._model_file_names
+            names = [name for name in names if name is not None]
+        else:
+            names = [name for name in sorted(os.listdir(self.source_dir)) if not self._is_run_output(name)]
+        # Remove the names listed twice, keeping their order
+        self.model_files = [os.path.join(self.source_dir, name) for name in dict.fromkeys(names)]
+        if self.verbose:
+            print('Staging ' + str(len(self.model_files)) + ' model files in the model run directories.')
+        return self.model_files
+
+    def _is_run_output(self, name):
+        """
+        Check if a file or folder of the working directory was written by a previous execution of RunModel
+        :param name: The name of the file or folder
+        :return: True if the file or folder is a model run directory, a model_dir directory, the logs folder of the job
+        log, the journal file or __pycache__
+        """
+        path = os.path.join(self.source_dir, name)
+        if os.path.isdir(path):
+            return name == '__pycache__' or re.match(r'.+_\d{4}_\d{2}_\d{2}_\d{2}_\d{2}_\d{6}_[AP]M$', name) \
+                is not None or (name == 'logs' and os.path.isfile(os.path.join(path, 'runtask.log')))
+        if self.journal is not None:
+            journal = os.path.abspath(self.journal.path)
+            return os.path.abspath(path) in [journal, journal + '-wal', journal + '-shm', journal + '-journal']
+        return False
+
+    def _stage_model_files(self, work_dir):
+        """
+        Copy or link the files from the model list to a model run directory, depending on staging
+        :param work_dir: The model run directory
+        :return:
+        """
+        for file_name in self._list_model_files():
+            new_file_name = os.path.join(work_dir, os.path.basename(file_name))
+            if self.staging == 'copy' or os.path.basename(file_name) in self.copy_files:
+                if not os.path.isdir(file_name):
+                    shutil.copy(file_name, work_dir)
+                else:
+                    shutil.copytree(file_name, new_file_name)
+            elif self.staging == 'symlink':
+                os.symlink(file_name, new_file_name, target_is_directory=os.path.isdir(file_name))
+            else:
+                if not os.path.isdir(file_name):
+                    self._link_or_copy(file_name, new_file_name)
+                else:
+                    shutil.copytree(file_name, new_file_name, copy_function=self._link_or_copy)
+
+    @staticmethod
+    def _link_or_copy(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+        return dst
+
+    def _remove_model_files(self, work_dir):
+        """
+        Remove the files from the model list from a model run directory
+        :param work_dir: The model run directory
+        :return:
+        """
+        for file_name in self._list_model_files():
+            full_file_name = os.path.join(work_dir, os.path.basename(file_name))
+            if os.path.islink(full_file_name) or not os.path.isdir(full_file_name):
+                os.remove(full_file_name)
+            else:
+                shutil.rmtree(full_file_name)
 
     def _is_list_of_strings(self, lst):
         return bool(lst) and isinstance(lst, list) and all(isinstance(elem, str) for elem in lst)
@@ -703,3 +1667,996 @@ class RunModel:
     def _collect_output(self, qoi_list, qoi_output, pos):
         qoi_list[pos] = qoi_output
         return qoi_list
+
+
+# A process forked while another thread is starting a subprocess (e.g. a worker process of a ProcessExecutor) inherits
+# the pipe through which the subprocess reports its start, and the thread starting the subprocess then waits for it
+# forever. RunModel therefore never forks two processes at the same time. The lock is only held around synchronous
+# calls, never across an await.
+_spawn_lock = threading.RLock()
+
+
+def _popen(command, **kwargs):
+    """
+    Start a subprocess, see subprocess.Popen, while holding _spawn_lock
+    :param command: The command
+    :return: The subprocess.Popen object
+    """
+    with _spawn_lock:
+        return subprocess.Popen(command, **kwargs)
+
+
+def _run_command(command, cwd, timeout=None):
+    """
+    Execute a command in a subprocess and wait for it to finish
+    :param command: The command, as a list of strings
+    :param cwd: The directory from which the command is executed
+    :param timeout: Time in seconds after which the subprocess is killed. If timeout = None, the subprocess is not
+    limited in time.
+    :return: The exit code of the subprocess (negative if it was terminated by a signal), its peak resident memory in
+    kilobytes (None if it is not available on the platform) and True if it was killed because of the timeout
+    """
+    process = _popen(command, cwd=cwd)
+    lock = threading.Lock()
+    expired = threading.Event()
+    # Where possible, the exit of the process is waited for without reaping it, and the process is then reaped and its
+    # returncode set while holding lock. Until then its pid cannot be reused.
+    wait_unreaped = hasattr(os, 'wait4') and hasattr(os, 'waitid')
+
+    def exited():
+        if wait_unreaped:
+            return os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+        return process.poll() is not None
+
+    def kill():
+        # The process is only killed if it is still running, so that a run which finished in time is not considered
+        # timed out, and a reaped process whose pid may have been reused is never signaled
+        with lock:
+            if process.returncode is None and not exited():
+                expired.set()
+                process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout is not None else None
+    if timer is not None:
+        timer.start()
+    try:
+        if not wait_unreaped:
+            status = process.wait()
+            max_rss = None
+        else:
+            os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+            with lock:
+                _, status, usage = os.wait4(process.pid, 0)
+                if os.WIFSIGNALED(status):
+                    process.returncode = -os.WTERMSIG(status)
+                else:
+                    process.returncode = os.WEXITSTATUS(status)
+            # ru_maxrss is given in bytes on macOS and in kilobytes on other platforms
+            max_rss = usage.ru_maxrss // 1024 if platform.system() == 'Darwin' else usage.ru_maxrss
+    finally:
+        if timer is not None:
+            timer.cancel()
+    return process.returncode, max_rss, expired.is_set()
+
+
+def _timed_call(func, *args):
+    """
+    Call func with the arguments args and measure the call
+    :return: The result of func (None if it raised an exception), the exception raised by func (None if it did not
+    raise) and a tuple with the start and end times of the call
+    """
+    start_time = time.time()
+    try:
+        result, error = func(*args), None
+    except Exception as exception:
+        result, error = None, exception
+    return result, error, (start_time, time.time())
+
+
+class InputTemplate:
+    """
+    Template input file compiled for fast rendering.
+
+    The template text is parsed once into literal text segments separated by placeholders. A placeholder is a variable
+    name enclosed in angle brackets, e.g. <x0>, and is replaced by the value of the corresponding variable of the
+    sample. If the value is iterable, its flattened items are written separated by commas. Each input file is then
+    rendered in a single pass over the segments, and each variable is formatted only once per sample however many
+    placeholders refer to it.
+
+    :param template_text: The text of the template input file.
+    :type template_text: str
+
+    :param var_names: The names of the variables, in the order of the sample values.
+    :type var_names: list of str
+
+    :param fmt: Format of the input file, see RunModel. With fmt = 'ls-dyna', each value is written in a field of
+    exactly 10 characters.
+    :type fmt: str
+    """
+
+    def __init__(self, template_text, var_names, fmt=None):
+
+        self.var_names = var_names
+        self.fmt = fmt
+
+        # Longest names first, so that <x11> is never read as the variable x1
+        names = sorted(var_names, key=len, reverse=True)
+        regex = re.compile(r"<(" + "|".join(re.escape(name) for name in names) + r")([([{]*?)>")
+
+        self.literals = []
+        self.slots = []
+        self.counts = dict((name, 0) for name in var_names)
+        position = 0
+        for match in regex.finditer(template_text):
+            self.literals.append(template_text[position:match.start()])
+            name, suffix = match.group(1), match.group(2)
+            j = var_names.index(name)
+            if suffix == '' or self.fmt == 'ls-dyna':
+                code = None
+            else:
+                code = compile("samples[" + str(j) + "]" + suffix, '<input template>', 'eval')
+            self.slots.append((j, suffix, code))
+            self.counts[name] += 1
+            position = match.end()
+        self.literals.append(template_text[position:])
+
+    def render(self, sample):
+        """
+        Render the template for one sample
+        :param sample: The values of the variables
+        :return: The text of the input file
+        """
+        values = dict()
+        parts = [self.literals[0]]
+        for (j, suffix, code), literal in zip(self.slots, self.literals[1:]):
+            key = (j, suffix)
+            if key not in values:
+                values[key] = self._format(sample, j, suffix, code)
+            parts.append(values[key])
+            parts.append(literal)
+        return ''.join(parts)
+
+    def render_all(self, samples):
+        """
+        Render the template for a batch of samples
+        :param samples: The samples, one per row or item
+        :return: The list of the texts of the input files
+        """
+        return [self.render(sample) for sample in samples]
+
+    def _format(self, sample, j, suffix, code):
+        if self.fmt == 'ls-dyna':
+            return ("{:>10.4f}".format(sample[j]) + suffix + ">")[:10]
+        value = sample[j] if code is None else eval(code, {}, {'samples': sample})
+        if isinstance(value, collections.abc.Iterable):
+            return ', '.join(str(item) for item in np.array(value).flatten())
+        return str(value)
+
+
+class EvaluationCache:
+    """
+    Cache of model evaluations for RunModel.
+
+    Each evaluation is identified by a hash of the sample values and of the names identifying the model. The most
+    recently used evaluations are kept in memory. Optionally, all evaluations are also stored in an SQLite database on
+    disk, so that they can be reused across Python sessions. An evaluation which is not found in memory is looked up on
+    disk and, if found there, brought back into memory.
+
+    :param maxsize: Maximum number of evaluations kept in memory. When it is exceeded, the least recently used
+    evaluation is dropped from memory (but not from disk). If maxsize = None, the memory tier is unbounded.
+    :type maxsize: int
+
+    :param path: Name of the SQLite database file in which evaluations are stored on disk. The file is created if it
+    does not exist. path = None by default, in which case evaluations are only kept in memory.
+    :type path: str
+    """
+
+    def __init__(self, maxsize=1024, path=None):
+
+        if maxsize is not None and (not isinstance(maxsize, int) or maxsize < 0):
+            raise ValueError("maxsize must be a non-negative integer or None.")
+        self.maxsize = maxsize
+        self.path = path
+        self.memory = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+        if self.path is not None:
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS evaluations (key TEXT PRIMARY KEY, qoi BLOB)")
+            self.db.commit()
+        else:
+            self.db = None
+
+    @staticmethod
+    def make_key(sample, *model):
+        """
+        Hash a sample together with the names identifying the model
+        :param sample: One sample point
+        :param model: Names of the model script, model object, etc.
+        :return: The hexadecimal digest identifying the evaluation
+        """
+        h = hashlib.sha1()
+        for name in model:
+            h.update(repr(name).encode() + b'\0')
+        try:
+            array = np.ascontiguousarray(sample)
+        except ValueError:
+            array = None
+        if array is None or array.dtype.hasobject:
+            h.update(pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL))
+        else:
+            h.update(array.dtype.str.encode() + repr(array.shape).encode() + b'\0')
+            h.update(array.tobytes())
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Look up an evaluation in memory, then on disk
+        :param key: The key of the evaluation, see make_key
+        :return: A tuple (found, qoi), where qoi is None if the evaluation was not found
+        """
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return True, self.memory[key]
+            if self.db is not None:
+                row = self.db.execute("SELECT qoi FROM evaluations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    qoi = pickle.loads(row[0])
+                    self._remember(key, qoi)
+                    self.hits += 1
+                    return True, qoi
+            self.misses += 1
+            return False, None
+
+    def put(self, key, qoi):
+        """
+        Store an evaluation in memory and on disk
+        :param key: The key of the evaluation, see make_key
+        :param qoi: The quantity of interest returned by the model
+        :return:
+        """
+        with self._lock:
+            self._remember(key, qoi)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO evaluations (key, qoi) VALUES (?, ?)",
+                                (key, sqlite3.Binary(pickle.dumps(qoi, protocol=pickle.HIGHEST_PROTOCOL))))
+                self.db.commit()
+
+    def clear(self):
+        """
+        Remove all evaluations from memory and disk
+        :return:
+        """
+        with self._lock:
+            self.memory.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM evaluations")
+                self.db.commit()
+
+    def close(self):
+        """
+        Close the database file
+        :return:
+        """
+        with self._lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+    def __len__(self):
+        return len(self.memory)
+
+    def _remember(self, key, qoi):
+        self.memory[key] = qoi
+        self.memory.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self.memory) > self.maxsize:
+                self.memory.popitem(last=False)
+
+
+class RunJournal:
+    """
+    Append-only journal of the model evaluations of RunModel.
+
+    Each evaluation is recorded in an SQLite database file as soon as it finishes, with its simulation number, the hash
+    of the sample (see EvaluationCache.make_key) and the quantity of interest. Since each record is committed
+    immediately, the evaluations completed before a crash are kept in the journal, and a RunModel call with the same
+    journal file and samples only evaluates the model at the samples which are not recorded.
+
+    :param path: Name of the journal file. The file is created if it does not exist.
+    :type path: str
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        # With write-ahead logging, each committed record survives a crash of the Python process
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS journal (idx INTEGER, key TEXT, qoi BLOB)")
+        self.db.commit()
+
+    def completed(self, keys, start=0):
+        """
+        Find the recorded evaluations of a batch of samples
+        :param keys: The keys of the samples, in the order of the simulation numbers
+        :param start: Only the samples with simulation numbers greater than or equal to start are looked up
+        :return: A dictionary of the quantities of interest, keyed by the simulation numbers of the samples whose
+        number and key are both recorded in the journal
+        """
+        completed = dict()
+        with self._lock:
+            # Later records of the same simulation number take precedence
+            for index, key, qoi in self.db.execute("SELECT idx, key, qoi FROM journal WHERE idx >= ? ORDER BY rowid",
+                                                   (start,)):
+                if 0 <= index < len(keys) and keys[index] == key:
+                    completed[index] = pickle.loads(qoi)
+        return completed
+
+    def append(self, index, key, qoi):
+        """
+        Record one evaluation
+        :param index: The simulation number
+        :param key: The key of the sample, see EvaluationCache.make_key
+        :param qoi: The quantity of interest returned by the model
+        :return:
+        """
+        with self._lock:
+            self.db.execute("INSERT INTO journal (idx, key, qoi) VALUES (?, ?, ?)",
+                            (index, key, sqlite3.Binary(pickle.dumps(qoi, protocol=pickle.HIGHEST_PROTOCOL))))
+            self.db.commit()
+
+    def close(self):
+        """
+        Close the journal file
+        :return:
+        """
+        with self._lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+
+class Executor:
+    """
+    Base class of the executors which evaluate tasks for RunModel.
+
+    An executor evaluates tasks, i.e. calls of a function with given arguments, with ntasks workers. RunModel only
+    uses the following protocol, so that any class implementing it can be passed as the executor input of RunModel:
+
+    submit(func, args_list): Submit a batch of tasks, one per tuple of arguments in args_list, and return their ids.
+    poll(job_ids, timeout=None): Wait until at least one of the tasks job_ids is finished, or until timeout seconds
+    have elapsed, and return the ids of the finished ones.
+    collect(job_id): Return the result of a finished task, or raise the exception it raised.
+    discard(job_ids): Forget tasks whose results are no longer needed, cancelling them if they have not started.
+    close(): Shut down the workers.
+
+    Subclasses only need to implement _start, which starts the evaluation of one task and calls _finish when it is
+    finished. The methods starmap_unordered, starmap and apply are built on the protocol. An executor can be used as a
+    context manager, in which case it is closed when leaving the context.
+
+    The attribute isolated is True if the tasks are executed in other processes than the calling Python process. Only
+    isolated executors can change the current working directory of their workers, which is required to execute the
+    output script of third-party software models or Python models from model_dir.
+
+    :param ntasks: Number of workers. If ntasks = None, the number of CPUs is used.
+    :type ntasks: int
+    """
+
+    isolated = False
+
+    def __init__(self, ntasks=1):
+
+        if ntasks is not None and (not isinstance(ntasks, int) or ntasks < 1):
+            raise ValueError("ntasks must be a positive integer.")
+        self.ntasks = ntasks if ntasks is not None else mp.cpu_count()
+        self._job_ids = itertools.count()
+        self._results = dict()
+        self._discarded = set()
+        self._condition = threading.Condition()
+
+    def submit(self, func, args_list):
+        """
+        Submit a batch of tasks
+        :param func: The function to call
+        :param args_list: A list with the tuple of arguments of each task
+        :return: The list of the ids of the tasks
+        """
+        job_ids = []
+        for args in args_list:
+            job_id = next(self._job_ids)
+            self._start(job_id, func, tuple(args))
+            job_ids.append(job_id)
+        return job_ids
+
+    def poll(self, job_ids, timeout=None):
+        """
+        Wait until at least one task is finished
+        :param job_ids: The ids of the tasks to wait for
+        :param timeout: Maximum waiting time in seconds. If timeout = None, wait until a task is finished.
+        :return: The list of the ids of the finished tasks among job_ids (empty if the timeout expired)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: any(job_id in self._results for job_id in job_ids), timeout)
+            return [job_id for job_id in job_ids if job_id in self._results]
+
+    def collect(self, job_id):
+        """
+        Return the result of a finished task, and forget the task
+        :param job_id: The id of the task
+        :return: The result of the task. If the task raised an exception, the exception is raised.
+        """
+        with self._condition:
+            success, value = self._results.pop(job_id)
+        if not success:
+            raise value
+        return value
+
+    def discard(self, job_ids):
+        """
+        Forget tasks whose results are no longer needed, cancelling those which have not started yet
+        :param job_ids: The ids of the tasks
+        :return:
+        """
+        with self._condition:
+            for job_id in job_ids:
+                if self._results.pop(job_id, None) is None:
+                    self._discarded.add(job_id)
+        for job_id in job_ids:
+            self._cancel(job_id)
+
+    def close(self):
+        """
+        Shut down the workers once they have completed their pending tasks
+        :return:
+        """
+        pass
+
+    def _start(self, job_id, func, args):
+        raise NotImplementedError
+
+    def _cancel(self, job_id):
+        pass
+
+    def _finish(self, job_id, success, value):
+        """
+        Save the result of a finished task and wake up the threads waiting for it
+        :param success: False if value is the exception raised by the task
+        :return:
+        """
+        with self._condition:
+            if job_id in self._discarded:
+                self._discarded.remove(job_id)
+                return
+            self._results[job_id] = (success, value)
+            self._condition.notify_all()
+
+    def starmap_unordered(self, func, iterable, max_pending=None):
+        """
+        Apply func to each item of iterable, unpacking the items as arguments, and yield the results as they complete.
+
+        At most max_pending items are submitted to the workers ahead of the results consumed by the caller, so that the
+        remaining items are never evaluated if the caller stops iterating early.
+        :param max_pending: Maximum number of items submitted and not yet consumed. By default, twice the number of
+        workers.
+        :return: A generator of the pairs (position of the item in iterable, result), in order of completion
+        """
+        if max_pending is None:
+            max_pending = 2 * self.ntasks
+        items = enumerate(iterable)
+        pending = dict()
+
+        def submit_next(n):
+            batch = list(itertools.islice(items, n))
+            if len(batch) > 0:
+                pending.update(zip(self.submit(func, [args for _, args in batch]), [k for k, _ in batch]))
+
+        submit_next(max_pending)
+        try:
+            while len(pending) > 0:
+                for job_id in self.poll(list(pending)):
+                    position = pending.pop(job_id)
+                    value = self.collect(job_id)
+                    submit_next(1)
+                    yield position, value
+        finally:
+            # If the caller stops early or a task fails, the tasks which are still pending are dropped
+            if len(pending) > 0:
+                self.discard(list(pending))
+
+    def starmap(self, func, iterable, chunksize=None):
+        """
+        Apply func to each item of iterable, unpacking the items as arguments
+        :param chunksize: Not used, for compatibility with multiprocessing.Pool.starmap
+        :return: The list of results, in the order of iterable
+        """
+        results = dict(self.starmap_unordered(func, iterable))
+        return [results[k] for k in range(len(results))]
+
+    def apply(self, func, *args):
+        """
+        Call func with the arguments args on one of the workers and wait for the result
+        :return: The result of func
+        """
+        job_id = self.submit(func, [args])[0]
+        self.poll([job_id])
+        return self.collect(job_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SerialExecutor(Executor):
+    """
+    Executor which evaluates the tasks one at a time in the calling thread.
+
+    The tasks are evaluated lazily, when poll is called, so that a RunModel call which stops early does not evaluate the
+    remaining tasks. This executor is mostly useful to debug models and executors.
+    """
+
+    def __init__(self):
+
+        super().__init__(ntasks=1)
+        self._pending = collections.OrderedDict()
+
+    def poll(self, job_ids, timeout=None):
+        finished = [job_id for job_id in job_ids if job_id in self._results]
+        if len(finished) == 0:
+            for job_id in job_ids:
+                if job_id in self._pending:
+                    func, args = self._pending.pop(job_id)
+                    try:
+                        self._finish(job_id, True, func(*args))
+                    except Exception as error:
+                        self._finish(job_id, False, error)
+                    return [job_id]
+        return finished
+
+    def _start(self, job_id, func, args):
+        self._pending[job_id] = (func, args)
+
+    def _cancel(self, job_id):
+        self._pending.pop(job_id, None)
+        self._discarded.discard(job_id)
+
+
+class ThreadExecutor(Executor):
+    """
+    Pool of threads for the parallel execution of Python models with RunModel.
+
+    The threads share the model object imported by the Python process, and the samples and quantities of interest are
+    not pickled. This is faster than a ProcessExecutor for models which spend most of their time in code that releases
+    the global interpreter lock (e.g. NumPy/SciPy linear algebra or compiled extensions), but pure Python models do not
+    run in parallel in threads.
+
+    :param ntasks: Number of threads. If ntasks = None, the number of CPUs is used.
+    :type ntasks: int
+    """
+
+    def __init__(self, ntasks=1):
+
+        super().__init__(ntasks=ntasks)
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.ntasks)
+        self._futures = dict()
+
+    def _start(self, job_id, func, args):
+        if self.pool is None:
+            raise RuntimeError("The executor has been closed.")
+
+        def done(future):
+            self._futures.pop(job_id, None)
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self._finish(job_id, True, future.result())
+            else:
+                self._finish(job_id, False, future.exception())
+
+        self._futures[job_id] = self.pool.submit(func, *args)
+        self._futures[job_id].add_done_callback(done)
+
+    def _cancel(self, job_id):
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            with self._condition:
+                self._discarded.discard(job_id)
+
+    def close(self):
+        """
+        Shut down the threads once they have completed their pending tasks
+        :return:
+        """
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+
+class _SharedArray:
+    """
+    An ndarray in shared memory, to which worker processes attach by its name, see Utilities._attach_shared_array
+    """
+
+    def __init__(self, shape, dtype):
+        from multiprocessing import shared_memory
+        dtype = np.dtype(dtype)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.ref = (self.shm.name, tuple(shape), dtype.str)
+
+    def close(self):
+        """
+        Release and remove the shared memory block
+        :return:
+        """
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ProcessExecutor(Executor):
+    """
+    Persistent pool of worker processes for the parallel execution of Python models with RunModel.
+
+    Creating a pool of processes and importing the model module in each of them is expensive compared to the
+    evaluation of many Python models. A ProcessExecutor starts its workers once and keeps them alive until it is
+    closed, so that it can be passed to any number of RunModel calls (see the executor input of RunModel). Each worker
+    imports a given model module only once and keeps it for all subsequent evaluations.
+
+    :param ntasks: Number of worker processes. If ntasks = None, the number of CPUs is used.
+    :type ntasks: int
+
+    :param model_script: The filename (with extension) of the Python script which contains the model, in the current
+    working directory. If model_script and model_object_name are provided, the model is imported by each worker as soon
+    as it starts. Otherwise, the model is imported by each worker at its first evaluation.
+    :type model_script: str
+
+    :param model_object_name: The name of the function or class within model_script which executes the model.
+    :type model_object_name: str
+    """
+
+    isolated = True
+
+    def __init__(self, ntasks=1, model_script=None, model_object_name=None):
+
+        import UQpy.Utilities as Utilities
+
+        super().__init__(ntasks=ntasks)
+        with _spawn_lock:
+            if os.name == 'posix':
+                # Workers which attach to shared memory (see RunModel.shared_memory) must share the resource tracker
+                # of this process, otherwise the tracker of each worker removes the shared memory blocks when it exits
+                from multiprocessing import resource_tracker
+                resource_tracker.ensure_running()
+            self.pool = mp.Pool(processes=self.ntasks, initializer=Utilities._init_python_worker,
+                                initargs=(model_script, model_object_name, os.getcwd()))
+
+    def _start(self, job_id, func, args):
+        if self.pool is None:
+            raise RuntimeError("The executor has been closed.")
+        self.pool.apply_async(func, args, callback=lambda value: self._finish(job_id, True, value),
+                              error_callback=lambda error: self._finish(job_id, False, error))
+
+    def starmap(self, func, iterable, chunksize=None):
+        """
+        Apply func to each item of iterable, unpacking the items as arguments, using the worker processes
+        :param chunksize: Number of items sent to a worker at once, see multiprocessing.Pool.starmap
+        :return: The list of results, in the order of iterable
+        """
+        if self.pool is None:
+            raise RuntimeError("The executor has been closed.")
+        return self.pool.starmap(func, iterable, chunksize)
+
+    def close(self):
+        """
+        Shut down the worker processes once they have completed their pending tasks
+        :return:
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+class SubprocessExecutor(Executor):
+    """
+    Executor which evaluates each task in a new Python subprocess.
+
+    The function and arguments of each task are pickled to a file, and a new Python interpreter, optionally launched
+    through a scheduler command such as srun, loads them, calls the function and pickles the result to a file. At most
+    ntasks subprocesses execute at any time. Starting an interpreter per task is slow compared to a ProcessExecutor,
+    but the tasks can be executed on the nodes of an HPC cluster and each task runs in a fresh process.
+
+    :param ntasks: Maximum number of subprocesses executing at the same time. If ntasks = None, the number of CPUs is
+    used.
+    :type ntasks: int
+
+    :param command_prefix: Command prepended to the Python command, as a list of strings (e.g. ['srun', '-N', '1',
+    '-n1', '--exclusive']).
+    command_prefix = None by default, in which case the subprocesses are executed on the local machine.
+    :type command_prefix: list of str
+
+    :param tmp_dir: Directory in which the task and result files are written. It must be visible to the subprocesses,
+    e.g. on a shared file system when running on a cluster.
+    tmp_dir = None by default, in which case a temporary directory is created.
+    :type tmp_dir: str
+    """
+
+    isolated = True
+
+    def __init__(self, ntasks=1, command_prefix=None, tmp_dir=None):
+
+        super().__init__(ntasks=ntasks)
+        self.command_prefix = list(command_prefix) if command_prefix is not None else []
+        self.tmp_dir = tempfile.mkdtemp(prefix='uqpy_tasks_', dir=tmp_dir)
+        if platform.system() in ['Windows']:
+            self.python_command = "python"
+        else:
+            self.python_command = "python3"
+        # The subprocesses import the same modules as the calling process
+        self.env = dict(os.environ, PYTHONPATH=os.pathsep.join(path if path else os.getcwd() for path in sys.path))
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.ntasks)
+
+    def _start(self, job_id, func, args):
+        if self.pool is None:
+            raise RuntimeError("The executor has been closed.")
+        self.pool.submit(self._run, job_id, func, args)
+
+    def _run(self, job_id, func, args):
+        task_file = os.path.join(self.tmp_dir, 'task_%d.pkl' % job_id)
+        result_file = os.path.join(self.tmp_dir, 'result_%d.pkl' % job_id)
+        try:
+            with open(task_file, 'wb') as f:
+                pickle.dump((func, args), f, protocol=pickle.HIGHEST_PROTOCOL)
+            command = self.command_prefix + [self.python_command, "-c", "import sys; from UQpy.RunModel import "
+                                             "_run_task_file; _run_task_file(sys.argv[1], sys.argv[2])",
+                                             task_file, result_file]
+            returncode = _popen(command, env=self.env).wait()
+            if not os.path.isfile(result_file):
+                raise RuntimeError('The task subprocess exited with code ' + str(returncode) + ' without a result.')
+            with open(result_file, 'rb') as f:
+                success, value = pickle.load(f)
+        except Exception as error:
+            success, value = False, error
+        finally:
+            for file_name in [task_file, result_file]:
+                if os.path.isfile(file_name):
+                    os.remove(file_name)
+        self._finish(job_id, success, value)
+
+    def close(self):
+        """
+        Wait for the pending tasks and remove the temporary directory
+        :return:
+        """
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class RemoteExecutor(Executor):
+    """
+    Executor which sends the tasks to remote workers over TCP sockets.
+
+    Each worker is a RemoteWorker listening on a host and port. The executor opens one connection per address and
+    sends the tasks of each connection one at a time, so that an address listed several times receives as many tasks
+    at the same time. If a connection breaks, its current task fails and the other tasks are left to the other
+    connections; once all the connections are broken, all the pending tasks fail. The functions of the tasks are pickled
+    by reference, so the workers must be able to import the same modules (e.g. UQpy and the model script), and, in the
+    third-party software model workflow, must see the run directories on a shared file system.
+
+    Tasks and results are exchanged as pickles, which can execute arbitrary code when they are loaded: RemoteExecutor
+    and RemoteWorker must only be used on a trusted network.
+
+    :param addresses: The (host, port) address of each worker connection.
+    :type addresses: list of tuple
+
+    :param connect_timeout: Maximum time in seconds to wait for each connection.
+    :type connect_timeout: float
+    """
+
+    isolated = True
+
+    def __init__(self, addresses, connect_timeout=10.):
+
+        super().__init__(ntasks=len(addresses))
+        self.addresses = [tuple(address) for address in addresses]
+        self._tasks = queue.Queue()
+        self._connections = []
+        # Number of connections which are not broken, see _disconnect
+        self._live = len(self.addresses)
+        self._live_lock = threading.Lock()
+        for address in self.addresses:
+            connection = socket.create_connection(address, timeout=connect_timeout)
+            connection.settimeout(None)
+            self._connections.append(connection)
+        self._threads = [threading.Thread(target=self._dispatch, args=(connection,), daemon=True)
+                         for connection in self._connections]
+        for thread in self._threads:
+            thread.start()
+
+    def _start(self, job_id, func, args):
+        if self._connections is None:
+            raise RuntimeError("The executor has been closed.")
+        with self._live_lock:
+            if self._live > 0:
+                self._tasks.put((job_id, func, args))
+                return
+        self._finish(job_id, False, ConnectionError("All the connections to the remote workers are broken."))
+
+    def _dispatch(self, connection):
+        # Send the tasks of the queue through one connection, one at a time, until None is received
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                _send_message(connection, None)
+                connection.close()
+                return
+            job_id, func, args = task
+            if job_id in self._discarded:
+                self._finish(job_id, False, None)
+                continue
+            try:
+                _send_message(connection, (func, args))
+                success, value = _receive_message(connection)
+            except Exception as error:
+                self._finish(job_id, False, error)
+                connection.close()
+                self._disconnect()
+                return
+            self._finish(job_id, success, value)
+
+    def _disconnect(self):
+        # A connection is broken, so the remaining tasks are left to the other connections. Once all the connections
+        # are broken, the tasks which are still queued fail, so that no caller waits for them forever
+        with self._live_lock:
+            self._live -= 1
+            if self._live > 0:
+                return
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            if task is not None:
+                self._finish(task[0], False, ConnectionError("All the connections to the remote workers are broken."))
+
+    def close(self):
+        """
+        Wait for the pending tasks and close the connections
+        :return:
+        """
+        if self._connections is not None:
+            for _ in self._connections:
+                self._tasks.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._connections = None
+
+
+class RemoteWorker:
+    """
+    Worker which executes the tasks sent by a RemoteExecutor.
+
+    The worker listens on a TCP port and executes the tasks of each connection, one at a time, in the worker process
+    (connections are served in parallel threads). A worker is typically started on each compute node with
+
+        python3 -c "from UQpy.RunModel import RemoteWorker; RemoteWorker('0.0.0.0', 5000).serve_forever()"
+
+    and several workers can be started on the same node to use several cores. Tasks are exchanged as pickles, so the
+    worker must only be reachable from a trusted network.
+
+    :param host: The host name or address on which to listen.
+    :type host: str
+
+    :param port: The port on which to listen. If port = 0, a free port is chosen (see RemoteWorker.address).
+    :type port: int
+    """
+
+    def __init__(self, host='localhost', port=0):
+
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]
+
+    def serve_forever(self):
+        """
+        Accept connections and execute their tasks until the worker is closed
+        :return:
+        """
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        with connection:
+            while True:
+                try:
+                    task = _receive_message(connection)
+                except (EOFError, OSError):
+                    return
+                if task is None:
+                    return
+                func, args = task
+                try:
+                    result = (True, func(*args))
+                except Exception as error:
+                    result = (False, error)
+                _send_message(connection, result)
+
+    def close(self):
+        """
+        Stop accepting connections
+        :return:
+        """
+        self.server.close()
+
+
+def _send_message(connection, message):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    connection.sendall(struct.pack('!Q', len(data)) + data)
+
+
+def _receive_message(connection):
+    header = _receive_bytes(connection, 8)
+    return pickle.loads(_receive_bytes(connection, struct.unpack('!Q', header)[0]))
+
+
+def _receive_bytes(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(min(size - len(data), 1 << 20))
+        if not chunk:
+            raise EOFError("The connection was closed.")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _run_task_file(task_file, result_file):
+    """
+    Execute a task pickled by a SubprocessExecutor and pickle its result
+    :return:
+    """
+    with open(task_file, 'rb') as f:
+        func, args = pickle.load(f)
+    try:
+        result = (True, func(*args))
+    except Exception as error:
+        result = (False, error)
+    with open(result_file, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# Executors shared by the RunModel calls which do not provide their own, keyed by backend and number of tasks.
+# Their workers import each model from the directory of the RunModel which uses it, see Utilities._load_python_model.
+_shared_executors = dict()
+_shared_executors_lock = threading.Lock()
+
+
+def _shared_executor(ntasks, backend='processes'):
+    with _shared_executors_lock:
+        if (backend, ntasks) not in _shared_executors:
+            if backend == 'threads':
+                _shared_executors[(backend, ntasks)] = ThreadExecutor(ntasks=ntasks)
+            else:
+                _shared_executors[(backend, ntasks)] = ProcessExecutor(ntasks=ntasks)
+        return _shared_executors[(backend, ntasks)]
+
+
+@atexit.register
+def _close_shared_executors():
+    with _shared_executors_lock:
+        for executor in _shared_executors.values():
+            executor.close()
+        _shared_executors.clear()
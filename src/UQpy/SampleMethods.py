@@ -22,6 +22,7 @@ from scipy.spatial.distance import pdist
 import random
 from UQpy.Distributions import *
 from UQpy.Utilities import *
+from UQpy.Utilities import _guard_log_pdf
 from os import sys
 from inspect import signature
 from functools import partial
@@ -782,7 +783,8 @@ class RSS:
 
         if self.option == 'Gradient':
             with suppress_stdout():  # disable printing output comments
-                values = np.array(RunModel(self.points, model_script=self.model).qoi_list)
+                run_model = RunModel(self.points, model_script=self.model)
+            values = np.array(run_model.qoi_list)
             if self.cell == 'Rectangular':
                 dydx1, self.corr_model_params = surrogate(self.points, values, self.corr_model_params,
                                                           self.reg_model, self.corr_model,
@@ -899,7 +901,8 @@ class RSS:
             if self.option == 'Gradient':
 
                 with suppress_stdout():  # disable printing output comments
-                    y_new = RunModel(np.atleast_2d(self.samples[i, :]), model_script=self.model).qoi_list
+                    run_model.run(np.atleast_2d(self.samples[i, :]))
+                y_new = run_model.qoi_list[-1:]
                 values = np.vstack([values, y_new])
 
                 if np.size(self.samples, 0) < self.min_train_size:
@@ -1191,7 +1194,8 @@ class AKMCS:
             self.population = m.samples
         if self.DoE is None:
             self.DoE = np.random.permutation(self.population)[:self.n_DoE]
-        values = np.array(RunModel(self.DoE, model_script=self.model).qoi_list)
+        run_model = RunModel(self.DoE, model_script=self.model)
+        values = np.array(run_model.qoi_list)
 
         if self.analysis == 'Reliability':
             pf, cov_pf = 1, 1
@@ -1224,7 +1228,8 @@ class AKMCS:
                         new, ind, g = self.eff(interpolate, rest_pop)
                     self.DoE = np.vstack([self.DoE, new])
 
-                    v_new = np.array(RunModel(np.atleast_2d(new), model_script=self.model).qoi_list)
+                    run_model.run(np.atleast_2d(new))
+                    v_new = np.array(run_model.qoi_list[-np.atleast_2d(new).shape[0]:])
                     print(i)
                     values = np.vstack([values, v_new])
 
@@ -1281,7 +1286,8 @@ class AKMCS:
                     new = self.lf(interpolate, rest_pop)
                 self.DoE = np.vstack([self.DoE, new])
 
-                v_new = np.array(RunModel(np.atleast_2d(new), model_script=self.model).qoi_list)
+                run_model.run(np.atleast_2d(new))
+                v_new = np.array(run_model.qoi_list[-np.atleast_2d(new).shape[0]:])
                 print(i)
                 values = np.vstack([values, v_new])
 
@@ -1891,13 +1897,21 @@ class MCMC:
                                      'pdf_target should be a list')
                 if isinstance(self.pdf_target[0], str):
                     p_js = [Distribution(dist_name=pdf_target_j) for pdf_target_j in self.pdf_target]
-                    try:
-                        [p_j.pdf(x=self.seed[0, j], **kwargs[j]) for (j, p_j) in enumerate(p_js)]
-                        self.log_pdf_target = [partial(compute_log_pdf, pdf_func=p_j.pdf, **kwargs[j])
-                                               for (j, p_j) in enumerate(p_js)]
-                    except AttributeError:
-                        raise AttributeError('pdf_target given as a list of strings must point to Distributions '
-                                             'with an existing pdf method.')
+                    self.log_pdf_target = []
+                    for (j, p_j) in enumerate(p_js):
+                        # Use the log_pdf of the Distribution when it exists, it does not underflow in the tails. Only
+                        # -inf and nan are replaced, see _guard_log_pdf.
+                        try:
+                            p_j.log_pdf(x=self.seed[0, j], **kwargs[j])
+                            self.log_pdf_target.append(partial(_guard_log_pdf, log_pdf_func=p_j.log_pdf,
+                                                               **kwargs[j]))
+                        except AttributeError:
+                            try:
+                                p_j.pdf(x=self.seed[0, j], **kwargs[j])
+                                self.log_pdf_target.append(partial(compute_log_pdf, pdf_func=p_j.pdf, **kwargs[j]))
+                            except AttributeError:
+                                raise AttributeError('pdf_target given as a list of strings must point to '
+                                                     'Distributions with an existing pdf method.')
                 elif callable(self.pdf_target[0]):
                     self.log_pdf_target = [partial(compute_log_pdf, pdf_func=pdf_target_j, **kwargs[j])
                                            for (j, pdf_target_j) in enumerate(self.pdf_target)]
@@ -1929,12 +1943,18 @@ class MCMC:
                 if isinstance(self.pdf_target, str) or (isinstance(self.pdf_target, list)
                                                         and isinstance(self.pdf_target[0], str)):
                     p = Distribution(dist_name=self.pdf_target, copula=self.pdf_target_copula)
+                    # Use the log_pdf of the Distribution when it exists, it does not underflow in the tails. Only
+                    # -inf and nan are replaced, see _guard_log_pdf.
                     try:
-                        p.pdf(x=self.seed[0, :], **kwargs)
-                        self.log_pdf_target = partial(compute_log_pdf, pdf_func=p.pdf, **kwargs)
+                        p.log_pdf(x=self.seed[0, :], **kwargs)
+                        self.log_pdf_target = partial(_guard_log_pdf, log_pdf_func=p.log_pdf, **kwargs)
                     except AttributeError:
-                        raise AttributeError('pdf_target given as a string must point to a Distribution '
-                                             'with an existing pdf method.')
+                        try:
+                            p.pdf(x=self.seed[0, :], **kwargs)
+                            self.log_pdf_target = partial(compute_log_pdf, pdf_func=p.pdf, **kwargs)
+                        except AttributeError:
+                            raise AttributeError('pdf_target given as a string must point to a Distribution '
+                                                 'with an existing pdf method.')
                 elif callable(self.pdf_target):
                     self.log_pdf_target = partial(compute_log_pdf, pdf_func=self.pdf_target, **kwargs)
                 else:
@@ -2066,6 +2086,7 @@ class IS:
             tmp = pdf_func(x, **kwargs_)
             pdf_value = np.fmax(tmp, 10 ** (-320)*np.ones_like(tmp))
             return np.log(pdf_value)
+
         # Check log_pdf_target, pdf_target
         if (self.pdf_target is None) and (self.log_pdf_target is None):
             raise ValueError('UQpy error: a target pdf must be defined (pdf_target or log_pdf_target).')
@@ -2096,12 +2117,18 @@ class IS:
             if isinstance(self.pdf_target, str) or (isinstance(self.pdf_target, list) and
                                                     isinstance(self.pdf_target[0], str)):
                 p = Distribution(dist_name=self.pdf_target, copula=self.pdf_target_copula)
+                # Use the log_pdf of the Distribution when it exists, it does not underflow in the tails. Only
+                # -inf and nan are replaced, see _guard_log_pdf.
                 try:
-                    p.pdf(x=x_test, **kwargs)
-                    self.log_pdf_target = partial(compute_log_pdf, pdf_func=p.pdf, **kwargs)
+                    p.log_pdf(x=x_test, **kwargs)
+                    self.log_pdf_target = partial(_guard_log_pdf, log_pdf_func=p.log_pdf, **kwargs)
                 except AttributeError:
-                    raise AttributeError('pdf_target given as a string must point to a Distribution '
-                                         'with an existing pdf method.')
+                    try:
+                        p.pdf(x=x_test, **kwargs)
+                        self.log_pdf_target = partial(compute_log_pdf, pdf_func=p.pdf, **kwargs)
+                    except AttributeError:
+                        raise AttributeError('pdf_target given as a string must point to a Distribution '
+                                             'with an existing pdf method.')
             # otherwise it may be a function that computes the pdf, then just take the logarithm
             elif callable(self.pdf_target):
                 self.log_pdf_target = partial(compute_log_pdf, pdf_func=self.pdf_target, **kwargs)
@@ -22,11 +22,71 @@ import scipy.stats as stats
 from contextlib import contextmanager
 import sys
 import os
+import threading
+import time
 from scipy.special import gamma
 from scipy.stats import chi2, norm
 
 
-# This function is for parallel execution of a Python model
+# These functions are for parallel execution of a Python model
+
+# Model objects already imported by this process, keyed by (model_dir, model_script, model_object_name). In the worker
+# processes of a RunModel executor this cache lives as long as the worker, so each model module is imported once per
+# worker.
+_python_models = dict()
+
+
+def _load_python_model(model_script, model_object_name, model_dir=None):
+    """
+    Import the model object from the model script, or return it from the cache if it was already imported
+    :param model_script: The filename (with extension) of the Python script which contains the model
+    :param model_object_name: The name of the function or class within model_script which executes the model
+    :param model_dir: The directory which contains model_script. The worker processes of an executor outlive the
+    RunModel which started them, and keep the working directory and python path they had when they started, so the
+    model is imported from model_dir if it is given, see _import_module. If model_dir = None, the model is imported
+    from the python path.
+    :return: The model object
+    """
+    key = (model_dir, model_script, model_object_name)
+    if key not in _python_models:
+        module = _import_module(model_script[:-3], model_dir)
+        _python_models[key] = getattr(module, model_object_name)
+    return _python_models[key]
+
+
+def _import_module(module_name, module_dir=None):
+    """
+    Import a module from a directory. A module with the same name which was imported from another file is replaced.
+    :param module_name: The name of the module
+    :param module_dir: The directory which contains the file module_name.py. If module_dir = None, the module is
+    imported from the python path.
+    :return: The module
+    """
+    if module_dir is None:
+        return __import__(module_name)
+    file_name = os.path.join(os.path.abspath(module_dir), module_name + '.py')
+    module = sys.modules.get(module_name)
+    if module is not None and getattr(module, '__file__', None) is not None and \
+            os.path.abspath(module.__file__) == file_name:
+        return module
+    import importlib
+    sys.path.insert(0, os.path.abspath(module_dir))
+    try:
+        sys.modules.pop(module_name, None)
+        importlib.invalidate_caches()
+        return importlib.import_module(module_name)
+    finally:
+        sys.path.remove(os.path.abspath(module_dir))
+
+
+def _init_python_worker(model_script=None, model_object_name=None, model_dir=None):
+    """
+    Initialize a worker process of a RunModel executor, importing the model ahead of the first evaluation
+    :return:
+    """
+    if model_script is not None and model_object_name is not None:
+        _load_python_model(model_script, model_object_name, model_dir)
+
 
 def _run_parallel_python(model_script, model_object_name, sample):
     """
@@ -34,12 +94,197 @@ def _run_parallel_python(model_script, model_object_name, sample):
     :param sample: One sample point where the model has to be evaluated
     :return:
     """
-    exec('from ' + model_script[:-3] + ' import ' + model_object_name)
-    par_res = eval(model_object_name + '(sample)')
+    model = _load_python_model(model_script, model_object_name)
+    par_res = model(sample)
 
     return par_res
 
 
+def _run_parallel_python_chunk(model_script, model_object_name, samples, model_is_class=False, vectorized=False,
+                               work_dir=None, retries=0, retry_delay=0., model_dir=None):
+    """
+    Execute the python model in parallel on a contiguous block of samples
+    :param samples: The sample points where the model has to be evaluated, as an ndarray with one sample per row or as
+    a list. Unless vectorized = True, the model is called with each row of an ndarray as an ndarray of shape
+    (1, dimension), and with each item of a list.
+    :param model_is_class: True if the model is a class which saves its output as the attribute qoi
+    :param vectorized: True if the model is called once with the whole block of samples
+    :param work_dir: The directory from which the model is executed. If work_dir = None, the model is executed from the
+    current working directory of the worker.
+    :param retries: Number of times an evaluation which raises an exception is attempted again, see _call_with_retries
+    :param retry_delay: Delay before the first new attempt, see _call_with_retries
+    :param model_dir: The directory which contains model_script, see _load_python_model
+    :return: A list with the quantity of interest of each sample, the identifier of the worker (see _worker_id), a
+    list with the start and end times of the evaluation of each sample, a list with the exception raised by the last
+    attempt of each evaluation which failed (None for the others) and a list with the number of attempts of each
+    evaluation
+    """
+    if work_dir is not None:
+        current_dir = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            return _run_parallel_python_chunk(model_script, model_object_name, samples, model_is_class, vectorized,
+                                              retries=retries, retry_delay=retry_delay, model_dir=model_dir)
+        finally:
+            os.chdir(current_dir)
+
+    model = _load_python_model(model_script, model_object_name, model_dir)
+
+    if vectorized:
+        def evaluate_block():
+            par_res = model(samples)
+            block_qoi = par_res.qoi if model_is_class else par_res
+            if len(block_qoi) != len(samples):
+                raise ValueError("A vectorized model must return one quantity of interest per sample.")
+            return [block_qoi[i] for i in range(len(samples))]
+
+        start_time = time.time()
+        qoi, error, attempts = _call_with_retries(evaluate_block, retries=retries, retry_delay=retry_delay)
+        n = len(samples)
+        if error is not None:
+            qoi = [None] * n
+        return qoi, _worker_id(), [(start_time, time.time())] * n, [error] * n, [attempts] * n
+
+    def evaluate(sample):
+        par_res = model(sample)
+        return par_res.qoi if model_is_class else par_res
+
+    qoi = []
+    times = []
+    errors = []
+    attempts = []
+    for k in range(len(samples)):
+        # A sample of an ndarray is passed as a row of shape (1, dimension), as in the serial execution of RunModel
+        sample = samples[k:k + 1] if isinstance(samples, np.ndarray) else samples[k]
+        start_time = time.time()
+        sample_qoi, error, sample_attempts = _call_with_retries(evaluate, (sample,), retries, retry_delay)
+        qoi.append(sample_qoi)
+        times.append((start_time, time.time()))
+        errors.append(error)
+        attempts.append(sample_attempts)
+    return qoi, _worker_id(), times, errors, attempts
+
+
+def _attach_shared_array(ref):
+    """
+    Attach to an ndarray in shared memory created by RunModel
+    :param ref: The name of the shared memory block, the shape and the dtype of the array
+    :return: The shared memory block, which must be closed once the array is no longer used, and the array
+    """
+    from multiprocessing import shared_memory
+    name, shape, dtype = ref
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_parallel_python_shared(samples_ref, rows, results_ref, model_script, model_object_name, model_is_class=False,
+                                vectorized=False, work_dir=None, retries=0, retry_delay=0., model_dir=None):
+    """
+    Execute the python model in parallel on a block of rows of a sample array in shared memory, writing the quantities
+    of interest in a result array in shared memory, see _run_parallel_python_chunk
+    :param samples_ref: The shared sample array, see _attach_shared_array
+    :param rows: The first and last (excluded) rows of the block
+    :param results_ref: The shared result array, with one row per sample, or None. Only the quantities of interest which
+    are ndarrays with the shape and dtype of the rows of the result array are written in it.
+    :return: The outputs of _run_parallel_python_chunk, where the quantities of interest written in the result array are
+    replaced by None, and a list of booleans which are True for the samples whose quantity of interest was written
+    """
+    shm, samples = _attach_shared_array(samples_ref)
+    try:
+        # The model may keep references to the samples, which must not point to the shared memory block once closed
+        block = samples[rows[0]:rows[1]].copy()
+    finally:
+        del samples
+        shm.close()
+
+    qoi, worker, times, errors, attempts = _run_parallel_python_chunk(model_script, model_object_name, block,
+                                                                      model_is_class, vectorized, work_dir, retries,
+                                                                      retry_delay, model_dir)
+    written = [False] * len(qoi)
+    if results_ref is not None:
+        shm, results = _attach_shared_array(results_ref)
+        try:
+            for k, sample_qoi in enumerate(qoi):
+                if isinstance(sample_qoi, np.ndarray) and sample_qoi.shape == results.shape[1:] and \
+                        sample_qoi.dtype == results.dtype:
+                    results[rows[0] + k] = sample_qoi
+                    qoi[k] = None
+                    written[k] = True
+        finally:
+            del results
+            shm.close()
+    return qoi, worker, times, errors, attempts, written
+
+
+def _call_with_retries(func, args=(), retries=0, retry_delay=0.):
+    """
+    Call func with the arguments args, calling it again if it raises an exception
+    :param retries: Maximum number of new attempts
+    :param retry_delay: Delay in seconds before the first new attempt. The delay is doubled before each following
+    attempt.
+    :return: The result of func (None if all attempts failed), the exception raised by the last attempt (None if an
+    attempt succeeded) and the number of attempts
+    """
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            time.sleep(retry_delay * 2 ** (attempt - 1))
+        try:
+            return func(*args), None, attempt + 1
+        except Exception as error:
+            last_error = error
+    return None, last_error, retries + 1
+
+
+def _worker_id():
+    """
+    Identify the process and thread executing a model evaluation
+    :return: A string 'pid/thread name'
+    """
+    return str(os.getpid()) + '/' + threading.current_thread().name
+
+
+def _run_output_script(output_script, output_object_name, index, work_dir, output_is_class=False, output_dir=None):
+    """
+    Execute the output script of a third-party software model in the directory of one model run
+    :param index: The simulation number
+    :param work_dir: The model run directory, which is the current working directory while the output script runs
+    :param output_is_class: True if the output object is a class which saves the quantity of interest as the attribute
+    qoi
+    :param output_dir: The directory which contains output_script, see _load_python_model. The output script is imported
+    once per process, rather than once per model run directory.
+    :return: The quantity of interest
+    """
+    current_dir = os.getcwd()
+    os.chdir(work_dir)
+    sys.path.insert(0, work_dir)
+    try:
+        output = _load_python_model(output_script, output_object_name, output_dir)(index)
+    finally:
+        sys.path.remove(work_dir)
+        os.chdir(current_dir)
+    return output.qoi if output_is_class else output
+
+
+# This function is for the samplers of SampleMethods (MCMC and IS)
+
+def _guard_log_pdf(x, log_pdf_func, params=None, copula_params=None):
+    """
+    Evaluate a log_pdf for a sampler, replacing -inf and nan (where the pdf is zero or undefined) by the lowest finite
+    float, so that the acceptance ratio of a chain which starts where the pdf is zero is defined. Finite values are
+    returned unchanged, so the log_pdf keeps its accuracy in the tails.
+    :param log_pdf_func: The log_pdf, called as log_pdf_func(x, params=params, copula_params=copula_params), without
+    the arguments which are None
+    :return: The log_pdf at x
+    """
+    kwargs_ = {}
+    if params is not None:
+        kwargs_['params'] = params
+    if copula_params is not None:
+        kwargs_['copula_params'] = copula_params
+    # fmax returns the other argument where the log_pdf is nan
+    return np.fmax(log_pdf_func(x, **kwargs_), -np.finfo(float).max)
+
+
 def transform_ng_to_g(corr_norm, dist, dist_params, samples_ng, jacobian=True):
 
     """
@@ -648,7 +893,7 @@ def R_to_r(R):
 def gradient(sample=None, dimension=None, eps=None,  model_script=None, model_object_name=None, input_template=None,
              var_names=None,
              output_script=None, output_object_name=None, ntasks=None, cores_per_task=None, nodes=None, resume=None,
-             verbose=None, model_dir=None, cluster=None, order=None):
+             verbose=None, model_dir=None, cluster=None, order=None, cache=None):
     """
          Description: A function to estimate the gradients (1st, 2nd, mixed) of a function using finite differences
 
@@ -703,6 +948,10 @@ def gradient(sample=None, dimension=None, eps=None,  model_script=None, model_ob
 
              :param cluster: This option defines if we run the code into a cluster
 
+             :param cache: EvaluationCache shared by all model evaluations (see RunModel). If cache = None, a new
+             cache is used for the evaluations of this call, so that the sample itself is evaluated only once for
+             second order derivatives.
+
          Output:
              :return du_dj: vector of first-order gradients
              :rtype: ndarray
@@ -712,7 +961,10 @@ def gradient(sample=None, dimension=None, eps=None,  model_script=None, model_ob
              :rtype: ndarray
      """
 
-    from UQpy.RunModel import RunModel
+    from UQpy.RunModel import RunModel, EvaluationCache
+
+    if cache is None:
+        cache = EvaluationCache()
 
     if order is None:
         raise ValueError('Exit code: Provide type of derivatives: first, second or mixed.')
@@ -730,48 +982,44 @@ def gradient(sample=None, dimension=None, eps=None,  model_script=None, model_ob
         if len(eps) == 1:
             eps = [eps[0]] * dimension
 
+    model = RunModel(model_script=model_script, model_object_name=model_object_name,
+                     input_template=input_template, var_names=var_names, output_script=output_script,
+                     output_object_name=output_object_name,
+                     ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
+                     verbose=verbose, model_dir=model_dir, cluster=cluster, cache=cache)
+
     if order == 'first' or order == 'second':
-        du_dj = np.zeros(dimension)
-        d2u_dj = np.zeros(dimension)
+        # All perturbed samples are appended to a single RunModel in one batch: x + eps, x - eps for each
+        # dimension, followed by the sample itself for second order derivatives.
+        points = list()
         for i in range(dimension):
             x_i1_j = np.array(sample)
             x_i1_j[0, i] += eps[i]
             x_1i_j = np.array(sample)
             x_1i_j[0, i] -= eps[i]
+            points.extend([x_i1_j, x_1i_j])
+        if order == 'second':
+            points.append(np.array(sample))
 
-            g0 = RunModel(samples=x_i1_j,  model_script=model_script,
-                          model_object_name=model_object_name,
-                          input_template=input_template, var_names=var_names, output_script=output_script,
-                          output_object_name=output_object_name,
-                          ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
-                          verbose=verbose, model_dir=model_dir, cluster=cluster)
+        model.run(np.vstack(points))
+        qoi = model.qoi_list[-len(points):]
 
-            g1 = RunModel(samples=x_1i_j,  model_script=model_script,
-                          model_object_name=model_object_name,
-                          input_template=input_template, var_names=var_names, output_script=output_script,
-                          output_object_name=output_object_name,
-                          ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
-                          verbose=verbose, model_dir=model_dir, cluster=cluster)
-
-            du_dj[i] = (g0.qoi_list[0] - g1.qoi_list[0])/(2*eps[i])
+        du_dj = np.zeros(dimension)
+        d2u_dj = np.zeros(dimension)
+        for i in range(dimension):
+            du_dj[i] = (qoi[2 * i] - qoi[2 * i + 1])/(2*eps[i])
 
             if order == 'second':
-                g = RunModel(samples=sample, model_script=model_script,
-                             model_object_name=model_object_name,
-                             input_template=input_template, var_names=var_names, output_script=output_script,
-                             output_object_name=output_object_name,
-                             ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
-                             verbose=verbose, model_dir=model_dir, cluster=cluster)
-
-                d2u_dj[i] = (g0.qoi_list[0] - 2 * g.qoi_list[0] + g1.qoi_list[0]) / (eps[i]**2)
+                d2u_dj[i] = (qoi[2 * i] - 2 * qoi[-1] + qoi[2 * i + 1]) / (eps[i]**2)
 
         return np.vstack([du_dj, d2u_dj])
 
     elif order == 'mixed':
         import itertools
         range_ = list(range(dimension))
-        d2u_dij = list()
-        for i in itertools.combinations(range_, 2):
+        pairs = list(itertools.combinations(range_, 2))
+        points = list()
+        for i in pairs:
             x_i1_j1 = np.array(sample)
             x_i1_1j = np.array(sample)
             x_1i_j1 = np.array(sample)
@@ -789,35 +1037,17 @@ def gradient(sample=None, dimension=None, eps=None,  model_script=None, model_ob
             x_1i_1j[0, i[0]] -= eps[i[0]]
             x_1i_1j[0, i[1]] -= eps[i[1]]
 
-            g0 = RunModel(samples=x_i1_j1,  model_script=model_script,
-                          model_object_name=model_object_name,
-                          input_template=input_template, var_names=var_names, output_script=output_script,
-                          output_object_name=output_object_name,
-                          ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
-                          verbose=verbose, model_dir=model_dir, cluster=cluster)
-
-            g1 = RunModel(samples=x_i1_1j,  model_script=model_script,
-                          model_object_name=model_object_name,
-                          input_template=input_template, var_names=var_names, output_script=output_script,
-                          output_object_name=output_object_name,
-                          ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
-                          verbose=verbose, model_dir=model_dir, cluster=cluster)
-
-            g2 = RunModel(samples=x_1i_j1,  model_script=model_script,
-                          model_object_name=model_object_name,
-                          input_template=input_template, var_names=var_names, output_script=output_script,
-                          output_object_name=output_object_name,
-                          ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
-                          verbose=verbose, model_dir=model_dir, cluster=cluster)
-
-            g3 = RunModel(samples=x_1i_1j,  model_script=model_script,
-                          model_object_name=model_object_name,
-                          input_template=input_template, var_names=var_names, output_script=output_script,
-                          output_object_name=output_object_name,
-                          ntasks=ntasks, cores_per_task=cores_per_task, nodes=nodes, resume=resume,
-                          verbose=verbose, model_dir=model_dir, cluster=cluster)
-
-            d2u_dij.append((g0.qoi_list[0] - g1.qoi_list[0] - g2.qoi_list[0] + g3.qoi_list[0])
+            points.extend([x_i1_j1, x_i1_1j, x_1i_j1, x_1i_1j])
+
+        if not points:
+            return np.array([])
+
+        model.run(np.vstack(points))
+        qoi = model.qoi_list[-len(points):]
+
+        d2u_dij = list()
+        for k, i in enumerate(pairs):
+            d2u_dij.append((qoi[4 * k] - qoi[4 * k + 1] - qoi[4 * k + 2] + qoi[4 * k + 3])
                            / (4 * eps[i[0]]*eps[i[1]]))
 
         return np.array(d2u_dij)
@@ -0,0 +1,301 @@
+import sys
+
+import numpy as np
+import pytest
+from scipy import stats
+
+import UQpy.Distributions as Distributions
+from UQpy.Distributions import Distribution
+
+
+########################################################################################################################
+# Registry of the distributions
+
+@pytest.mark.parametrize('dist_name, params, scipy_dist', [
+    ('normal', [1., 2.], stats.norm(1., 2.)),
+    ('gaussian', [1., 2.], stats.norm(1., 2.)),
+    ('gumbel_r', [0.5, 1.5], stats.genextreme(0, 0.5, 1.5)),
+    ('gamma', [2., 0., 3.], stats.gamma(2., 0., 3.)),
+])
+def test_scipy_distributions(dist_name, params, scipy_dist):
+    dist = Distribution(dist_name)
+    x = np.linspace(0.5, 5., 7)
+    assert np.allclose(dist.pdf(x, params), scipy_dist.pdf(x))
+    assert np.allclose(dist.log_pdf(x, params), scipy_dist.logpdf(x))
+    assert np.allclose(dist.cdf(x, params), scipy_dist.cdf(x))
+    assert np.allclose(dist.icdf(np.array([0.1, 0.5, 0.9]), params), scipy_dist.ppf([0.1, 0.5, 0.9]))
+    assert np.allclose(dist.moments(params), scipy_dist.stats(moments='mvsk'))
+
+
+def test_discrete_distribution():
+    assert np.allclose(Distribution('binomial').pdf(np.arange(4), [3, 0.4]), stats.binom(3, 0.4).pmf(np.arange(4)))
+
+
+def test_mvnormal():
+    mean, cov = np.zeros(2), np.array([[1., 0.5], [0.5, 2.]])
+    x = np.random.randn(5, 2)
+    assert np.allclose(Distribution('mvnormal').pdf(x, [mean, cov]), stats.multivariate_normal(mean, cov).pdf(x))
+    with pytest.raises(ValueError):
+        Distribution('mvnormal').icdf(x, [mean, cov])
+
+
+def test_frozen_distributions_are_cached():
+    implementation = Distributions._get_implementation('normal')
+    frozen = Distributions._freeze(implementation, [1., 2.])
+    assert Distributions._freeze(implementation, (1., 2.)) is frozen
+    assert Distributions._freeze(implementation, [1., 3.]) is not frozen
+    # Parameters given as arrays are hashed by value
+    implementation = Distributions._get_implementation('mvnormal')
+    frozen = Distributions._freeze(implementation, [np.zeros(2), np.eye(2)])
+    assert Distributions._freeze(implementation, [np.zeros(2), np.eye(2)]) is frozen
+
+
+def test_frozen_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(Distributions, 'FROZEN_CACHE_SIZE', 4)
+    implementation = Distributions._get_implementation('uniform')
+    for k in range(10):
+        Distributions._freeze(implementation, [0., 1. + k])
+    assert len(Distributions._frozen_cache) <= 4
+
+
+def test_unknown_distribution(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileExistsError):
+        Distribution('not_a_distribution')
+
+
+########################################################################################################################
+# Independent marginals
+
+MARGINALS = ['normal', 'uniform', 'normal', 'exponential', 'uniform']
+MARGINAL_PARAMS = [[0., 1.], [-1., 2.], [1., 0.5], [0., 2.], [0., 1.]]
+
+
+def test_grouped_marginals():
+    dist = Distribution(MARGINALS)
+    x = np.column_stack([stats.norm(0., 1.).rvs(10), stats.uniform(-1., 2.).rvs(10), stats.norm(1., 0.5).rvs(10),
+                         stats.expon(0., 2.).rvs(10), np.random.rand(10)])
+    marginals = [Distribution(name) for name in MARGINALS]
+    log_pdfs = np.column_stack([marginal.log_pdf(x[:, i], MARGINAL_PARAMS[i]) for i, marginal in enumerate(marginals)])
+    cdfs = np.column_stack([marginal.cdf(x[:, i], MARGINAL_PARAMS[i]) for i, marginal in enumerate(marginals)])
+    assert np.allclose(dist.log_pdf(x, MARGINAL_PARAMS), np.sum(log_pdfs, axis=1))
+    assert np.allclose(dist.pdf(x, MARGINAL_PARAMS), np.exp(np.sum(log_pdfs, axis=1)))
+    assert np.allclose(dist.cdf(x, MARGINAL_PARAMS), np.prod(cdfs, axis=1))
+
+
+def test_grouped_marginals_rvs_are_reproducible():
+    # The samples are the same as those drawn marginal by marginal
+    np.random.seed(3)
+    samples = Distribution(MARGINALS).rvs(MARGINAL_PARAMS, nsamples=6)
+    np.random.seed(3)
+    expected = np.column_stack([Distribution(name).rvs(params, 6) for name, params in zip(MARGINALS, MARGINAL_PARAMS)])
+    assert samples.shape == (6, 5) and np.array_equal(samples, expected)
+
+
+def test_marginals_inconsistent_dimensions():
+    with pytest.raises(ValueError):
+        Distribution(MARGINALS).pdf(np.zeros((2, 4)), MARGINAL_PARAMS[:4])
+
+
+########################################################################################################################
+# User-defined distributions
+
+@pytest.fixture
+def registered():
+    names = []
+
+    def register(dist_name, **functions):
+        Distributions.register_distribution(dist_name, **functions)
+        names.append(dist_name)
+
+    yield register
+    for dist_name in names:
+        Distributions._distributions.pop(dist_name.lower(), None)
+
+
+def test_register_distribution(registered):
+    registered('Triangle', pdf=lambda x, params: np.where(np.abs(x) < 1, 1 - np.abs(x), 0.),
+               cdf=lambda x, params: np.where(x < 0, (1 + x) ** 2 / 2, 1 - (1 - x) ** 2 / 2))
+    dist = Distribution('triangle')
+    assert np.allclose(dist.pdf(np.array([-0.5, 0., 2.]), []), [0.5, 1., 0.])
+    # The log_cdf is computed from the cdf, e.g. for the copula
+    assert np.allclose(Distributions.SubDistribution('triangle').log_cdf(np.array([0.]), []), np.log(0.5))
+    with pytest.raises(AttributeError):
+        dist.rvs([], 3)
+    # Registering a distribution again replaces it
+    registered('triangle', pdf=lambda x, params: np.ones_like(x))
+    assert np.allclose(Distribution('triangle').pdf(np.array([2.]), []), 1.)
+
+
+def test_register_distribution_errors(registered):
+    with pytest.raises(ValueError):
+        registered('normal', pdf=lambda x, params: x)
+    with pytest.raises(ValueError):
+        registered('triangle', pdf='not a function')
+
+
+SCRIPT_DISTRIBUTION = """import numpy as np
+
+with open('imports.txt', 'a') as f:
+    f.write('import\\n')
+
+
+def pdf(x, params):
+    return np.exp(-x / params[0]) / params[0]
+"""
+
+
+def test_distribution_script_is_imported_once(tmp_path, monkeypatch):
+    (tmp_path / 'script_distribution.py').write_text(SCRIPT_DISTRIBUTION)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'script_distribution', raising=False)
+    monkeypatch.delitem(Distributions._module_distributions, 'script_distribution', raising=False)
+    for _ in range(3):
+        assert np.allclose(Distribution('script_distribution').pdf(np.array([0.]), [2.]), 0.5)
+    assert len((tmp_path / 'imports.txt').read_text().splitlines()) == 1
+    assert 'script_distribution' in Distributions._module_distributions
+
+
+########################################################################################################################
+# Log densities with a copula
+
+def gumbel_log_density(log_u, theta):
+    # Closed form of the log density of the bivariate Gumbel copula
+    x, y = -log_u[:, 0], -log_u[:, 1]
+    s = x ** theta + y ** theta
+    a = s ** (1 / theta)
+    return -a + x + y + (theta - 1) * np.log(x * y) + (1 / theta - 2) * np.log(s) + np.log(a + theta - 1)
+
+
+def test_gaussian_copula_log_pdf_in_the_tails():
+    correlation = np.array([[1., 0.5], [0.5, 1.]])
+    dist = Distribution(['normal', 'normal'], copula='gaussian')
+    x = np.array([[0.3, -0.2], [-5., -4.], [-30., -30.], [-30., 10.]])
+    expected = stats.multivariate_normal(np.zeros(2), correlation).logpdf(x)
+    log_pdf = dist.log_pdf(x, [[0., 1.], [0., 1.]], copula_params=correlation)
+    assert np.all(np.isfinite(log_pdf)) and np.allclose(log_pdf, expected)
+    assert np.allclose(dist.pdf(x[:2], [[0., 1.], [0., 1.]], copula_params=0.5), np.exp(expected[:2]))
+
+
+def test_gumbel_copula_log_pdf_in_the_tails():
+    dist = Distribution(['normal', 'normal'], copula='gumbel')
+    params = [[0., 1.], [0., 1.]]
+    x = np.array([[0.3, -0.2], [-5., -4.], [-30., -30.]])
+    log_u = stats.norm.logcdf(x)
+    expected = gumbel_log_density(log_u, 2.) + np.sum(stats.norm.logpdf(x), axis=1)
+    log_pdf = dist.log_pdf(x, params, copula_params=2.)
+    assert np.allclose(log_pdf, expected)
+    # The pdf underflows, but not its log
+    assert np.isclose(log_pdf[2], -636.39, atol=0.01)
+    assert np.allclose(dist.pdf(x[:2], params, copula_params=2.), np.exp(expected[:2]))
+
+
+def test_copula_log_pdf_without_log_cdf():
+    # The log of the marginal cdfs is computed from the cdf of user-defined distributions
+    copula = Distributions.Copula('clayton', ['normal', 'normal'])
+    x = np.array([[0.3, -0.2], [1., 2.]])
+    log_c = copula.evaluate_log_copula(x, [[0., 1.], [0., 1.]], 2.)
+    _, c = copula.evaluate_copula(x, [[0., 1.], [0., 1.]], 2.)
+    assert np.allclose(log_c, np.log(c))
+
+
+########################################################################################################################
+# Copulas
+
+def copula(name, dim):
+    return Distributions.Copula(name, ['uniform'] * dim)
+
+
+def mixed_difference(cdf, u, h=1e-4):
+    # Finite difference approximation of the density d^d C / du_1 ... du_d
+    dim = u.shape[1]
+    density = np.zeros(u.shape[0])
+    for corner in np.ndindex(*([2] * dim)):
+        sign = (-1) ** (dim - sum(corner))
+        density += sign * cdf(u + h * (2 * np.array(corner) - 1))
+    return density / (2 * h) ** dim
+
+
+@pytest.mark.parametrize('name, theta, dim', [
+    ('clayton', 2., 2), ('clayton', 0.5, 3), ('frank', 3., 2), ('frank', -4., 2), ('frank', 2., 3), ('gumbel', 1.5, 2),
+    ('gumbel', 3., 3), ('gaussian', 0.6, 2)])
+def test_copula_density_is_the_derivative_of_the_cdf(name, theta, dim):
+    rng = np.random.RandomState(0)
+    u = 0.1 + 0.8 * rng.rand(5, dim)
+    c = copula(name, dim)
+    params = dict(dist_params=[[0., 1.]] * dim, copula_params=theta)
+    density = np.exp(c.evaluate_log_copula(u, **params))
+    expected = mixed_difference(lambda v: c.evaluate_copula_cdf(v, **params), u, h=1e-4 if dim == 2 else 1e-3)
+    assert np.allclose(density, expected, rtol=1e-3 if dim == 2 else 1e-2)
+
+
+def test_clayton_density():
+    theta, u = 2., np.array([[0.2, 0.7], [0.5, 0.5], [1e-8, 0.3]])
+    expected = np.log(1 + theta) - (theta + 1) * np.sum(np.log(u), axis=1) - \
+        (2 + 1 / theta) * np.log(np.sum(u ** -theta, axis=1) - 1)
+    assert np.allclose(copula('clayton', 2).evaluate_log_copula(u, [[0., 1.]] * 2, theta), expected)
+
+
+def test_gaussian_and_student_densities():
+    correlation = np.array([[1., 0.3, -0.2], [0.3, 1., 0.5], [-0.2, 0.5, 1.]])
+    z = np.random.RandomState(0).randn(6, 3)
+    log_c = copula('gaussian', 3).evaluate_log_copula(z, None, correlation, log_u=stats.norm.logcdf(z))
+    expected = stats.multivariate_normal(np.zeros(3), correlation).logpdf(z) - np.sum(stats.norm.logpdf(z), axis=1)
+    assert np.allclose(log_c, expected)
+    nu = 5.
+    log_c = copula('student', 3).evaluate_log_copula(z, None, [correlation, nu], log_u=stats.t.logcdf(z, nu))
+    expected = stats.multivariate_t(np.zeros(3), correlation, df=nu).logpdf(z) - np.sum(stats.t.logpdf(z, nu), axis=1)
+    assert np.allclose(log_c, expected)
+
+
+@pytest.mark.parametrize('name, theta', [
+    ('clayton', 1.5), ('frank', 4.), ('gumbel', 2.), ('gaussian', [[1., 0.5, 0.2], [0.5, 1., -0.3], [0.2, -0.3, 1.]]),
+    ('student', [[[1., 0.5, 0.2], [0.5, 1., -0.3], [0.2, -0.3, 1.]], 3.])])
+def test_copula_rvs_follow_the_cdf(name, theta):
+    np.random.seed(1)
+    c = copula(name, 3)
+    samples = c.rvs(theta, nsamples=20000)
+    assert samples.shape == (20000, 3) and np.all((samples >= 0) & (samples <= 1))
+    # The marginals are uniform
+    assert np.allclose(np.mean(samples, axis=0), 0.5, atol=0.01)
+    # The empirical cdf matches the cdf of the copula
+    points = np.array([[0.3, 0.4, 0.5], [0.6, 0.7, 0.8], [0.2, 0.9, 0.5], [0.8, 0.3, 0.6]])
+    empirical = np.array([np.mean(np.all(samples <= point, axis=1)) for point in points])
+    assert np.allclose(empirical, c.evaluate_copula_cdf(points, [[0., 1.]] * 3, theta), atol=0.015)
+
+
+@pytest.mark.parametrize('name, theta, tau', [('clayton', 2., 0.5), ('gumbel', 2., 0.5), ('frank', -5., -0.46)])
+def test_bivariate_copula_rvs_kendall_tau(name, theta, tau):
+    np.random.seed(2)
+    samples = copula(name, 2).rvs(theta, nsamples=5000)
+    assert np.isclose(stats.kendalltau(samples[:, 0], samples[:, 1])[0], tau, atol=0.03)
+
+
+def test_distribution_with_copula_rvs_and_icdf():
+    np.random.seed(3)
+    dist = Distribution(['normal', 'exponential'], copula='clayton')
+    params = [[1., 2.], [0., 1.]]
+    samples = dist.rvs(params, nsamples=5000, copula_params=2.)
+    assert samples.shape == (5000, 2) and np.all(samples[:, 1] >= 0)
+    assert np.allclose(np.mean(samples, axis=0), [1., 1.], atol=0.1)
+    # The samples are obtained by the inverse Rosenblatt transformation of uniform points
+    w = np.array([[0.5, 0.5], [0.1, 0.9]])
+    u = Distributions.Copula('clayton', ['normal', 'exponential']).icdf(w, 2.)
+    assert np.allclose(u[:, 0], w[:, 0])
+    x = dist.icdf(w, params, copula_params=2.)
+    assert np.allclose(x[0], stats.norm(1., 2.).ppf(u[:, 0])) and np.allclose(x[1], stats.expon.ppf(u[:, 1]))
+
+
+@pytest.mark.parametrize('name, dim, params', [
+    ('clayton', 2, 0.), ('clayton', 2, -1.), ('gumbel', 2, 0.5), ('frank', 2, 0.), ('frank', 3, -1.),
+    ('gaussian', 2, 1.5), ('gaussian', 3, np.eye(2)), ('gaussian', 2, [[1., 0.5], [0.4, 1.]]),
+    ('student', 2, 0.5), ('student', 2, [0.5, 0.]), ('student', 2, [0.5, 4., 1.])])
+def test_copula_invalid_parameters(name, dim, params):
+    with pytest.raises(ValueError):
+        copula(name, dim).evaluate_log_copula(np.full((1, dim), 0.5), [[0., 1.]] * dim, params)
+
+
+def test_unknown_copula():
+    with pytest.raises(ValueError):
+        Distribution(['normal', 'normal'], copula='joe')
@@ -0,0 +1,70 @@
+import sys
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from UQpy.Reliability import SubsetSimulation
+from UQpy.RunModel import EvaluationCache
+
+
+LIMIT_STATE = """import numpy as np
+
+
+def g(sample):
+    with open('calls.txt', 'a') as f:
+        f.write('call\\n')
+    return 3. - np.sum(sample) / np.sqrt(2)
+"""
+
+
+@pytest.fixture
+def limit_state(tmp_path, monkeypatch):
+    """
+    A linear limit state function in a temporary directory, which records each call in calls.txt
+    """
+    (tmp_path / 'limit_state.py').write_text(LIMIT_STATE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'limit_state', raising=False)
+    return tmp_path
+
+
+def run_subset_simulation(**kwargs):
+    np.random.seed(1)
+    return SubsetSimulation(dimension=2, pdf_proposal_type='Normal', pdf_proposal_scale=[1, 1], nsamples_ss=200,
+                            p_cond=0.1, model_script='limit_state.py', model_object_name='g', algorithm='MMH',
+                            log_pdf_target=lambda x: np.sum(stats.norm.logpdf(x)),
+                            samples_init=np.random.randn(200, 2), **kwargs)
+
+
+def count_calls(path):
+    return len((path / 'calls.txt').read_text().splitlines())
+
+
+def test_subset_simulation_evaluates_all_samples_by_default(limit_state):
+    sus = run_subset_simulation()
+    # At each level after the first, the model is evaluated at the new states of the chains, not at their seeds
+    assert count_calls(limit_state) == 200 + (len(sus.samples) - 1) * (200 - 20)
+
+
+def test_subset_simulation_deduplicate(limit_state):
+    sus = run_subset_simulation()
+    calls = count_calls(limit_state)
+    (limit_state / 'calls.txt').unlink()
+
+    # The chains which reject their proposals from the same state are evaluated once, with the same estimate
+    sus_dedup = run_subset_simulation(deduplicate=True)
+    assert count_calls(limit_state) < calls
+    assert sus_dedup.pf == sus.pf
+
+
+def test_subset_simulation_cache(limit_state):
+    sus = run_subset_simulation()
+    calls = count_calls(limit_state)
+    (limit_state / 'calls.txt').unlink()
+
+    # The rejected proposals repeat states evaluated before, which are found in the cache
+    sus_cache = run_subset_simulation(cache=EvaluationCache())
+    assert count_calls(limit_state) < calls
+    assert sus_cache.pf == sus.pf
@@ -0,0 +1,749 @@
+import asyncio
+import operator
+import subprocess
+import threading
+import time
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from UQpy.RunModel import (RunModel, EvaluationCache, InputTemplate, SerialExecutor, ThreadExecutor, ProcessExecutor,
+                           SubprocessExecutor, RemoteExecutor, RemoteWorker, _run_command, _spawn_lock)
+
+
+MODEL_SCRIPT = """import os
+import sys
+import threading
+import time
+
+index = int(sys.argv[1])
+with open(os.path.join('InputFiles', 'in_%d.txt' % index)) as f:
+    values = [float(line.split('=')[1]) for line in f if '=' in line]
+if os.path.isfile('solve_time.txt'):
+    with open('solve_time.txt') as f:
+        time.sleep(float(f.read()))
+os.makedirs('OutputFiles', exist_ok=True)
+with open(os.path.join('OutputFiles', 'out_%d.txt' % index), 'w') as f:
+    f.write(str(sum(values)))
+"""
+
+OUTPUT_SCRIPT = """import os
+import threading
+import time
+
+
+def read_output(index):
+    if os.path.isfile('output_time.txt'):
+        with open('output_time.txt') as f:
+            time.sleep(float(f.read()))
+    with open(os.path.join(os.getcwd(), 'OutputFiles', 'out_%d.txt' % index)) as f:
+        return float(f.read())
+"""
+
+INPUT_TEMPLATE = """a = <x0>
+b = <x1>
+c = <x0>
+"""
+
+
+@pytest.fixture
+def template_model(tmp_path, monkeypatch):
+    """
+    A third-party model workflow in a temporary directory: the model writes 2 * x0 + x1 to its output file. The model
+    and the output script sleep for the times written in the files solve_time.txt and output_time.txt, if any.
+    """
+    (tmp_path / 'model.py').write_text(MODEL_SCRIPT)
+    (tmp_path / 'output.py').write_text(OUTPUT_SCRIPT)
+    (tmp_path / 'in.txt').write_text(INPUT_TEMPLATE)
+    monkeypatch.chdir(tmp_path)
+    # RunModel imports the output script from the python path
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'output', raising=False)
+    return dict(model_script='model.py', input_template='in.txt', var_names=['x0', 'x1'], output_script='output.py')
+
+
+def expected_qoi(samples):
+    return 2 * samples[:, 0] + samples[:, 1]
+
+
+async def collect(model, samples):
+    return dict([(index, qoi) async for index, qoi in model.run_async(samples)])
+
+
+########################################################################################################################
+# run_async
+
+def test_run_async_does_not_hold_spawn_lock(template_model):
+    samples = np.round(np.random.rand(6, 2), 3)
+    model = RunModel(ntasks=3, **template_model)
+    held = []
+
+    async def main():
+        runs = asyncio.ensure_future(collect(model, samples))
+        # Between two steps of the event loop, the loop thread must not own the lock
+        while not runs.done():
+            held.append(_spawn_lock._is_owned())
+            await asyncio.sleep(0)
+        return await runs
+
+    qoi = asyncio.run(main())
+    assert not any(held)
+    assert np.allclose([qoi[i] for i in range(6)], expected_qoi(samples), atol=1e-3)
+
+
+def test_run_async_collects_outputs_concurrently(template_model, tmp_path):
+    (tmp_path / 'output_time.txt').write_text('1')
+    samples = np.round(np.random.rand(4, 2), 3)
+    model = RunModel(ntasks=4, **template_model)
+    # Start the output workers before timing the runs
+    model._output_executor()
+    gaps = []
+
+    async def ticker():
+        while True:
+            start_time = time.time()
+            await asyncio.sleep(0.01)
+            gaps.append(time.time() - start_time)
+
+    async def main():
+        ticks = asyncio.ensure_future(ticker())
+        start_time = time.time()
+        qoi = await collect(model, samples)
+        elapsed = time.time() - start_time
+        ticks.cancel()
+        return qoi, elapsed
+
+    qoi, elapsed = asyncio.run(main())
+    assert np.allclose([qoi[i] for i in range(4)], expected_qoi(samples), atol=1e-3)
+    # The four output scripts of 1 s run at the same time, and the event loop is never blocked by them
+    assert elapsed < 2.5
+    assert max(gaps) < 0.5
+
+
+########################################################################################################################
+# Journal
+
+PYTHON_MODEL = """import numpy as np
+
+
+def model(sample):
+    with open('calls.txt', 'a') as f:
+        f.write('call\\n')
+    if np.min(sample) < 0:
+        raise ValueError('negative sample')
+    return float(np.sum(sample))
+
+
+def vectorized_model(samples):
+    with open('calls.txt', 'a') as f:
+        f.write('call\\n')
+    return np.sum(samples, axis=1)
+
+
+def array_model(sample):
+    return 2 * np.ravel(sample)
+
+
+def row_model(samples):
+    return samples[0, 0] - samples[0, 1]
+"""
+
+
+@pytest.fixture
+def python_model(tmp_path, monkeypatch):
+    """
+    A Python model in a temporary directory, which records each call in calls.txt and fails at negative samples
+    """
+    (tmp_path / 'python_model.py').write_text(PYTHON_MODEL)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'python_model', raising=False)
+    return dict(model_script='python_model.py', model_object_name='model')
+
+
+def count_calls(tmp_path):
+    calls = tmp_path / 'calls.txt'
+    return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+
+def test_journal_resume_skips_recorded_evaluations(python_model, tmp_path):
+    samples = np.array([[1., 2.], [-1., 0.], [3., 4.]])
+    model = RunModel(samples=samples, journal='journal.db', on_failure='nan', **python_model)
+    assert model.failed == [1] and count_calls(tmp_path) == 3
+    model.journal.close()
+
+    # Only the failed evaluation is executed again
+    resumed = RunModel(samples=samples, journal='journal.db', on_failure='nan', **python_model)
+    assert count_calls(tmp_path) == 4
+    assert resumed.qoi_list[0] == 3. and resumed.qoi_list[2] == 7.
+    resumed.journal.close()
+
+
+def test_journal_records_template_runs_without_output(template_model):
+    del template_model['output_script']
+    samples = np.round(np.random.rand(3, 2), 3)
+    model = RunModel(samples=samples, journal='journal.db', **template_model)
+    assert len(model.job_log) == 3
+    model.journal.close()
+
+    resumed = RunModel(samples=samples, journal='journal.db', **template_model)
+    assert len(resumed.job_log) == 0
+    resumed.journal.close()
+
+
+########################################################################################################################
+# Timeouts
+
+def test_run_command_timeout(tmp_path):
+    start_time = time.time()
+    returncode, _, timed_out = _run_command([sys.executable, '-c', 'import time; time.sleep(10)'], str(tmp_path),
+                                            timeout=0.5)
+    assert timed_out and returncode < 0
+    assert time.time() - start_time < 5
+
+
+@pytest.mark.skipif(not hasattr(os, 'waitid'), reason='requires os.waitid')
+def test_run_command_finished_run_is_not_timed_out(tmp_path, monkeypatch):
+    # The timeout expires after the process exits, but before it is reaped
+    wait4 = os.wait4
+
+    def slow_wait4(pid, options):
+        time.sleep(1)
+        return wait4(pid, options)
+
+    monkeypatch.setattr(os, 'wait4', slow_wait4)
+    returncode, _, timed_out = _run_command([sys.executable, '-c', 'pass'], str(tmp_path), timeout=0.5)
+    assert not timed_out and returncode == 0
+
+
+########################################################################################################################
+# Executors
+
+@pytest.fixture(params=['serial', 'threads', 'processes', 'subprocesses', 'remote'])
+def executor(request, tmp_path):
+    worker = None
+    if request.param == 'serial':
+        executor = SerialExecutor()
+    elif request.param == 'threads':
+        executor = ThreadExecutor(ntasks=2)
+    elif request.param == 'processes':
+        executor = ProcessExecutor(ntasks=2)
+    elif request.param == 'subprocesses':
+        executor = SubprocessExecutor(ntasks=2, tmp_dir=str(tmp_path))
+    else:
+        # A worker listening in a thread of the test process, with two connections
+        worker = RemoteWorker()
+        threading.Thread(target=worker.serve_forever, daemon=True).start()
+        executor = RemoteExecutor([worker.address, worker.address])
+    yield executor
+    executor.close()
+    if worker is not None:
+        worker.close()
+
+
+def test_executor_starmap_and_apply(executor):
+    assert executor.starmap(operator.add, [(k, 1) for k in range(4)]) == list(range(1, 5))
+    assert sorted(executor.starmap_unordered(operator.mul, [(k, 2) for k in range(3)])) == \
+        [(k, 2 * k) for k in range(3)]
+    assert executor.apply(divmod, 7, 2) == (3, 1)
+
+
+def test_executor_collect_raises_task_exception(executor):
+    job_id = executor.submit(operator.truediv, [(1, 0)])[0]
+    assert executor.poll([job_id]) == [job_id]
+    with pytest.raises(ZeroDivisionError):
+        executor.collect(job_id)
+
+
+def test_starmap_unordered_stops_early():
+    calls = []
+
+    def task(k):
+        calls.append(k)
+        return k
+
+    with SerialExecutor() as executor:
+        for position, value in executor.starmap_unordered(task, [(k,) for k in range(10)], max_pending=2):
+            if position == 2:
+                break
+    # The items beyond the pending ones are never evaluated
+    assert calls == [0, 1, 2]
+
+
+def test_executor_rejects_invalid_ntasks():
+    with pytest.raises(ValueError):
+        ThreadExecutor(ntasks=0)
+
+
+@pytest.mark.parametrize('executor_type', [SerialExecutor, ThreadExecutor, ProcessExecutor])
+def test_run_model_with_executor(python_model, tmp_path, executor_type):
+    samples = np.random.rand(8, 2)
+    with executor_type() if executor_type is SerialExecutor else executor_type(ntasks=2) as executor:
+        model = RunModel(samples=samples, executor=executor, **python_model)
+        model.run(samples + 1)
+    assert np.allclose(model.qoi_list, np.sum(np.concatenate((samples, samples + 1)), axis=1))
+    assert count_calls(tmp_path) == 16
+
+
+def test_process_executor_reuses_workers(python_model):
+    samples = np.random.rand(6, 2)
+    workers = set()
+    with ProcessExecutor(ntasks=2, model_script='python_model.py', model_object_name='model') as executor:
+        for _ in range(3):
+            model = RunModel(samples=samples, executor=executor, **python_model)
+            assert np.allclose(model.qoi_list, np.sum(samples, axis=1))
+            workers.update(record['worker'].split('/')[0] for record in model.records)
+    # The same two worker processes evaluate the samples of all the RunModel calls
+    assert len(workers) <= 2 and str(os.getpid()) not in workers
+
+
+@pytest.mark.parametrize('ntasks', [1, 2])
+def test_shared_executor_runs_models_of_several_directories(tmp_path, monkeypatch, ntasks):
+    # The workers of the shared executor outlive the RunModel and the working directory which started them
+    samples = np.random.rand(4, 2)
+    for name, factor in [('a', 1.), ('b', 2.), ('c', 3.)]:
+        model_dir = tmp_path / name
+        model_dir.mkdir()
+        model_script = 'model_%s.py' % name if name != 'c' else 'model_a.py'
+        (model_dir / model_script).write_text('import numpy as np\n\n\ndef model(sample):\n'
+                                              '    return %s * float(np.sum(sample))\n' % factor)
+        monkeypatch.chdir(model_dir)
+        model = RunModel(samples=samples, model_script=model_script, model_object_name='model', ntasks=ntasks,
+                         model_dir='runs' if ntasks == 1 else None)
+        # Models with the same script name in another directory are not confused
+        assert np.allclose(model.qoi_list, factor * np.sum(samples, axis=1))
+
+
+def test_remote_executor_fails_queued_tasks_when_all_workers_die():
+    # Two remote workers in other processes, which print their port
+    command = ('from UQpy.RunModel import RemoteWorker; worker = RemoteWorker(); print(worker.address[1], flush=True); '
+               'worker.serve_forever()')
+    workers = [subprocess.Popen([sys.executable, '-c', command], stdout=subprocess.PIPE) for _ in range(2)]
+    try:
+        ports = [int(worker.stdout.readline()) for worker in workers]
+        executor = RemoteExecutor([('localhost', port) for port in ports])
+        job_ids = executor.submit(time.sleep, [(30,)] * 6)
+        time.sleep(0.5)
+    finally:
+        for worker in workers:
+            worker.kill()
+            worker.wait()
+    # The running tasks and the queued ones fail instead of waiting forever
+    start_time = time.time()
+    pending = list(job_ids)
+    while len(pending) > 0 and time.time() - start_time < 10:
+        for job_id in executor.poll(pending, timeout=1):
+            pending.remove(job_id)
+            with pytest.raises((ConnectionError, EOFError, OSError)):
+                executor.collect(job_id)
+    assert pending == []
+    # New tasks fail at once
+    with pytest.raises(ConnectionError):
+        executor.apply(operator.add, 1, 2)
+    executor.close()
+
+
+def test_run_model_rejects_invalid_executor(python_model):
+    with pytest.raises(ValueError):
+        RunModel(samples=np.ones((2, 2)), executor='threads', **python_model)
+
+
+########################################################################################################################
+# Thread backend
+
+def test_thread_backend(python_model, tmp_path):
+    samples = np.random.rand(8, 2)
+    model = RunModel(samples=samples, ntasks=2, backend='threads', **python_model)
+    assert np.allclose(model.qoi_list, np.sum(samples, axis=1))
+    assert count_calls(tmp_path) == 8
+    # The model is executed in threads of the Python process
+    assert all(record['worker'].split('/')[0] == str(os.getpid()) for record in model.records)
+
+
+def test_thread_backend_rejects_model_dir(python_model):
+    with pytest.raises(ValueError):
+        RunModel(samples=np.ones((2, 2)), ntasks=2, backend='threads', model_dir='run', **python_model)
+    with pytest.raises(ValueError):
+        RunModel(samples=np.ones((2, 2)), ntasks=2, backend='greenlets', **python_model)
+
+
+########################################################################################################################
+# Deduplication
+
+def test_deduplicate_identical_samples(python_model, tmp_path):
+    samples = np.array([[1., 2.], [3., 4.], [1., 2.], [1., 2.]])
+    model = RunModel(samples=samples, deduplicate=True, **python_model)
+    assert model.qoi_list == [3., 7., 3., 3.]
+    assert count_calls(tmp_path) == 2
+    # Only the evaluated samples have a record
+    assert sorted(record['index'] for record in model.records) == [0, 1]
+
+
+def test_deduplicate_with_tolerance(python_model, tmp_path):
+    samples = np.array([[1., 2.], [1. + 1e-9, 2.], [1. + 1e-3, 2.], [3., 4.]])
+    model = RunModel(samples=samples, deduplicate=True, dedup_tol=1e-6, **python_model)
+    assert count_calls(tmp_path) == 3
+    # The quantity of interest of the first occurrence is copied to the samples within the tolerance
+    assert model.qoi_list[1] == model.qoi_list[0] == 3.
+    assert np.isclose(model.qoi_list[2], 3.001)
+
+
+def test_deduplicate_copies_failures(python_model, tmp_path):
+    samples = np.array([[-1., 2.], [1., 2.], [-1., 2.]])
+    model = RunModel(samples=samples, deduplicate=True, on_failure='nan', **python_model)
+    assert count_calls(tmp_path) == 2
+    assert sorted(model.failed) == [0, 2] and np.isnan(model.qoi_list[2])
+
+
+def test_no_deduplication_by_default(python_model, tmp_path):
+    RunModel(samples=np.array([[1., 2.], [1., 2.]]), **python_model)
+    assert count_calls(tmp_path) == 2
+
+
+########################################################################################################################
+# Evaluation cache
+
+def test_cache_skips_evaluated_samples(python_model, tmp_path):
+    cache = EvaluationCache()
+    samples = np.array([[1., 2.], [3., 4.]])
+    RunModel(samples=samples, cache=cache, **python_model)
+    model = RunModel(samples=np.array([[3., 4.], [5., 6.]]), cache=cache, **python_model)
+    assert model.qoi_list == [7., 11.]
+    assert count_calls(tmp_path) == 3 and len(cache) == 3
+
+
+def test_cache_on_disk(tmp_path):
+    key = EvaluationCache.make_key(np.array([1., 2.]), 'model.py', 'model')
+    assert key != EvaluationCache.make_key(np.array([1., 2.]), 'other.py', 'model')
+    cache = EvaluationCache(maxsize=1, path=str(tmp_path / 'cache.db'))
+    cache.put(key, np.arange(3))
+    cache.put(EvaluationCache.make_key(np.array([3., 4.])), 1.)
+    # The first evaluation was dropped from memory, but not from disk
+    found, qoi = cache.get(key)
+    assert found and np.array_equal(qoi, np.arange(3))
+    cache.close()
+    cache = EvaluationCache(path=str(tmp_path / 'cache.db'))
+    found, qoi = cache.get(key)
+    assert found and np.array_equal(qoi, np.arange(3))
+    assert not cache.get(EvaluationCache.make_key(np.array([5., 6.])))[0]
+    cache.close()
+
+
+########################################################################################################################
+# Vectorized models
+
+def test_vectorized_model_is_called_per_chunk(python_model, tmp_path):
+    samples = np.random.rand(10, 2)
+    model = RunModel(samples=samples, model_script='python_model.py', model_object_name='vectorized_model',
+                     vectorized=True, chunk_size=4)
+    assert np.allclose(model.qoi_list, np.sum(samples, axis=1))
+    assert count_calls(tmp_path) == 3
+
+
+########################################################################################################################
+# Failures
+
+def test_failure_is_raised_by_default(python_model):
+    with pytest.raises(ValueError):
+        RunModel(samples=np.array([[1., 2.], [-1., 2.]]), **python_model)
+
+
+def test_failed_evaluations_are_retried(python_model, tmp_path):
+    samples = np.array([[1., 2.], [-1., 2.]])
+    model = RunModel(samples=samples, retries=2, retry_delay=0., on_failure='nan', **python_model)
+    assert count_calls(tmp_path) == 4
+    assert model.failed == [1] and model.qoi_list[0] == 3. and np.isnan(model.qoi_list[1])
+
+
+def test_invalid_failure_policy(python_model):
+    with pytest.raises(ValueError):
+        RunModel(samples=np.ones((2, 2)), on_failure='ignore', **python_model)
+
+
+def test_template_run_timeout(template_model, tmp_path):
+    (tmp_path / 'solve_time.txt').write_text('10')
+    start_time = time.time()
+    model = RunModel(samples=np.ones((2, 2)), ntasks=2, timeout=0.5, on_failure='nan', **template_model)
+    assert time.time() - start_time < 5
+    assert sorted(model.failed) == [0, 1] and all(np.isnan(qoi) for qoi in model.qoi_list)
+
+
+########################################################################################################################
+# Streaming and incremental execution
+
+def test_iter_results_stops_early(python_model, tmp_path):
+    model = RunModel(**python_model)
+    results = []
+    for index, qoi in model.iter_results(np.arange(20.).reshape(10, 2)):
+        results.append((index, qoi))
+        if len(results) == 2:
+            break
+    assert results == [(0, 1.), (1, 5.)]
+    # The remaining samples are never evaluated
+    assert count_calls(tmp_path) == 2
+
+
+def test_iter_results_parallel(python_model):
+    samples = np.random.rand(8, 2)
+    with ThreadExecutor(ntasks=2) as executor:
+        model = RunModel(executor=executor, **python_model)
+        results = dict(model.iter_results(samples))
+    assert sorted(results) == list(range(8))
+    assert np.allclose([results[i] for i in range(8)], np.sum(samples, axis=1))
+
+
+def test_run_appends_new_samples(python_model, tmp_path):
+    model = RunModel(**python_model)
+    model.run(np.array([[1., 2.]]))
+    model.run(np.array([[3., 4.], [5., 6.]]))
+    assert model.nsim == 3 and np.array_equal(model.samples, [[1., 2.], [3., 4.], [5., 6.]])
+    assert model.qoi_list == [3., 7., 11.]
+    # Only the new samples are evaluated at each call
+    assert count_calls(tmp_path) == 3
+
+
+@pytest.mark.parametrize('as_list', [False, True])
+def test_run_appends_samples_without_copying_them_at_each_call(python_model, as_list):
+    first = [np.array([1., 2.])] if as_list else np.array([[1., 2.]])
+    model = RunModel(samples=first, **python_model)
+    copies = 0
+    for k in range(100):
+        previous = model.samples
+        model.run([np.array([k, 0.])] if as_list else np.array([[k, 0.]]))
+        copies += model.samples is not previous if as_list else not np.shares_memory(model.samples, previous)
+    assert model.nsim == 101 and np.array_equal(np.asarray(model.samples)[1:, 0], np.arange(100))
+    assert model.qoi_list == [3.] + list(range(100))
+    # The samples grow geometrically (or in place for a list), and the samples of the user are not modified
+    assert copies <= 8
+    assert len(first) == 1
+
+
+def test_run_appends_new_samples_template(template_model):
+    model = RunModel(**template_model)
+    first, second = np.round(np.random.rand(2, 2), 3), np.round(np.random.rand(1, 2), 3)
+    model.run(first)
+    model.run(second)
+    assert np.allclose(model.qoi_list, expected_qoi(np.concatenate((first, second))), atol=1e-3)
+    assert len(model.job_log) == 3
+
+
+########################################################################################################################
+# Staging of the model files
+
+@pytest.mark.parametrize('staging', ['copy', 'symlink', 'hardlink'])
+def test_staging(template_model, tmp_path, staging):
+    samples = np.round(np.random.rand(3, 2), 3)
+    model = RunModel(samples=samples, ntasks=2, staging=staging, copy_files=['in.txt'], **template_model)
+    assert np.allclose(model.qoi_list, expected_qoi(samples), atol=1e-3)
+
+    work_dir = tmp_path / 'staged'
+    work_dir.mkdir()
+    model._stage_model_files(str(work_dir))
+    assert (work_dir / 'model.py').is_symlink() == (staging == 'symlink')
+    assert os.path.samefile(work_dir / 'model.py', tmp_path / 'model.py') == (staging != 'copy')
+    assert not os.path.samefile(work_dir / 'in.txt', tmp_path / 'in.txt')
+    # Removing the staged files never removes the original files
+    model._remove_model_files(str(work_dir))
+    assert os.listdir(work_dir) == [] and (tmp_path / 'model.py').is_file()
+
+
+def test_invalid_staging(template_model):
+    with pytest.raises(ValueError):
+        RunModel(staging='move', **template_model)
+
+
+def test_model_files_are_staged_explicitly(template_model, tmp_path):
+    (tmp_path / 'data.txt').write_text('data')
+    (tmp_path / 'unrelated.txt').write_text('unrelated')
+    model = RunModel(model_files=['data.txt'], **template_model)
+    staged = sorted(os.path.basename(name) for name in model._list_model_files())
+    assert staged == ['data.txt', 'in.txt', 'model.py', 'output.py']
+
+
+def test_run_outputs_are_not_staged(template_model, tmp_path):
+    samples = np.round(np.random.rand(2, 2), 3)
+    RunModel(samples=samples, journal='journal.db', **template_model).journal.close()
+    (tmp_path / 'data.txt').write_text('data')
+    model = RunModel(journal='journal.db', **template_model)
+    staged = sorted(os.path.basename(name) for name in model._list_model_files())
+    assert staged == ['data.txt', 'in.txt', 'model.py', 'output.py']
+    model.journal.close()
+
+
+########################################################################################################################
+# Input template
+
+def test_input_template_render():
+    # <x11> is never read as the variable x1
+    template = InputTemplate('a = <x1>\nb = <x11>\nc = <x1>\n', ['x1', 'x11'])
+    assert template.render([1.5, 2]) == 'a = 1.5\nb = 2\nc = 1.5\n'
+    assert template.render_all([[1, 2], [3, 4]]) == ['a = 1\nb = 2\nc = 1\n', 'a = 3\nb = 4\nc = 3\n']
+    # Iterable values are flattened
+    assert InputTemplate('v = <v>', ['v']).render([np.array([[1, 2], [3, 4]])]) == 'v = 1, 2, 3, 4'
+
+
+def test_input_template_ls_dyna():
+    assert InputTemplate('<x0>', ['x0'], fmt='ls-dyna').render([3.14159]) == '    3.1416'
+
+
+########################################################################################################################
+# Shared memory
+
+@pytest.mark.parametrize('model_object_name', ['model', 'array_model'])
+def test_shared_memory(python_model, monkeypatch, model_object_name):
+    samples = np.random.rand(20, 3)
+    calls = []
+    shared_python_execution = RunModel._shared_python_execution
+
+    def spy(self, *args):
+        calls.append(args)
+        return shared_python_execution(self, *args)
+
+    monkeypatch.setattr(RunModel, '_shared_python_execution', spy)
+    shm_before = set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+    with ProcessExecutor(ntasks=2) as executor:
+        model = RunModel(samples=samples, model_script='python_model.py', model_object_name=model_object_name,
+                         executor=executor, chunk_size=3, shared_memory=True)
+    expected = np.sum(samples, axis=1) if model_object_name == 'model' else 2 * samples
+    assert np.allclose(np.array(model.qoi_list), expected) and len(calls) == 1
+    # The shared memory blocks are removed
+    if os.path.isdir('/dev/shm'):
+        assert set(os.listdir('/dev/shm')) <= shm_before
+
+
+########################################################################################################################
+# Local scheduler
+
+def test_local_scheduler(template_model, tmp_path):
+    samples = np.round(np.random.rand(5, 2), 3)
+    model = RunModel(samples=samples, ntasks=2, **template_model)
+    assert np.allclose(model.qoi_list, expected_qoi(samples), atol=1e-3)
+    assert sorted(job['index'] for job in model.job_log) == list(range(5))
+    assert all(job['exit_code'] == 0 for job in model.job_log)
+    # The job log is written in the format of GNU parallel
+    with open(tmp_path / 'logs' / 'runtask.log') as f:
+        assert len(f.read().splitlines()) == 6
+
+
+def test_local_scheduler_runs_in_parallel(template_model, tmp_path):
+    (tmp_path / 'solve_time.txt').write_text('1')
+    samples = np.round(np.random.rand(4, 2), 3)
+    start_time = time.time()
+    model = RunModel(samples=samples, ntasks=4, **template_model)
+    assert time.time() - start_time < 3
+    assert np.allclose(model.qoi_list, expected_qoi(samples), atol=1e-3)
+
+
+def test_local_scheduler_resume(template_model):
+    del template_model['output_script']
+    samples = np.round(np.random.rand(3, 2), 3)
+    RunModel(samples=samples, ntasks=2, **template_model)
+    model = RunModel(samples=samples, ntasks=2, resume=True, **template_model)
+    # The runs listed in the job log are not executed again
+    assert len(model.job_log) == 0
+
+
+def test_outputs_are_collected_as_runs_finish(template_model, tmp_path):
+    (tmp_path / 'output_time.txt').write_text('0.5')
+    samples = np.round(np.random.rand(4, 2), 3)
+    model = RunModel(samples=samples, ntasks=4, **template_model)
+    assert np.allclose(model.qoi_list, expected_qoi(samples), atol=1e-3)
+    # The output scripts of the runs execute at the same time
+    outputs = [record['output'] for record in model.records]
+    assert max(start for start, _ in outputs) < min(end for _, end in outputs)
+
+
+########################################################################################################################
+# Working directory
+
+def test_model_dir_does_not_change_working_directory(template_model, tmp_path):
+    samples = np.round(np.random.rand(2, 2), 3)
+    model = RunModel(samples=samples, ntasks=2, model_dir='runs', **template_model)
+    assert os.getcwd() == str(tmp_path)
+    assert np.allclose(model.qoi_list, expected_qoi(samples), atol=1e-3)
+    # The runs are executed in model_dir, which is created in the working directory
+    assert os.path.dirname(model.return_dir) == str(tmp_path)
+    assert os.path.basename(model.return_dir).startswith('runs_')
+    assert len([name for name in os.listdir(model.return_dir) if name.startswith('run_')]) == 2
+
+
+@pytest.mark.parametrize('options', [dict(), dict(model_dir='runs'), dict(ntasks=2),
+                                     dict(ntasks=2, shared_memory=True)])
+def test_python_model_receives_rows(python_model, options):
+    # The model receives each sample as an ndarray of shape (1, dimension), whatever the execution
+    samples = np.random.rand(4, 2)
+    model = RunModel(samples=samples, model_script='python_model.py', model_object_name='row_model', **options)
+    assert np.allclose(model.qoi_list, samples[:, 0] - samples[:, 1])
+
+
+def test_concurrent_models_in_threads(template_model, tmp_path):
+    samples = [np.round(np.random.rand(2, 2), 3) for _ in range(3)]
+    models = [None] * 3
+
+    def run(k):
+        models[k] = RunModel(samples=samples[k], model_dir='runs_' + str(k), **template_model)
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for model, model_samples in zip(models, samples):
+        assert np.allclose(model.qoi_list, expected_qoi(model_samples), atol=1e-3)
+    assert os.getcwd() == str(tmp_path)
+
+
+########################################################################################################################
+# Records
+
+def test_records_of_template_runs(template_model):
+    samples = np.round(np.random.rand(3, 2), 3)
+    seen = []
+    model = RunModel(samples=samples, ntasks=2, hook=seen.append, **template_model)
+    assert sorted(record['index'] for record in model.records) == [0, 1, 2]
+    assert [record['index'] for record in seen] == [record['index'] for record in model.records]
+    for record in model.records:
+        assert record['exit_code'] == 0 and record['attempts'] == 1 and record['max_rss'] > 0
+        for phase in ['stage', 'input', 'solve', 'output']:
+            start_time, end_time = record[phase]
+            assert start_time <= end_time
+        assert record['stage'][0] <= record['solve'][0] <= record['output'][0]
+
+
+def test_records_of_python_model(python_model):
+    model = RunModel(samples=np.ones((2, 2)), **python_model)
+    for record in model.records:
+        assert record['exit_code'] is None and record['solve'] is not None and record['output'] is None
+
+
+########################################################################################################################
+# Blocks of samples
+
+class CountingExecutor(ThreadExecutor):
+
+    def __init__(self, ntasks=1):
+        super().__init__(ntasks=ntasks)
+        self.tasks = 0
+
+    def submit(self, func, args_list):
+        args_list = list(args_list)
+        self.tasks += len(args_list)
+        return super().submit(func, args_list)
+
+
+@pytest.mark.parametrize('chunk_size, tasks', [(None, 4), (3, 4), (10, 1)])
+def test_samples_are_dispatched_in_blocks(python_model, tmp_path, chunk_size, tasks):
+    samples = np.random.rand(10, 2)
+    with CountingExecutor(ntasks=1) as executor:
+        model = RunModel(samples=samples, executor=executor, chunk_size=chunk_size, **python_model)
+    assert np.allclose(model.qoi_list, np.sum(samples, axis=1))
+    assert executor.tasks == tasks and count_calls(tmp_path) == 10
+
+
+def test_list_samples_are_dispatched_in_blocks(python_model):
+    samples = [[1., 2.], [3., 4.], [5., 6.]]
+    with CountingExecutor(ntasks=2) as executor:
+        model = RunModel(samples=samples, executor=executor, chunk_size=2, **python_model)
+    assert model.qoi_list == [3., 7., 11.] and executor.tasks == 2
@@ -0,0 +1,71 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from scipy import stats
+
+from UQpy.SampleMethods import MCMC, IS
+
+
+########################################################################################################################
+# MCMC
+
+def test_mcmc_leaves_a_seed_with_zero_density():
+    np.random.seed(0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        mcmc = MCMC(dimension=1, pdf_target='Uniform', pdf_target_params=[0, 1], algorithm='MH', nsamples=200,
+                    seed=[5.], pdf_proposal_type='Normal', pdf_proposal_scale=[1.])
+    assert mcmc.accept_ratio > 0
+    assert len(np.unique(mcmc.samples)) > 1
+
+
+def test_mcmc_with_a_distribution_target():
+    np.random.seed(0)
+    mcmc = MCMC(dimension=2, pdf_target=['Normal', 'Normal'], pdf_target_params=[[1, 1], [0, 2]], algorithm='MH',
+                nsamples=5000, jump=3, nburn=200, seed=[0, 0])
+    assert np.allclose(np.mean(mcmc.samples, axis=0), [1, 0], atol=0.2)
+    assert np.allclose(np.std(mcmc.samples, axis=0), [1, 2], atol=0.2)
+
+
+def test_mcmc_with_a_copula_target():
+    np.random.seed(0)
+    mcmc = MCMC(dimension=2, pdf_target=['Normal', 'Normal'], pdf_target_params=[[0, 1], [0, 1]],
+                pdf_target_copula='Gaussian', pdf_target_copula_params=[[1, 0.8], [0.8, 1]], algorithm='MH',
+                nsamples=5000, jump=3, nburn=200, seed=[0, 0])
+    assert np.corrcoef(mcmc.samples.T)[0, 1] == pytest.approx(0.8, abs=0.05)
+
+
+def test_mcmc_keeps_the_log_pdf_of_a_distribution_target_in_the_tails():
+    np.random.seed(0)
+    mcmc = MCMC(dimension=1, pdf_target='Normal', pdf_target_params=[0, 1], algorithm='MH', nsamples=10, seed=[0.])
+    # The pdf underflows at x=40, its log is below the log(1e-320) the pdf of the target is floored at
+    assert mcmc.log_pdf_target(np.array([[40.]])) == pytest.approx(stats.norm.logpdf(40.))
+
+
+########################################################################################################################
+# IS
+
+def test_is_with_a_distribution_target():
+    np.random.seed(0)
+    importance_sampling = IS(pdf_target=['Normal', 'Normal'], pdf_target_params=[[1, 1], [0, 1]],
+                             pdf_proposal=['Normal', 'Normal'], pdf_proposal_params=[[0, 2], [0, 2]], nsamples=20000)
+    mean = np.sum(importance_sampling.weights[:, np.newaxis] * importance_sampling.samples, axis=0)
+    assert np.allclose(mean, [1, 0], atol=0.1)
+
+
+def test_is_with_a_target_of_bounded_support():
+    np.random.seed(0)
+    importance_sampling = IS(pdf_target='Uniform', pdf_target_params=[0, 1], pdf_proposal='Normal',
+                             pdf_proposal_params=[0.5, 1], nsamples=20000)
+    inside = (importance_sampling.samples >= 0) & (importance_sampling.samples <= 1)
+    assert np.sum(importance_sampling.weights[~inside.ravel()]) < 1e-10
+    assert np.sum(importance_sampling.weights * importance_sampling.samples.ravel()) == pytest.approx(0.5, abs=0.02)
+
+
+def test_is_keeps_the_log_pdf_of_a_distribution_target_in_the_tails():
+    np.random.seed(0)
+    importance_sampling = IS(pdf_target='Normal', pdf_target_params=[0, 1], pdf_proposal='Normal',
+                             pdf_proposal_params=[0, 1], nsamples=10)
+    assert importance_sampling.log_pdf_target(np.array([[40.]])) == pytest.approx(stats.norm.logpdf(40.))